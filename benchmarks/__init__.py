@@ -0,0 +1,15 @@
+"""
+Performance benchmarks for the hot paths of hg_oap.
+
+Run all the benchmarks (from the project root) with::
+
+    python -m benchmarks
+
+Record a baseline and compare a later run against it with::
+
+    python -m benchmarks --save baseline.json
+    python -m benchmarks --compare baseline.json
+
+The compare mode reports the change of each benchmark against the baseline and exits with a non-zero status if
+any of them is slower by more than the threshold (``--threshold``, 20% by default).
+"""
@@ -0,0 +1,42 @@
+import argparse
+import importlib
+import logging
+import pkgutil
+import sys
+
+import benchmarks
+from benchmarks.runner import run, compare, load, save
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=benchmarks.__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--pattern", default="*", help="Only run the benchmarks matching this glob pattern")
+    parser.add_argument("--repeat", type=int, default=None, help="Override the number of repeats of each benchmark")
+    parser.add_argument("--save", metavar="PATH", help="Write the results as JSON to PATH")
+    parser.add_argument("--compare", metavar="PATH", help="Compare the results to the baseline stored at PATH")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Slow-down (as a fraction of the baseline) reported as a regression")
+    args = parser.parse_args(argv)
+    # hgraph installs a DEBUG console handler unless the logger already has one
+    hgraph_logger = logging.getLogger("hgraph")
+    hgraph_logger.addHandler(logging.NullHandler())
+    hgraph_logger.setLevel(logging.WARNING)
+
+    for module in pkgutil.iter_modules(benchmarks.__path__):
+        if module.name.startswith("bench_"):
+            importlib.import_module(f"benchmarks.{module.name}")
+
+    results = run(args.pattern, args.repeat)
+    if args.save:
+        save(results, args.save)
+    if args.compare:
+        print()
+        if regressions := compare(load(args.compare), results, args.threshold):
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
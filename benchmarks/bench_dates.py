@@ -0,0 +1,206 @@
+from datetime import date, timedelta
+
+import holidays
+import numpy as np
+
+from benchmarks.runner import benchmark
+from hg_oap.dates.calendar import HolidayCalendar, WeekendCalendar
+from hg_oap.dates.day_count import DayCount
+from hg_oap.dates.dgen import business_days, months, roll_bwd, roll_fwd, days
+from hg_oap.dates.tenor import Tenor
+
+
+def _holiday_calendar() -> HolidayCalendar:
+    return HolidayCalendar(tuple(holidays.country_holidays("GB", "ENG", years=range(2000, 2051)).keys()))
+
+
+@benchmark("dates.dgen.business_days_10y", number=5)
+def business_days_10y():
+    dgen = ("2020-01-01" <= business_days.over(WeekendCalendar())) < "2030-01-01"
+    return lambda: list(dgen())
+
+
+@benchmark("dates.dgen.business_days_holidays_10y", number=5)
+def business_days_holidays_10y():
+    dgen = ("2020-01-01" <= business_days.over(_holiday_calendar())) < "2030-01-01"
+    return lambda: list(dgen())
+
+
+@benchmark("dates.dgen.roll_fwd_months_50y", number=5)
+def roll_fwd_months_50y():
+    dgen = ("2000-01-01" <= roll_fwd(months.end, _holiday_calendar())) < "2050-01-01"
+    return lambda: list(dgen())
+
+
+@benchmark("dates.dgen.roll_lme_10y", number=5)
+def roll_lme_10y():
+    from hg_oap.impl.instruments.futures.lme import roll_lme
+    dgen = ("2020-01-01" <= roll_lme(days, _holiday_calendar())) < "2030-01-01"
+    return lambda: list(dgen())
+
+
+@benchmark("dates.dgen.months_end_50y", number=5)
+def months_end_50y():
+    dgen = ("2000-01-01" <= months.end) < "2050-01-01"
+    return lambda: list(dgen())
+
+
+@benchmark("dates.dgen.roll_bwd_10y", number=5)
+def roll_bwd_10y():
+    dgen = ("2020-01-01" <= roll_bwd(days, _holiday_calendar())) < "2030-01-01"
+    return lambda: list(dgen())
+
+
+@benchmark("dates.calendar.add_business_days", number=5)
+def add_business_days():
+    calendar = _holiday_calendar()
+    start = [date(2020, 1, 1) + timedelta(days=i) for i in range(1000)]
+    return lambda: [calendar.add_business_days(d, n) for d in start for n in (1, 5, 20, 250)]
+
+
+@benchmark("dates.tenor.construct_10k", number=5)
+def tenor_construct_10k():
+    tenors = ["1d", "3m", "1b", "1y2m", "-1w"] * 2000
+    return lambda: [Tenor(t) for t in tenors]
+
+
+@benchmark("dates.dgen.add_tenor_10k", number=5)
+def dgen_add_tenor_10k():
+    return lambda: [days + "1d" for _ in range(10_000)]
+
+
+@benchmark("dates.tenor.add_to_10k", number=5)
+def tenor_add_to_10k():
+    tenor = Tenor("1y2m")
+    start = [date(2000, 1, 1) + timedelta(days=i) for i in range(10_000)]
+    return lambda: [tenor.add_to(d) for d in start]
+
+
+@benchmark("dates.tenor.add_to_array_10k", number=5)
+def tenor_add_to_array_10k():
+    tenor = Tenor("1y2m")
+    start = np.arange(np.datetime64("2000-01-01"), np.datetime64("2000-01-01") + np.timedelta64(10_000, "D"))
+    return lambda: tenor.add_to_array(start)
+
+
+@benchmark("dates.tenor.add_business_days_array_10k", number=5)
+def tenor_add_business_days_array_10k():
+    tenor, calendar = Tenor("20b"), _holiday_calendar()
+    start = np.arange(np.datetime64("2000-01-01"), np.datetime64("2000-01-01") + np.timedelta64(10_000, "D"))
+    return lambda: tenor.add_to_array(start, calendar)
+
+
+@benchmark("dates.calendar.business_days_between_enumerated", number=5)
+def business_days_between_enumerated():
+    calendar = _holiday_calendar()
+    schedule = list((("2000-01-01" <= months) < "2050-01-01")())
+    return lambda: [len(list(((s <= business_days.over(calendar)) < e)())) for s, e in zip(schedule, schedule[1:])]
+
+
+@benchmark("dates.day_count.bus_252_accruals_50y", number=5)
+def bus_252_accruals_50y():
+    calendar = _holiday_calendar()
+    schedule = list((("2000-01-01" <= months) < "2050-01-01")())
+    return lambda: DayCount.BUS_252.accrual_fractions(schedule, calendar)
+
+
+@benchmark("dates.services.business_days_by_calendar_20y")
+def business_days_by_calendar_20y():
+    from datetime import datetime
+    from frozendict import frozendict
+    from hgraph import graph, register_service, default_path, TSD, TS
+    from hgraph.test import eval_node
+    from hg_oap.dates.date_services import business_days_by_calendar, business_days_from_calendars
+
+    @graph
+    def g() -> TSD[str, TS[date]]:
+        register_service(default_path, business_days_from_calendars,
+                         calendars=frozendict({"LME": "Europe/London", "US": "America/New_York", "JP": "Asia/Tokyo"}))
+        return business_days_by_calendar()
+
+    return lambda: eval_node(g, __elide__=True, __start_time__=datetime(2000, 1, 1), __end_time__=datetime(2020, 1, 1))
+
+
+@benchmark("dates.dt_utils.date_tz_to_utc_10y", number=5)
+def date_tz_to_utc_10y():
+    from zoneinfo import ZoneInfo
+    from hg_oap.dates.dt_utils import date_tz_to_utc
+    tz = ZoneInfo("Europe/London")
+    dates = [date(2020, 1, 1) + timedelta(days=i) for i in range(3650)]
+    return lambda: [date_tz_to_utc(d, tz) for d in dates]
+
+
+@benchmark("dates.dt_utils.date_time_utc_to_tz_10y", number=5)
+def date_time_utc_to_tz_10y():
+    from datetime import datetime
+    from zoneinfo import ZoneInfo
+    from hg_oap.dates.dt_utils import date_time_utc_to_tz
+    tz = ZoneInfo("America/New_York")
+    times = [datetime(2020, 1, 1, 12) + timedelta(days=i) for i in range(3650)]
+    return lambda: [date_time_utc_to_tz(t, tz) for t in times]
+
+
+@benchmark("dates.dt_utils.dates_tz_to_utc_10y", number=5)
+def dates_tz_to_utc_10y():
+    from zoneinfo import ZoneInfo
+    from hg_oap.dates.dt_utils import dates_tz_to_utc
+    tz = ZoneInfo("Europe/London")
+    dates = np.arange(np.datetime64("2020-01-01"), np.datetime64("2030-01-01"))
+    return lambda: dates_tz_to_utc(dates, tz)
+
+
+@benchmark("dates.dgen.month_last_bday_50y", number=5)
+def month_last_bday_50y():
+    from hg_oap.dates.dgen import month_last_bday
+    dgen = ("2000-01-01" <= month_last_bday(months, _holiday_calendar())) < "2050-01-01"
+    return lambda: list(dgen())
+
+
+@benchmark("dates.dgen.month_end_days_10y", number=5)
+def month_end_days_10y():
+    from hg_oap.dates.dgen import month_end
+    dgen = month_end(("2020-01-01" <= days) < "2030-01-01")
+    return lambda: list(dgen())
+
+
+@benchmark("dates.dgen.weekdays_minus_holidays_50y", number=5)
+def weekdays_minus_holidays_50y():
+    from hg_oap.dates.dgen import SequenceDGen, weekdays
+    holiday_dates = SequenceDGen(tuple(sorted(_holiday_calendar()._holidays_set)))
+    dgen = ("2000-01-01" <= (weekdays - holiday_dates)) < "2050-01-01"
+    return lambda: list(dgen())
+
+
+@benchmark("dates.dgen.weekends_or_business_days_50y", number=5)
+def weekends_or_business_days_50y():
+    from hg_oap.dates.dgen import weekends
+    calendar = _holiday_calendar()
+    dgen = ("2000-01-01" <= ((days & weekends) | (business_days - weekends))) < "2050-01-01"
+    return lambda: list(dgen(calendar=calendar))
+
+
+@benchmark("dates.dgen.cursor_month_last_bday_10y", number=5)
+def cursor_month_last_bday_10y():
+    from hg_oap.dates.dgen import DGenCursor, month_last_bday
+    calendar = _holiday_calendar()
+    business_dates = list((("2020-01-01" <= business_days.over(calendar)) < "2030-01-01")())
+    gen = month_last_bday(months, calendar)
+
+    def run():
+        cursor = DGenCursor(gen)
+        return [cursor.next_after(d) for d in business_dates]
+
+    return run
+
+
+@benchmark("dates.services.schedule_from_dgen_50y", number=3)
+def schedule_from_dgen_50y():
+    from datetime import datetime, time
+    from hgraph.test import eval_node
+    from hg_oap.dates.date_services import schedule_from_dgen
+    from hg_oap.dates.dgen import weekdays, SequenceDGen
+    holiday_dates = SequenceDGen(tuple(sorted(_holiday_calendar()._holidays_set)))
+
+    return lambda: eval_node(schedule_from_dgen, weekdays - holiday_dates, time_of_day=time(17),
+                             time_zone="Europe/London", __elide__=True, __start_time__=datetime(2000, 1, 1),
+                             __end_time__=datetime(2050, 1, 1))
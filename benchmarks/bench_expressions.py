@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+
+from benchmarks.runner import benchmark
+from hg_oap.utils.exprclass import ExprClass
+from hg_oap.utils.op import ParameterOp, Expression, lazy, calc
+
+_0 = ParameterOp(_index=0)
+_1 = ParameterOp(_index=1)
+SELF = ParameterOp(_name="SELF", _index=0)
+
+
+@benchmark("expressions.expression_eval", number=10)
+def expression_eval():
+    expr = Expression((_0 + _1) * _0 - _1 / 2 + lazy(max)(_0, _1))
+    return lambda: [expr(i, 3) for i in range(1000)]
+
+
+@dataclass(frozen=True)
+class _Spec:
+    contract_size: float
+    price_multiplier: float
+
+
+@dataclass(frozen=True)
+class _Series:
+    spec: _Spec
+
+
+@dataclass(frozen=True)
+class _Contract:
+    series: _Series
+
+
+# the notional is shared, the call and the arithmetic on the parameter are evaluated for each occurrence
+_NOTIONAL = _0.series.spec.contract_size * _0.series.spec.price_multiplier * _1
+_REPEATED = (_NOTIONAL - lazy(abs)(_NOTIONAL)) / (_NOTIONAL + 1) + (_1 + 1) * (_1 + 1)
+
+
+@benchmark("expressions.repeated_subexpression_eval", number=10)
+def repeated_subexpression_eval():
+    expr = Expression(_REPEATED)
+    contract = _Contract(_Series(_Spec(10.0, 0.01)))
+    return lambda: [expr(contract, i) for i in range(1000)]
+
+
+@benchmark("expressions.repeated_subexpression_unoptimised_eval", number=10)
+def repeated_subexpression_unoptimised_eval():
+    contract = _Contract(_Series(_Spec(10.0, 0.01)))
+    return lambda: [calc(_REPEATED, contract, i) for i in range(1000)]
+
+
+@benchmark("expressions.comprehension_eval", number=10)
+def comprehension_eval():
+    expr = [i * 2 + 1 for i in _0]
+    data = list(range(1000))
+    return lambda: calc(expr, data)
+
+
+@benchmark("expressions.comprehension_eval_100k", number=1)
+def comprehension_eval_100k():
+    expr = [i * 2 + 1 for i in _0]
+    data = list(range(100_000))
+    return lambda: calc(expr, data)
+
+
+@benchmark("expressions.nested_comprehension_eval", number=10)
+def nested_comprehension_eval():
+    expr = [j * 2 for i in _0 for j in i]
+    data = [list(range(10))] * 100
+    return lambda: calc(expr, data)
+
+
+@dataclass
+class _Chain(ExprClass):
+    a: int
+    b: int = SELF.a + 1
+    c: int = SELF.b * 2
+    d: int = SELF.c + SELF.b
+    e: int = SELF.d - SELF.a
+
+
+@benchmark("expressions.exprclass_first_access", number=10)
+def exprclass_first_access():
+    return lambda: [_Chain(a=i).e for i in range(1000)]
+
+
+@benchmark("expressions.exprclass_cached_access", number=10)
+def exprclass_cached_access():
+    instances = [_Chain(a=i) for i in range(1000)]
+    for i in instances:
+        i.e
+    return lambda: [i.e for i in instances]
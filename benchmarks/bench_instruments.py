@@ -0,0 +1,91 @@
+from datetime import date, time
+
+from benchmarks.bench_pricing import _SERIES
+from benchmarks.runner import memory_benchmark, benchmark
+from hg_oap.dates.dgen import roll_bwd
+from hg_oap.impl.assets.currency import Currencies
+from hg_oap.instruments.calendar_spread import CalendarSpread
+from hg_oap.instruments.future import Future, FutureContractSeries, CONTRACT_BASE_DATE
+from hg_oap.instruments.fx import FXSpot
+from hg_oap.utils import SELF
+from hg_oap.utils.exprclass import evaluate_all
+
+_FUTURE_ATTRIBUTES = ("symbol", "name", "currency_unit", "unit", "tick_size", "unit_conversion_factors", "trading_calendar")
+
+
+def _futures(n: int) -> list[Future]:
+    futures = [Future(series=_SERIES, contract_base_date=date(2024, 1 + i % 12, 1)) for i in range(n)]
+    for f in futures:
+        for a in _FUTURE_ATTRIBUTES:
+            getattr(f, a)
+    return futures
+
+
+@memory_benchmark("instruments.future_memory")
+def future_memory():
+    return lambda: _futures(1000)
+
+
+@memory_benchmark("instruments.fx_spot_memory")
+def fx_spot_memory():
+    def _fx_spots():
+        spots = [FXSpot(symbol=f"fx{i}", base=Currencies.EUR.value, quote=Currencies.USD.value) for i in range(1000)]
+        for s in spots:
+            s.currency_unit, s.unit, s.currency_pair
+        return spots
+
+    return _fx_spots
+
+
+@memory_benchmark("instruments.calendar_spread_memory")
+def calendar_spread_memory():
+    near, far = _futures(2)
+
+    def _spreads():
+        spreads = [CalendarSpread(near=near, far=far) for _ in range(1000)]
+        for s in spreads:
+            s.symbol, s.name, s.currency_unit, s.unit, s.tick_size
+        return spreads
+
+    return _spreads
+
+
+@benchmark("instruments.future_create_and_access", number=5)
+def future_create_and_access():
+    return lambda: _futures(1000)
+
+
+_DATED_SERIES = FutureContractSeries(
+    spec=_SERIES.spec,
+    name="M",
+    symbol_expr=lambda future: f"f{future.contract_base_date.month}",
+    frequency=_SERIES.frequency,
+    first_trading_date=CONTRACT_BASE_DATE - "3m",
+    last_trading_date=SELF.expiry(CONTRACT_BASE_DATE),
+    last_trading_time=time(17, 0),
+    first_delivery_date=SELF.last_trading_date,
+    last_delivery_date=SELF.last_trading_date,
+    expiry=roll_bwd(CONTRACT_BASE_DATE + "15d").over(SELF.spec.trading_calendar))
+
+
+def _dated_futures(n: int) -> list[Future]:
+    return [Future(series=_DATED_SERIES, contract_base_date=date(2024, 1 + i % 12, 1)) for i in range(n)]
+
+
+@benchmark("instruments.future_access_all_1k", number=5)
+def future_access_all():
+    def _access_all():
+        for f in _dated_futures(1000):
+            for a in Future.__ex_layout__:
+                getattr(f, a)
+
+    return _access_all
+
+
+@benchmark("instruments.future_evaluate_all_1k", number=5)
+def future_evaluate_all():
+    def _evaluate_all():
+        for f in _dated_futures(1000):
+            evaluate_all(f)
+
+    return _evaluate_all
@@ -0,0 +1,58 @@
+from benchmarks.runner import benchmark
+from hg_oap.impl.assets.currency import Currencies
+from hg_oap.instruments.instrument import Instrument
+from hg_oap.orders.order import OrderState, SingleLegOrder, OriginatorInfo, ORDER, Fill
+from hg_oap.orders.order_request_response_events import OrderRequest, CreateOrderRequest, OrderResponse, OrderEvent
+from hg_oap.orders.order_service import order_handler, order_client, OrderHandlerOutput
+from hg_oap.orders.order_type import MarketOrderType
+from hg_oap.pricing.price import Price
+from hg_oap.units.quantity import Quantity
+from hg_oap.units.unit_system import UnitSystem
+from hgraph import graph, TS, TSB, compute_node, register_service, MIN_TD, SIGNAL, lag, sample
+from hgraph.test import eval_node
+
+
+@order_handler
+@graph
+def _fill_handler(request: TS[OrderRequest], order_state: TSB[OrderState[SingleLegOrder]]) -> TSB[OrderHandlerOutput]:
+    """Accepts each request and fills it completely one engine cycle later"""
+    order_response = _accept(request)
+    fill_signal = sample(lag(order_response, MIN_TD), True)
+    return TSB[OrderHandlerOutput].from_ts(order_response=order_response,
+                                           order_event=_fill(order_state.confirmed, fill_signal))
+
+
+@compute_node
+def _accept(request: TS[OrderRequest]) -> TS[OrderResponse]:
+    return OrderResponse.accept(request.value)
+
+
+@compute_node(active=("fill",))
+def _fill(confirmed: TSB[ORDER], fill: SIGNAL) -> TS[OrderEvent]:
+    fill = Fill(fill_id="fill", qty=confirmed.remaining_qty.value, notional=Price(1000.0, Currencies.USD.value))
+    return OrderEvent.create_fill(confirmed.value, fill)
+
+
+def _requests(n: int) -> list[OrderRequest]:
+    order_type = MarketOrderType(instrument=Instrument(symbol="MCU_3M"),
+                                 quantity=Quantity(qty=1.0, unit=UnitSystem.instance().lot))
+    return [
+        OrderRequest.create_request(CreateOrderRequest, None, "benchmark", order_id=str(i), order_type=order_type,
+                                    originator_info=OriginatorInfo(account="account"))
+        for i in range(n)
+    ]
+
+
+@benchmark("orders.order_handler_create_and_fill_1k", repeat=3)
+def order_handler_throughput():
+    @graph
+    def g(ts: TS[OrderRequest]) -> TS[OrderResponse]:
+        register_service("order.benchmark", _fill_handler)
+        return order_client("order.benchmark", ts)
+
+    requests = _requests(1_000)
+
+    def _run():
+        assert sum(r is not None for r in eval_node(g, requests)) == len(requests)
+
+    return _run
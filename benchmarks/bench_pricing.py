@@ -0,0 +1,163 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Type
+
+from benchmarks.runner import benchmark, evaluation_benchmark
+from hg_oap.assets.asset import PhysicalAsset
+from hg_oap.dates import WeekendCalendar, months
+from hg_oap.impl.assets.currency import Currencies
+from hg_oap.instrument_data_service.instrument_data_service import instrument_by_name, InstrumentData
+from hg_oap.instruments.future import Future, FutureContractSeries, FutureContractSpec, Settlement, SettlementMethod
+from hg_oap.instruments.instrument import Instrument
+from hg_oap.instruments.physical import PhysicalCommodity
+from hg_oap.pricing_service import PriceTraits, PricingRegimeContext, PriceOpts, PRICE, Price, PricingModel, \
+    PriceType
+from hg_oap.pricing_service.price_service import pricing_service_impl, subscribe_price, pricing_model
+from hg_oap.units import Unit, Quantity
+from hg_oap.units.default_unit_system import U
+from hgraph import graph, TS, TSS, TSD, TSB, const, register_service, WiringGraphContext, AUTO_RESOLVE, combine, \
+    MIN_DT, getattr_, SCALAR, service_impl, map_, compute_node, len_, EvaluationLifeCycleObserver
+from hgraph.stream.stream import Stream, StreamStatus
+from hgraph.test import eval_node
+
+
+class _Gas(PhysicalAsset):
+    ...
+
+
+_SERIES = FutureContractSeries(
+    spec=FutureContractSpec(
+        exchange_mic="ICE",
+        symbol="ICE_TFM",
+        underlying=PhysicalCommodity(symbol="DUTCH_GAS_INST", asset=_Gas(symbol="DUTCH_GAS", name="Dutch Natural Gas")),
+        contract_size=Quantity(1.0, U.MW),
+        currency=Currencies.EUR,
+        trading_calendar=WeekendCalendar(),
+        settlement=Settlement(method=SettlementMethod.Financial),
+        quotation_currency_unit=U.EUR,
+        quotation_unit=U.MWh,
+        tick_size=Quantity(1.0, U.MWh)),
+    name="M",
+    symbol_expr=lambda future: f"f{future.contract_base_date.month}",
+    frequency=months,
+    first_trading_date=None,
+    last_trading_date=None,
+    last_trading_time=None,
+    first_delivery_date=None,
+    last_delivery_date=None,
+    expiry=None)
+
+
+@compute_node
+def _instrument(key: TS[str]) -> TS[Instrument]:
+    return Future(symbol=key.value, series=_SERIES, contract_base_date=date(2024, 1, 1))
+
+
+@graph
+def _instrument_data(key: TS[str]) -> TSB[Stream[InstrumentData]]:
+    return combine[TSB[Stream[InstrumentData]]](instrument=_instrument(key), status=StreamStatus.OK, status_msg="")
+
+
+@service_impl(interfaces=instrument_by_name)
+def _instrument_by_name_impl(key: TSS[str]) -> TSD[str, TSB[Stream[InstrumentData]]]:
+    return map_(_instrument_data, __keys__=key)
+
+
+@dataclass(frozen=True, kw_only=True)
+class _FixedPricingModel(PricingModel):
+    ...
+
+
+@graph(overloads=pricing_model, requires=lambda m: m[PRICE].py_type == TSB[Stream[Price]])
+def _fixed_pricing_model(instrument: TS[Future], opts: TS[PriceOpts], model: TS[_FixedPricingModel],
+                         price_type: Type[PRICE] = AUTO_RESOLVE) -> PRICE:
+    return combine[TSB[Stream[Price]]](status=StreamStatus.OK,
+                                       status_msg="",
+                                       val=101.0,
+                                       timestamp=MIN_DT,
+                                       currency_unit=getattr_[SCALAR: Unit](instrument, "currency_unit"),
+                                       unit=getattr_[SCALAR: Unit](instrument, "unit"),
+                                       price_type=PriceType.MID,
+                                       origin="benchmark")
+
+
+def _fan_out(n: int, trace: bool = False):
+    symbols = frozenset(f"f{i}" for i in range(n))
+
+    @graph
+    def g() -> TS[int]:
+        with const(date(2024, 11, 22)) as business_date:
+            register_service("instrument", _instrument_by_name_impl)
+            register_service("instrument_price", pricing_service_impl, publish_to_ui=False, trace=trace,
+                             pricing_regime_context=PricingRegimeContext(
+                                 name="benchmark",
+                                 pricing_model_mapping={PriceTraits(PriceOpts, Future): _FixedPricingModel()}))
+            prices = map_(lambda key: subscribe_price[TSB[Stream[Price]]](key).val,
+                          __keys__=const(symbols, TSS[str]))
+            WiringGraphContext.instance().build_services()
+            return len_(prices)
+
+    def _run():
+        assert eval_node(g)[-1] == n
+
+    return _run
+
+
+@benchmark("pricing.pricing_service_fan_out_1k", repeat=3)
+def pricing_service_fan_out_1k():
+    return _fan_out(1_000)
+
+
+@benchmark("pricing.pricing_service_fan_out_1k_traced", repeat=3)
+def pricing_service_fan_out_1k_traced():
+    return _fan_out(1_000, trace=True)
+
+
+@benchmark("pricing.pricing_service_fan_out_10k", repeat=1)
+def pricing_service_fan_out_10k():
+    return _fan_out(10_000)
+
+
+class _CountEvaluations(EvaluationLifeCycleObserver):
+
+    def __init__(self):
+        self.evaluations = 0
+
+    def on_after_node_evaluation(self, node):
+        self.evaluations += 1
+
+
+@compute_node
+def _leg_price(val: TS[float], origin: str) -> TSB[Stream[Price]]:
+    """A price as published by a model, all the fields tick with each value"""
+    return dict(val=val.value, currency_unit=U.EUR, unit=U.MWh, price_type=PriceType.MID, origin=origin,
+                status=StreamStatus.OK, status_msg="", timestamp=datetime(2024, 11, 22))
+
+
+def _spread(n: int, count: bool = False):
+    near = [100.0 + i % 7 for i in range(n)]
+    far = [99.0 + i % 5 for i in range(n)]
+
+    @graph
+    def g(near: TS[float], far: TS[float]) -> TS[StreamStatus]:
+        # the spread of a spread, so the metadata of the inner spread is combined again by the outer one
+        far_price = _leg_price(far, "far")
+        spread = _leg_price(near, "near") - far_price
+        return (spread - far_price).status
+
+    def _run():
+        observer = _CountEvaluations() if count else None
+        eval_node(g, near, far, __observers__=[observer] if count else None)
+        return observer.evaluations if count else None
+
+    return _run
+
+
+@benchmark("pricing.price_spread_10k_ticks", repeat=3)
+def price_spread_10k_ticks():
+    return _spread(10_000)
+
+
+@evaluation_benchmark("pricing.price_spread_10k_ticks_evaluations")
+def price_spread_10k_ticks_evaluations():
+    return _spread(10_000, count=True)
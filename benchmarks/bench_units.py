@@ -0,0 +1,28 @@
+from benchmarks.runner import benchmark
+from hg_oap.quanity.conversion import convert_units
+from hg_oap.units.default_unit_system import U
+from hg_oap.units.quantity import Quantity
+from hgraph import graph, TS
+from hgraph.test import eval_node
+
+
+@benchmark("units.quantity_arithmetic", number=10)
+def quantity_arithmetic():
+    a = Quantity(1.0, U.tonne)
+    b = Quantity(500.0, U.kg)
+    return lambda: [(a + b) * 2.0 / 3.0 for _ in range(1000)]
+
+
+@benchmark("units.unit_convert", number=10)
+def unit_convert():
+    return lambda: [U.MWh.convert(float(i), to=U.MMBtu) for i in range(1000)]
+
+
+@benchmark("units.convert_units_graph_10k_ticks")
+def convert_units_graph():
+    @graph
+    def g(qty: TS[float]) -> TS[float]:
+        return convert_units(qty, U.MWh, U.MMBtu)
+
+    ticks = [float(i) for i in range(10_000)]
+    return lambda: eval_node(g, ticks)
@@ -0,0 +1,167 @@
+import json
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from fnmatch import fnmatch
+from typing import Callable
+
+__all__ = ("benchmark", "memory_benchmark", "evaluation_benchmark", "Benchmark", "BENCHMARKS", "run", "compare", "load",
+           "save")
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """
+    A registered benchmark. The ``setup`` function prepares the data and returns the function to time, so the cost of
+    the set-up is not included in the results.
+    """
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    number: int = 1
+    repeat: int = 5
+    unit: str = "s"
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, number: int = 1, repeat: int = 5):
+    """Registers the decorated set-up function as a benchmark with the given name"""
+
+    def _register(fn):
+        if name in BENCHMARKS:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        BENCHMARKS[name] = Benchmark(name, fn, number, repeat)
+        return fn
+
+    return _register
+
+
+def memory_benchmark(name: str, number: int = 1000, repeat: int = 3):
+    """
+    Registers the decorated set-up function as a memory benchmark. The function returned by the set-up must create
+    and return ``number`` objects, the result is the memory allocated per object in bytes.
+    """
+
+    def _register(fn):
+        if name in BENCHMARKS:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        BENCHMARKS[name] = Benchmark(name, fn, number, repeat, unit="B")
+        return fn
+
+    return _register
+
+
+def evaluation_benchmark(name: str, repeat: int = 1):
+    """
+    Registers the decorated set-up function as a benchmark of the work done by a graph. The function returned by the
+    set-up must run the graph and return the number of node evaluations, these are reported rather than a time.
+    """
+
+    def _register(fn):
+        if name in BENCHMARKS:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        BENCHMARKS[name] = Benchmark(name, fn, 1, repeat, unit="evals")
+        return fn
+
+    return _register
+
+
+def _time(b: Benchmark, fn, repeat: int) -> list[float]:
+    return [t / b.number for t in timeit.repeat(fn, number=b.number, repeat=repeat)]
+
+
+def _memory(b: Benchmark, fn, repeat: int) -> list[float]:
+    sizes = []
+    for _ in range(repeat):
+        tracemalloc.start()
+        try:
+            objects = fn()
+            size, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert len(objects) == b.number, f"{b.name} created {len(objects)} objects, expected {b.number}"
+        sizes.append(size / b.number)
+        del objects
+    return sizes
+
+
+def _evaluations(b: Benchmark, fn, repeat: int) -> list[float]:
+    return [float(fn()) for _ in range(repeat)]
+
+
+_MEASURES = {"s": _time, "B": _memory, "evals": _evaluations}
+
+
+def run(pattern: str = "*", repeat: int = None, out=sys.stdout) -> dict:
+    """
+    Runs the benchmarks with a name matching the pattern, the results are the time of a single call in seconds
+    (or the memory per object in bytes for memory benchmarks, the node evaluations for evaluation benchmarks), best and
+    median over the repeats.
+    """
+    results = {}
+    for name, b in BENCHMARKS.items():
+        if not fnmatch(name, pattern):
+            continue
+        fn = b.setup()
+        values = _MEASURES[b.unit](b, fn, repeat or b.repeat)
+        results[name] = {"min": min(values), "median": statistics.median(values), "number": b.number,
+                         "repeat": len(values), "unit": b.unit}
+        print(f"{name:<50} {_fmt(min(values), b.unit):>12} {_fmt(statistics.median(values), b.unit):>12}",
+              file=out)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2, out=sys.stdout) -> list[str]:
+    """
+    Compares the best times of the current run to the baseline, returns the names of the benchmarks that are slower
+    than the baseline by more than the threshold (as a fraction of the baseline time).
+    """
+    regressions = []
+    base = baseline["results"]
+    for name, result in current["results"].items():
+        if (b := base.get(name)) is None:
+            print(f"{name:<50} {'new':>12}", file=out)
+            continue
+        change = result["min"] / b["min"] - 1.0
+        flag = ""
+        if change > threshold:
+            flag = "REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "improved"
+        unit = result.get("unit", "s")
+        print(f"{name:<50} {_fmt(b['min'], unit):>12} {_fmt(result['min'], unit):>12} {change:>+9.1%} {flag}",
+              file=out)
+    return regressions
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(results: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def _fmt(value: float, unit: str = "s") -> str:
+    if unit in ("B", "evals"):
+        return f"{value:.0f} {unit}"
+    seconds = value
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
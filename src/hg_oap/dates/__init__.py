@@ -1,3 +1,7 @@
 from .calendar import *
+from .holiday_calendar import *
+from .calendar_registry import *
 from .tenor import *
+from .date_intervals import *
 from .dgen import *
+from .day_count import *
@@ -1,9 +1,11 @@
 from abc import abstractmethod
 from bisect import bisect, bisect_left
 from datetime import date, timedelta
+from functools import cache
 from typing import Tuple, Set, Sequence
 
-__all__ = ('Calendar', 'WeekendCalendar', 'HolidayCalendar', 'DelegateCalendar', 'CalendarImpl', 'UnionCalendar')
+__all__ = ('Calendar', 'WeekendCalendar', 'HolidayCalendar', 'DelegateCalendar', 'CalendarImpl', 'UnionCalendar',
+           'BusinessDayTable')
 
 
 class Calendar:
@@ -17,6 +19,173 @@ class Calendar:
         Is this a working or business day?
         """
 
+    def business_day_table(self, start: date, end: date) -> "BusinessDayTable | None":
+        """
+        The lookup table of the business days covering (at least) the dates from ``start`` to ``end``, or None if the
+        calendar does not support one. The date generators use the table, when available, rather than asking the
+        calendar about each date.
+        """
+        return None
+
+    def has_business_day_table(self) -> bool:
+        """True if ``business_day_table`` gives a table"""
+        return type(self).business_day_table is not Calendar.business_day_table
+
+    def business_days_between(self, start: date, end: date) -> int:
+        """
+        The number of business days from ``start`` (inclusive) to ``end`` (exclusive), negative if ``end`` is before
+        ``start``
+        """
+        if end < start:
+            return -self.business_days_between(end, start)
+        if (t := self.business_day_table(start, end)) is not None \
+                and (n := t.business_days_between(start, end)) is not None:
+            return n
+        return sum(1 for i in range((end - start).days) if self.is_business_day(start + timedelta(days=i)))
+
+    def business_days_between_array(self, starts, ends):
+        """
+        ``business_days_between`` over arrays of dates (``numpy.datetime64[D]``, or anything convertible to them), the
+        starts and ends are broadcast against each other
+        """
+        import numpy as np
+        starts, ends = np.broadcast_arrays(np.asarray(starts, dtype='datetime64[D]'),
+                                           np.asarray(ends, dtype='datetime64[D]'))
+        if starts.size == 0:
+            return np.zeros(starts.shape, dtype=np.int64)
+        first, last = min(starts.min(), ends.min()).item(), max(starts.max(), ends.max()).item()
+        if (t := self.business_day_table(first, last)) is not None \
+                and (n := t.business_days_between_array(starts, ends)) is not None:
+            return n
+        counts = [self.business_days_between(s, e) for s, e in zip(starts.ravel().tolist(), ends.ravel().tolist())]
+        return np.array(counts, dtype=np.int64).reshape(starts.shape)
+
+
+class BusinessDayTable:
+    """
+    The business days of a calendar over a range of dates, as a bitmap of the business days along with the next (on or
+    after) and the previous (on or before) business day of each date. Rolling a date is an index into a list and the
+    business days of a range are found in one pass over the bitmap.
+    """
+
+    __slots__ = ('start', 'end', 'business', '_base', '_flags', '_next', '_prev', '_index', '_counts')
+
+    def __init__(self, start: date, business: Sequence[bool]):
+        import numpy as np
+        self.business = business = np.asarray(business, dtype=bool)
+        self._base = base = start.toordinal()
+        n = len(business)
+        self.start = start
+        self.end = date.fromordinal(base + n - 1)
+        self._flags = business.tobytes()
+        i = np.arange(n)
+        # the ordinals of the next and previous business days, None if past the end of the table
+        self._next = [base + x if x < n else None
+                      for x in np.minimum.accumulate(np.where(business, i, n)[::-1])[::-1].tolist()]
+        self._prev = [base + x if x >= 0 else None for x in np.maximum.accumulate(np.where(business, i, -1)).tolist()]
+        self._index = None
+        self._counts = None
+
+    def covers(self, d: date) -> bool:
+        return self.start <= d <= self.end
+
+    def is_business_day(self, d: date) -> bool:
+        return self._flags[d.toordinal() - self._base] == 1
+
+    def roll_fwd(self, d: date) -> date | None:
+        """The first business day on or after the date, None if it is past the end of the table"""
+        o = self._next[d.toordinal() - self._base]
+        return None if o is None else date.fromordinal(o)
+
+    def roll_bwd(self, d: date) -> date | None:
+        """The last business day on or before the date, None if it is before the start of the table"""
+        o = self._prev[d.toordinal() - self._base]
+        return None if o is None else date.fromordinal(o)
+
+    def business_days(self, start: date, end: date) -> list[date]:
+        """The business days from start to end (inclusive) that are in the table"""
+        import numpy as np
+        i = max(start.toordinal() - self._base, 0)
+        j = min(end.toordinal() - self._base, len(self.business) - 1)
+        if j < i:
+            return []
+        return [date.fromordinal(o) for o in (np.flatnonzero(self.business[i:j + 1]) + (self._base + i)).tolist()]
+
+    def add_business_days(self, dates, days: int):
+        """
+        ``Calendar.add_business_days`` over an array of dates (``numpy.datetime64[D]``), None if any of the dates or the
+        results are not in the table
+        """
+        import numpy as np
+        if days < 0: return self.sub_business_days(dates, -days)
+
+        if (offsets := self._offsets(dates)) is None:
+            return None
+        index = self._business_index()
+        k = np.searchsorted(index, offsets, 'left') + days  # rolled forward to the business day, then stepped on
+        if k.size and k.max() >= len(index):
+            return None
+        return np.datetime64(self.start, 'D') + index[k].astype('timedelta64[D]')
+
+    def sub_business_days(self, dates, days: int):
+        """``Calendar.sub_business_days`` over an array of dates, see ``add_business_days``"""
+        import numpy as np
+        if days < 0: return self.add_business_days(dates, -days)
+
+        if (offsets := self._offsets(dates)) is None:
+            return None
+        index = self._business_index()
+        k = np.searchsorted(index, offsets, 'right') - 1 - days
+        if k.size and k.min() < 0:
+            return None
+        return np.datetime64(self.start, 'D') + index[k].astype('timedelta64[D]')
+
+    def business_days_between(self, start: date, end: date) -> int | None:
+        """
+        The number of business days from ``start`` (inclusive) to ``end`` (exclusive), None if the dates are not in the
+        table (``end`` can be the day after the end of the table)
+        """
+        i, j = start.toordinal() - self._base, end.toordinal() - self._base
+        n = len(self.business)
+        if not (0 <= i <= n and 0 <= j <= n):
+            return None
+        counts = self._business_counts()
+        return int(counts[j] - counts[i])
+
+    def business_days_between_array(self, starts, ends):
+        """``business_days_between`` over arrays of dates, None if any of the dates are not in the table"""
+        import numpy as np
+        start = np.datetime64(self.start, 'D')
+        i = (np.asarray(starts, dtype='datetime64[D]') - start).astype(np.int64)
+        j = (np.asarray(ends, dtype='datetime64[D]') - start).astype(np.int64)
+        n = len(self.business)
+        if i.size and (min(i.min(), j.min()) < 0 or max(i.max(), j.max()) > n):
+            return None
+        counts = self._business_counts()
+        return counts[j] - counts[i]
+
+    def _business_counts(self):
+        """The number of business days before each date of the table, along with the total at the end"""
+        if self._counts is None:
+            import numpy as np
+            self._counts = np.concatenate(([0], np.cumsum(self.business, dtype=np.int64)))
+        return self._counts
+
+    def _offsets(self, dates):
+        import numpy as np
+        offsets = (np.asarray(dates, dtype='datetime64[D]') - np.datetime64(self.start, 'D')).astype(np.int64)
+        if offsets.size and (offsets.min() < 0 or offsets.max() >= len(self.business)):
+            return None
+        return offsets
+
+    def _business_index(self):
+        """The offsets of the business days from the start of the table, in order"""
+        if self._index is None:
+            import numpy as np
+            self._index = np.flatnonzero(self.business)
+        return self._index
+
+
 class DetailedCalendar(Calendar):
     """
     The detailed calendar can describe the difference between a holiday and a weekend non-working day.
@@ -73,6 +242,9 @@ class DetailedCalendar(Calendar):
 
 class WeekendCalendar(DetailedCalendar):
     _weekend_days: Tuple[int, ...]
+    _table: BusinessDayTable = None
+
+    MAX_TABLE_YEARS = 200
 
     def __init__(self, weekend_days: Tuple[int, ...] = (5, 6)):
         self._weekend_days = weekend_days
@@ -81,6 +253,40 @@ class WeekendCalendar(DetailedCalendar):
     def weekend_days(self) -> Tuple[int, ...]:
         return self._weekend_days
 
+    def business_day_table(self, start: date, end: date) -> BusinessDayTable | None:
+        """
+        The table covers whole years, from the year of ``start`` to the year after ``end`` so that the dates near the
+        end can be rolled forward. The table is kept and grown to cover later requests (unless that would make it
+        cover more than ``MAX_TABLE_YEARS``, in which case it is replaced).
+
+        The table is built from the weekend days and ``_holidays_between``, so there is none for calendars that
+        override the business day methods without providing their holidays (see ``_table_describes``).
+        """
+        if (t := self._table) is not None and t.start <= start and end <= t.end:
+            return t
+        if not _table_describes(type(self)):
+            return None
+        import numpy as np
+        first, last = date(start.year, 1, 1), date(min(end.year + 1, date.max.year), 12, 31)
+        if t is not None and max(last, t.end).year - min(first, t.start).year < self.MAX_TABLE_YEARS:
+            first, last = min(first, t.start), max(last, t.end)
+        base = first.toordinal()
+        ordinals = np.arange(base, last.toordinal() + 1)
+        business = ~np.isin((ordinals - 1) % 7, self._weekend_days)  # the ordinal 1 is a Monday
+        for h in self._holidays_between(first, last):
+            business[h.toordinal() - base] = False
+        self._table = t = BusinessDayTable(first, business)
+        return t
+
+    def has_business_day_table(self) -> bool:
+        if type(self).business_day_table is WeekendCalendar.business_day_table:
+            return _table_describes(type(self))
+        return super().has_business_day_table()
+
+    def _holidays_between(self, start: date, end: date) -> Sequence[date]:
+        """The holidays from start to end, calendars that override ``is_holiday`` must provide these for the table"""
+        return ()
+
     def is_holiday(self, d: date) -> bool:
         return False
 
@@ -144,14 +350,33 @@ class WeekendCalendar(DetailedCalendar):
         return (d - timedelta(days=days)) if days else d
 
 
+_BUSINESS_DAY_METHODS = ("is_business_day", "is_holiday", "is_holiday_or_weekend", "add_business_days",
+                         "sub_business_days")
+
+
+def _defined_by(tp: type, name: str) -> type:
+    return next(c for c in tp.__mro__ if name in c.__dict__)
+
+
+@cache
+def _table_describes(tp: type) -> bool:
+    """
+    True if the business day table of the ``WeekendCalendar`` type gives the same business days as its methods, that
+    is if none of the business day methods is overridden below the class that provides the holidays
+    """
+    holidays = _defined_by(tp, "_holidays_between")
+    return all(issubclass(holidays, _defined_by(tp, name)) for name in _BUSINESS_DAY_METHODS)
+
+
 class HolidayCalendar(WeekendCalendar):
     _holidays: Tuple[date, ...]
     _holidays_set: Set[date]
 
     def __init__(self, holidays: Tuple[date, ...], weekend_days: Tuple[int, ...] = (5, 6)):
         super().__init__(weekend_days)
-        self._holidays = tuple(sorted(holidays))
         self._holidays_set = set(holidays)
+        # the holidays that fall on a weekend do not move the dates when adding business days, so are not counted
+        self._holidays = tuple(sorted(h for h in self._holidays_set if h.weekday() not in self._weekend_days))
 
     def is_holiday(self, d: date) -> bool:
         return d in self._holidays_set
@@ -159,6 +384,9 @@ class HolidayCalendar(WeekendCalendar):
     def is_holiday_or_weekend(self, d: date) -> bool:
         return self.is_holiday(d) or super().is_holiday_or_weekend(d)
 
+    def _holidays_between(self, start: date, end: date) -> Sequence[date]:
+        return self._holidays[bisect_left(self._holidays, start):bisect(self._holidays, end)]
+
     def add_business_days(self, d: date, days: int):
         if days < 0: return self.sub_business_days(d, -days)
 
@@ -173,7 +401,7 @@ class HolidayCalendar(WeekendCalendar):
                 i = j
 
     def sub_business_days(self, d: date, days: int):
-        if days < 0: return self.sub_business_days(d, -days)
+        if days < 0: return self.add_business_days(d, -days)
 
         i = bisect(self._holidays, d)
         while True:
@@ -0,0 +1,120 @@
+from typing import Callable, ClassVar, Mapping
+
+from hg_oap.dates.calendar import Calendar, UnionCalendar
+from hg_oap.dates.holiday_calendar import HolidayCalendarRegistry, LazyHolidayCalendar
+
+__all__ = ('CalendarRegistry', 'get_calendar', 'resolve_calendar')
+
+
+# The calendars used for the settlement of the currencies, by the names of the holiday calendars
+CURRENCY_CALENDARS = {
+    "USD": "US",
+    "GBP": "GB",
+    "EUR": "ECB",
+    "JPY": "JP",
+    "CHF": "CH",
+    "CAD": "CA",
+    "AUD": "AU",
+    "NZD": "NZ",
+    "CNY": "CN",
+}
+
+
+class CalendarRegistry:
+    """
+    Maps the names of calendars to calendar instances shared by the process, so that references to a calendar by name
+    (for example the ``trading_calendar`` of a contract spec) are resolved once rather than building a calendar for
+    each consumer.
+
+    A name is looked up in the calendars registered, then the aliases (i.e. "USD" is the "US" holiday calendar) and
+    finally in the ``HolidayCalendarRegistry``. Names joined by "+" are the union of the calendars ("LME+USD"), the
+    order of the names does not matter, "USD+LME" is the same calendar. Unions of holiday calendars are themselves
+    holiday calendars, other unions are a ``UnionCalendar``.
+    """
+
+    __instance__: ClassVar["CalendarRegistry"] = None
+
+    def __init__(self, aliases: Mapping[str, str] = None):
+        self._factories: dict[str, Calendar | Callable[[], Calendar]] = {}
+        self._aliases: dict[str, str] = {**CURRENCY_CALENDARS, "LME Calendar": "LME"}
+        if aliases:
+            self._aliases.update(aliases)
+        self._calendars: dict[str, Calendar] = {}
+        self._shared: dict[tuple, Calendar] = {}
+
+    @staticmethod
+    def instance() -> "CalendarRegistry":
+        if CalendarRegistry.__instance__ is None:
+            CalendarRegistry.__instance__ = CalendarRegistry()
+        return CalendarRegistry.__instance__
+
+    def make_current(self):
+        """Makes this the registry of the process, replacing the current one"""
+        CalendarRegistry.__instance__ = self
+
+    def __enter__(self):
+        self._previous = CalendarRegistry.__instance__
+        self.make_current()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        CalendarRegistry.__instance__ = self._previous
+
+    def register(self, name: str, calendar: Calendar | Callable[[], Calendar]):
+        """Registers the calendar, or a function creating it when it is first used, by the name"""
+        self._factories[name] = calendar
+        self._calendars.clear()
+
+    def alias(self, name: str, target: str):
+        """Makes ``name`` refer to the calendar named ``target``"""
+        self._aliases[name] = target
+        self._calendars.clear()
+
+    def canonical_name(self, name: str) -> str:
+        """The name of the calendar with the aliases resolved and the parts of a union in order"""
+        parts = set()
+        for p in name.split("+"):
+            p = p.strip()
+            while p not in self._factories and (target := self._aliases.get(p)) is not None:
+                p = target
+            parts.update(p.split("+") if "+" in p else (p,))
+        return "+".join(sorted(parts))
+
+    def calendar(self, name: str) -> Calendar:
+        """The calendar with the name, built on first use"""
+        if (c := self._calendars.get(name)) is not None:
+            return c
+        canonical = self.canonical_name(name)
+        if (c := self._calendars.get(canonical)) is None:
+            c = self._calendars[canonical] = self._build(canonical)
+        self._calendars[name] = c
+        return c
+
+    def _build(self, name: str) -> Calendar:
+        if (f := self._factories.get(name)) is not None:
+            return f if isinstance(f, Calendar) else f()
+        if "+" not in name:
+            return HolidayCalendarRegistry.instance().calendar(name)
+
+        parts = name.split("+")
+        calendars = [self.calendar(p) for p in parts]
+        if all(isinstance(c, LazyHolidayCalendar) for c in calendars):
+            return HolidayCalendarRegistry.instance().calendar("+".join(sorted(c.name for c in calendars)))
+        return UnionCalendar(*calendars)
+
+    def shared(self, calendar_tp: type[Calendar], params: Mapping[str, object] = None) -> Calendar:
+        """One instance of the calendar type per distinct set of parameters"""
+        key = (calendar_tp, tuple(sorted((params or {}).items())))
+        if (c := self._shared.get(key)) is None:
+            c = self._shared[key] = calendar_tp(**(params or {}))
+        return c
+
+
+def get_calendar(name: str) -> Calendar:
+    """The named calendar from the registry of the process, see ``CalendarRegistry``"""
+    return CalendarRegistry.instance().calendar(name)
+
+
+def resolve_calendar(calendar: Calendar | str | None) -> Calendar | None:
+    """Resolves a reference to a calendar by name, calendars (and None) are returned as is"""
+    return get_calendar(calendar) if isinstance(calendar, str) else calendar
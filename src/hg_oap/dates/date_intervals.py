@@ -0,0 +1,174 @@
+from datetime import date
+from typing import Iterable, Iterator, Sequence
+
+__all__ = ('DateIntervals',)
+
+
+class DateIntervals:
+    """
+    A set of dates as runs of consecutive dates, the runs are sorted and neither overlap nor touch. The runs are kept
+    as the ordinals of their first date and of the date after their last, so the union, intersection and difference
+    of sets are computed over the runs rather than the dates and the dates are only generated when iterated.
+
+    Runs with a step (i.e. every 7th day) are described by ``stepped``, they are held as runs of single dates.
+    """
+
+    __slots__ = ('starts', 'stops')
+
+    def __init__(self, starts, stops):
+        import numpy as np
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.stops = np.asarray(stops, dtype=np.int64)
+
+    @staticmethod
+    def empty() -> "DateIntervals":
+        return DateIntervals((), ())
+
+    @staticmethod
+    def run(first: date, last: date) -> "DateIntervals":
+        """The dates from first to last (inclusive)"""
+        if last < first:
+            return DateIntervals.empty()
+        return DateIntervals((first.toordinal(),), (last.toordinal() + 1,))
+
+    @staticmethod
+    def stepped(first: date, last: date, step: int) -> "DateIntervals":
+        """The dates from first to last (inclusive) every ``step`` days"""
+        import numpy as np
+        if step == 1:
+            return DateIntervals.run(first, last)
+        starts = np.arange(first.toordinal(), last.toordinal() + 1, step)
+        return DateIntervals(starts, starts + 1)
+
+    @staticmethod
+    def of_dates(dates: Iterable[date]) -> "DateIntervals | None":
+        """The dates given in increasing order as runs, None if the dates are not increasing"""
+        import numpy as np
+        ordinals = np.fromiter((d.toordinal() for d in dates), dtype=np.int64)
+        if len(ordinals) == 0:
+            return DateIntervals.empty()
+        steps = np.diff(ordinals)
+        if (steps <= 0).any():
+            return None
+        breaks = np.flatnonzero(steps > 1)
+        return DateIntervals(np.concatenate((ordinals[:1], ordinals[breaks + 1])),
+                             np.concatenate((ordinals[breaks] + 1, ordinals[-1:] + 1)))
+
+    @staticmethod
+    def of_mask(first: date, mask: Sequence[bool]) -> "DateIntervals":
+        """The dates flagged in the mask, the first flag is for the date ``first``"""
+        import numpy as np
+        padded = np.concatenate(([False], np.asarray(mask, dtype=bool), [False]))
+        changes = np.flatnonzero(padded[1:] != padded[:-1]) + first.toordinal()
+        return DateIntervals(changes[0::2], changes[1::2])
+
+    @staticmethod
+    def weekdays(first: date, last: date, weekdays: Iterable[int]) -> "DateIntervals":
+        """The dates from first to last (inclusive) that fall on the days of the week (Monday is 0)"""
+        import numpy as np
+        if last < first:
+            return DateIntervals.empty()
+        ordinals = np.arange(first.toordinal(), last.toordinal() + 1)
+        return DateIntervals.of_mask(first, np.isin((ordinals - 1) % 7, tuple(weekdays)))  # the ordinal 1 is a Monday
+
+    def __len__(self) -> int:
+        """The number of dates"""
+        return int((self.stops - self.starts).sum())
+
+    def __bool__(self) -> bool:
+        return len(self.starts) > 0
+
+    def runs(self) -> int:
+        return len(self.starts)
+
+    def first(self) -> date | None:
+        return date.fromordinal(int(self.starts[0])) if len(self.starts) else None
+
+    def last(self) -> date | None:
+        return date.fromordinal(int(self.stops[-1]) - 1) if len(self.starts) else None
+
+    def clip(self, after: date = None, before: date = None) -> "DateIntervals":
+        """The dates on or after ``after`` and before ``before``, either bound can be omitted"""
+        import numpy as np
+        starts, stops = self.starts, self.stops
+        if after is not None:
+            o = after.toordinal()
+            i = np.searchsorted(stops, o, 'right')
+            starts, stops = np.maximum(starts[i:], o), stops[i:]
+        if before is not None:
+            o = before.toordinal()
+            i = np.searchsorted(starts, o, 'left')
+            starts, stops = starts[:i], np.minimum(stops[:i], o)
+        return DateIntervals(starts, stops)
+
+    def __or__(self, other: "DateIntervals") -> "DateIntervals":
+        return self._combine(other, lambda a, b: a | b)
+
+    def __and__(self, other: "DateIntervals") -> "DateIntervals":
+        return self._combine(other, lambda a, b: a & b)
+
+    def __sub__(self, other: "DateIntervals") -> "DateIntervals":
+        return self._combine(other, lambda a, b: a & ~b)
+
+    def _combine(self, other: "DateIntervals", op) -> "DateIntervals":
+        import numpy as np
+        # the sets are constant between the boundaries of their runs, so are only compared at the boundaries
+        points = np.unique(np.concatenate((self.starts, self.stops, other.starts, other.stops)))
+        keep = op(_contains(self, points), _contains(other, points))
+        kept_before = np.concatenate(([False], keep[:-1]))
+        return DateIntervals(points[keep & ~kept_before], points[~keep & kept_before])
+
+    def __contains__(self, d: date) -> bool:
+        import numpy as np
+        o = d.toordinal()
+        i = np.searchsorted(self.starts, o, 'right') - 1
+        return i >= 0 and o < self.stops[i]
+
+    def __eq__(self, other):
+        if not isinstance(other, DateIntervals):
+            return NotImplemented
+        return (self.starts.tolist(), self.stops.tolist()) == (other.starts.tolist(), other.stops.tolist())
+
+    def __iter__(self) -> Iterator[date]:
+        """
+        The dates in order, they are generated a block at a time so that long (or unbounded) runs are iterated lazily,
+        the blocks start small as often only the first few dates are used
+        """
+        import numpy as np
+        ends, firsts = self._positions()
+        total = int(ends[-1]) if len(ends) else 0
+        position, block = 0, _FIRST_BLOCK
+        while position < total:
+            positions = np.arange(position, min(position + block, total))
+            ordinals = positions + firsts[np.searchsorted(ends, positions, 'right')]
+            yield from (ordinals - _EPOCH).astype('datetime64[D]').tolist()
+            position, block = position + block, min(block * 4, _BLOCK)
+
+    def to_array(self):
+        """The dates as a ``numpy.datetime64[D]`` array"""
+        import numpy as np
+        ends, firsts = self._positions()
+        positions = np.arange(int(ends[-1]) if len(ends) else 0)
+        return (positions + firsts[np.searchsorted(ends, positions, 'right')] - _EPOCH).astype('datetime64[D]')
+
+    def _positions(self):
+        """The position (in the dates) of the end of each run, and the ordinal of a date less its position by run"""
+        import numpy as np
+        lengths = self.stops - self.starts
+        ends = np.cumsum(lengths)
+        return ends, self.starts - (ends - lengths)
+
+    def __repr__(self):
+        runs = ", ".join(f"{date.fromordinal(s)}" if e - s == 1 else f"{date.fromordinal(s)}..{date.fromordinal(e - 1)}"
+                         for s, e in zip(self.starts.tolist()[:5], self.stops.tolist()[:5]))
+        return f"DateIntervals({runs}{', ...' if len(self.starts) > 5 else ''})"
+
+
+def _contains(intervals: DateIntervals, points):
+    import numpy as np
+    return np.searchsorted(intervals.starts, points, 'right') > np.searchsorted(intervals.stops, points, 'right')
+
+
+_EPOCH = date(1970, 1, 1).toordinal()
+_FIRST_BLOCK = 16
+_BLOCK = 4096
@@ -1,12 +1,19 @@
-__all__ = ("business_days", "business_days_from_calendar", "CALENDAR_TYPE")
+__all__ = ("business_days", "business_days_from_calendar", "business_days_by_calendar", "business_days_from_calendars",
+           "CALENDAR_TYPE", "next_scheduled_date", "next_date_after", "schedule_from_dgen")
 
-from datetime import date, datetime, timedelta
-from typing import TypeVar
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from heapq import merge
+from itertools import groupby
+from operator import itemgetter
+from typing import TypeVar, Iterator
 
 from frozendict import frozendict
-from hgraph import reference_service, default_path, TS, service_impl, EvaluationEngineApi, generator
+from hgraph import reference_service, default_path, TS, TSD, service_impl, EvaluationEngineApi, generator, graph, \
+    compute_node, STATE, SCALAR
 
-from hg_oap.dates import Calendar
+from hg_oap.dates import Calendar, CalendarRegistry, resolve_calendar
+from hg_oap.dates.dgen import business_days as business_days_dgen, DGen, DGenCursor
 
 """
 Provide a set of standard services that can be used to provide common date-based services.
@@ -29,36 +36,160 @@ def business_days(path: str = default_path) -> TS[date]:
 CALENDAR_TYPE = TypeVar("CALENDAR_TYPE", bound=Calendar)
 
 
+@reference_service
+def business_days_by_calendar(path: str = default_path) -> TSD[str, TS[date]]:
+    """
+    The current business day of each of a number of calendars, keyed by the name of the calendar. The date of a
+    calendar ticks at the start of its business days, in the time-zone of the calendar.
+    """
+
+
 @service_impl(interfaces=[business_days])
 @generator
 def business_days_from_calendar(
         calendar_tp: type[CALENDAR_TYPE], params: frozendict[str, object] = None, time_zone: str = "UTC",
-        _api: EvaluationEngineApi = None
+        calendar: str = None, _api: EvaluationEngineApi = None
 ) -> TS[date]:
     """
     Uses the calendar provided to tick out the working days. This is useful to run simulations over a particular
     period. This will tick at start time with the current date (if it is a working day) and then subsequently
     tick out dates at the start-of-day for the time-zone provided.
+
+    The calendar is the one named by ``calendar`` in the ``CalendarRegistry`` (i.e. "LME+USD") if given, otherwise
+    the instance of ``calendar_tp`` with the ``params`` shared through the registry.
+    """
+    registry = CalendarRegistry.instance()
+    calendar = registry.calendar(calendar) if calendar is not None else registry.shared(calendar_tp, params)
+    for tick, _, d in _business_day_ticks(calendar, time_zone, _api.start_time, _api.end_time):
+        yield tick, d
+
+
+@service_impl(interfaces=[business_days_by_calendar])
+@generator
+def business_days_from_calendars(calendars: frozendict[str, str],
+                                 _api: EvaluationEngineApi = None) -> TSD[str, TS[date]]:
+    """
+    Ticks out the working days of each of the named calendars (names of the ``CalendarRegistry``, i.e. "LME" or
+    "US+GB") mapped to the time-zone of the calendar, as ``business_days_from_calendar`` does for a single calendar.
+    The schedules of the calendars are merged, so the calendars whose days start at the same time tick together.
+    """
+    registry = CalendarRegistry.instance()
+    ticks = merge(*(_business_day_ticks(registry.calendar(name), time_zone, _api.start_time, _api.end_time, name)
+                    for name, time_zone in calendars.items()))
+    for tick, days in groupby(ticks, key=itemgetter(0)):
+        yield tick, {name: d for _, name, d in days}
+
+
+def _business_day_ticks(calendar: Calendar, time_zone: str, start_time: datetime, end_time: datetime,
+                        name: str = None) -> Iterator[tuple[datetime, str, date]]:
+    """
+    The business days of the calendar from the start to the end time as the (UTC) time of the start of the day in the
+    time-zone, the name and the date. The first day ticks at the start time if it is a business day. The business days
+    are generated from the calendar rather than checking each day.
     """
     from zoneinfo import ZoneInfo
     from hg_oap.dates.dt_utils import date_time_utc_to_tz, date_tz_to_utc, UTC
-    calendar = calendar_tp(**({} if params is None else params))
     if time_zone == "UTC":
         tz = UTC
         to_tz = lambda dt: datetime(dt.year, dt.month, dt.day)
     else:
         tz = ZoneInfo(time_zone)
         to_tz = lambda dt: date_tz_to_utc(dt, tz)
-    current_date = date_time_utc_to_tz(_api.start_time, tz)
-    last_date = date_time_utc_to_tz(_api.end_time, tz)
-    # Yield out the current date if appropriate,
-    # but at the current time as this is unlikely to be the correct start of day for the localised date.
-    if calendar.is_business_day(current_date):
-        yield _api.start_time, current_date
-    current_date += timedelta(days=1)
-
-    # Now we can just loop over days until we are done.
-    while current_date <= last_date:
-        if calendar.is_business_day(current_date):
-            yield to_tz(current_date), current_date
-        current_date += timedelta(days=1)
+    current_date = date_time_utc_to_tz(start_time, tz)
+    last_date = date_time_utc_to_tz(end_time, tz)
+
+    for d in business_days_dgen.over(calendar)(start=current_date, end=last_date):
+        # The current date ticks at the current time as this is unlikely to be the correct start of day for the
+        # localised date.
+        yield (start_time if d == current_date else to_tz(d)), name, d
+
+
+@graph
+def next_scheduled_date(schedule: DGen, calendar: str = None, path: str = default_path) -> TS[date]:
+    """
+    The first date of the schedule after the current business day (of the ``business_days`` service), it ticks as the
+    business days advance past the dates of the schedule. The calendar (a name of the ``CalendarRegistry``) is the one
+    the schedule is generated over.
+    """
+    return next_date_after(business_days(path), schedule, calendar)
+
+
+@dataclass
+class _CursorState:
+    cursor: DGenCursor | None = None
+    last: date | None = None
+
+
+@compute_node
+def next_date_after(ts: TS[date], schedule: DGen, calendar: str = None,
+                    _state: STATE[_CursorState] = None) -> TS[date]:
+    """
+    The first date of the schedule after the date, it ticks when that changes (there are no more ticks once the
+    schedule has no more dates). The schedule is stepped through as the date advances rather than generated again
+    for each date.
+    """
+    if _state.cursor is None:
+        _state.cursor = DGenCursor(schedule, calendar)
+    if (d := _state.cursor.next_after(ts.value)) is not None and d != _state.last:
+        _state.last = d
+        return d
+
+
+@generator
+def schedule_from_dgen(schedule: DGen, calendar: str = None, time_of_day: time = time(), time_zone: str = "UTC",
+                       tp: type[SCALAR] = date, _api: EvaluationEngineApi = None) -> TS[SCALAR]:
+    """
+    Ticks the dates of the schedule at the time of day (the start of the day by default) in the time-zone, from the
+    start to the end of the evaluation. The value ticked is the date, or the (UTC) time of the tick when ``tp`` is
+    ``datetime``. The calendar (a name of the ``CalendarRegistry``) is the one the schedule is generated over.
+
+    The ticks are computed as arrays a year at a time, so long simulations do not step through each day.
+    """
+    import numpy as np
+    from zoneinfo import ZoneInfo
+    from hg_oap.dates.dt_utils import date_time_utc_to_tz, dates_time_tz_to_utc, UTC
+    tz = UTC if time_zone == "UTC" else ZoneInfo(time_zone)
+    calendar = resolve_calendar(calendar)
+    start_time, end_time = np.datetime64(_api.start_time, 'us'), np.datetime64(_api.end_time, 'us')
+    # a day in the time-zone can start the day before (or after) the day in UTC
+    first = max(date_time_utc_to_tz(_api.start_time, tz) - _ONE_DAY, date.min)
+    last = min(date_time_utc_to_tz(_api.end_time, tz) + _ONE_DAY, date.max)
+    for dates in _schedule_dates(schedule, first, last, calendar):
+        times = dates_time_tz_to_utc(dates, time_of_day, tz)
+        in_range = (times >= start_time) & (times <= end_time)
+        dates, times = dates[in_range], times[in_range]
+        yield from zip(times.tolist(), (times if tp is datetime else dates).tolist())
+
+
+_ONE_DAY = timedelta(days=1)
+_SCHEDULE_BLOCK = timedelta(days=365)
+
+
+def _schedule_dates(schedule: DGen, first: date, last: date, calendar: Calendar):
+    """
+    The dates of the schedule from first to last (inclusive) in order, as ``numpy.datetime64[D]`` arrays of a block
+    (of about a year) of dates each. The schedule is generated once over the whole range and consumed a block at a
+    time, as the dates of some schedules depend on where they start (i.e. the first five weekdays). The dates of
+    schedules described as runs (see ``DGen.__intervals__``) are not generated one at a time.
+    """
+    import numpy as np
+    intervals = schedule.__intervals__(first, last, date.min, date.max, calendar)
+    dates = iter(schedule(start=first, end=last, calendar=calendar)) if intervals is None else None
+    pending = None
+    while first <= last:
+        block_end = last if last - first <= _SCHEDULE_BLOCK else first + _SCHEDULE_BLOCK
+        if intervals is not None:
+            block = intervals.clip(first, None if block_end == date.max else block_end + _ONE_DAY).to_array()
+        else:
+            block = []
+            while (d := next(dates, None) if pending is None else pending) is not None and d <= block_end:
+                block.append(d)
+                pending = None
+            pending = d
+            # the dates are in order and distinct, as the ticks are, whatever the schedule generated
+            block = np.unique(np.array(block, dtype='datetime64[D]'))
+            block = block[block >= np.datetime64(first)]
+        yield block
+        if block_end == last:
+            break
+        first = block_end + _ONE_DAY
@@ -0,0 +1,63 @@
+from datetime import date
+from enum import Enum
+
+from hg_oap.dates.calendar import Calendar
+from hg_oap.dates.calendar_registry import resolve_calendar
+from hg_oap.dates.dgen import DGen
+
+__all__ = ('DayCount',)
+
+
+class DayCount(Enum):
+    """
+    The conventions for the fraction of a year between two dates, used to accrue interest or carry:
+
+    - ``ACT/360``: the days between the dates over 360
+    - ``ACT/365``: the days between the dates over 365 (also known as ACT/365 Fixed)
+    - ``BUS/252``: the business days between the dates over 252, this needs the calendar of the business days
+
+    The fractions are over the dates from the start (inclusive) to the end (exclusive). The array variants take
+    ``numpy.datetime64[D]`` arrays (or anything convertible to them) and compute the fractions of a whole schedule in
+    one call. The calendar can be given by name, see ``get_calendar``.
+    """
+
+    ACT_360 = "ACT/360"
+    ACT_365 = "ACT/365"
+    BUS_252 = "BUS/252"
+
+    @property
+    def basis(self) -> int:
+        """The number of (business) days in a year"""
+        return _BASIS[self]
+
+    def year_fraction(self, start: date, end: date, calendar: Calendar | str = None) -> float:
+        if self is DayCount.BUS_252:
+            return self._calendar(calendar).business_days_between(start, end) / 252
+        return (end - start).days / _BASIS[self]
+
+    def year_fractions(self, starts, ends, calendar: Calendar | str = None):
+        """The year fractions between the starts and the ends, the arrays are broadcast against each other"""
+        import numpy as np
+        starts, ends = np.asarray(starts, dtype='datetime64[D]'), np.asarray(ends, dtype='datetime64[D]')
+        if self is DayCount.BUS_252:
+            return self._calendar(calendar).business_days_between_array(starts, ends) / 252
+        return (ends - starts).astype(np.int64) / _BASIS[self]
+
+    def accrual_fractions(self, schedule, calendar: Calendar | str = None):
+        """
+        The year fractions of the periods between each consecutive pair of dates of the schedule, the schedule is an
+        array or sequence of dates, or a (bounded) date generator
+        """
+        import numpy as np
+        if isinstance(schedule, DGen):
+            schedule = list(schedule())
+        schedule = np.asarray(schedule, dtype='datetime64[D]')
+        return self.year_fractions(schedule[:-1], schedule[1:], calendar)
+
+    def _calendar(self, calendar: Calendar | str | None) -> Calendar:
+        if calendar is None:
+            raise ValueError(f'the {self.value} day count needs a calendar')
+        return resolve_calendar(calendar)
+
+
+_BASIS = {DayCount.ACT_360: 360, DayCount.ACT_365: 365, DayCount.BUS_252: 252}
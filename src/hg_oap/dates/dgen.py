@@ -1,10 +1,12 @@
-from calendar import monthrange
+from calendar import isleap
 from datetime import date, timedelta
 from itertools import islice
 from typing import cast
 
-from hg_oap.dates.calendar import Calendar
-from hg_oap.utils.op import Item, Op, lazy, is_op
+from hg_oap.dates.calendar import Calendar, BusinessDayTable
+from hg_oap.dates.calendar_registry import resolve_calendar
+from hg_oap.dates.date_intervals import DateIntervals
+from hg_oap.utils.op import Item, Op, lazy, is_op, structure
 from hg_oap.dates.tenor import Tenor
 
 __all__ = (
@@ -28,6 +30,8 @@ __all__ = (
     "month_start",
     "month_last_bday",
     "month_first_bday",
+    "BusinessDayLookup",
+    "DGenCursor",
 )
 
 
@@ -115,15 +119,49 @@ class DGen(Item):
     ):
         raise StopIteration
 
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ) -> DateIntervals | None:
+        """
+        The dates ``__invoke__`` generates for the same arguments as ``DateIntervals``, or None if the generator does
+        not describe its dates as runs. The joins, common dates and removal of dates combine the runs of their operands
+        when both have them rather than merging the dates one at a time.
+        """
+        return None
+
     def is_single_date_gen(self):
         return False
 
     def cadence(self):
         return None
 
+    def business_day_calendar(self) -> Calendar | None:
+        """The calendar that all the dates generated are business days of, if known, rolling them has no effect"""
+        return None
+
     def __iter__(self):
         return self
 
+    def __structure__(self) -> tuple:
+        """
+        A hashable description of the generator, generators with the same structure generate the same dates. See
+        ``hg_oap.utils.structurally_equal``
+        """
+        state = self.__getstate__()
+        return (type(self),) + tuple((k, structure(state[k])) for k in sorted(state))
+
+    def __reduce_ex__(self, protocol):
+        # the shared generators (days, months, ...) are pickled by name
+        if (name := _NAMED_DGENS.get(id(self))) is not None:
+            return name
+        return super().__reduce_ex__(protocol)
+
     def __or__(self, other):
         if is_op(other):
             return lazy(self) | other
@@ -202,19 +240,19 @@ class DGen(Item):
         if is_op(other):
             return lazy(self) - other
 
-        try:
-            tenor = Tenor(other)
-            return SubTenorDGen(self, tenor)
-        except:
-            pass
+        if not isinstance(other, (DGen, date)):
+            try:
+                return SubTenorDGen(self, Tenor(other))
+            except ValueError:
+                pass
 
         try:
             gen = make_dgen(other)
-            return RemoveDatesDGen(self, gen)
-        except:
-            pass
-
-        raise ValueError(f"{other} is not a tenor or date generator")
+        except (ValueError, TypeError):
+            gen = None
+        if gen is None:
+            raise ValueError(f"{other} is not a tenor or date generator")
+        return RemoveDatesDGen(self, gen)
 
     def __rsub__(self, other):
         if is_op(other):
@@ -265,6 +303,17 @@ class ConstDGen(DGen):
     ):
         yield self.date
 
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        return DateIntervals.run(self.date, self.date) if type(self.date) is date else None
+
     def __repr__(self):
         return f"'{self.date}'"
 
@@ -284,11 +333,30 @@ class SequenceDGen(DGen):
     ):
         yield from self.dates
 
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        if isinstance(self.dates, (tuple, list)) and all(type(d) is date for d in self.dates):
+            return DateIntervals.of_dates(self.dates)
+
     def __repr__(self):
         dates = ",".join(f"'{d}'" for d in self.dates)
         return f"[{dates}]"
 
 
+def _bound(d, start: date, end: date, after: date, before: date, calendar: Calendar, **kwargs) -> date:
+    """The date bounding a filter, the first date generated when it is a generator"""
+    if is_dgen(d):
+        return next(d.__invoke__log__(start, end, after, before, calendar, **kwargs))
+    return d
+
+
 class AfterDGen(DGen):
     def __init__(self, gen, date):
         self.gen = gen
@@ -306,14 +374,10 @@ class AfterDGen(DGen):
         calendar: Calendar = None,
         **kwargs,
     ):
-        if is_dgen(self.date):
-            after = next(
-                self.date.__invoke__log__(start, end, after, before, calendar, **kwargs)
-            )
-        else:
-            after = self.date
-
-        after = after + timedelta(days=1)
+        after = _bound(self.date, start, end, after, before, calendar, **kwargs) + timedelta(days=1)
+        if (dates := self.gen.__intervals__(start, end, after, before, calendar, **kwargs)) is not None:
+            yield from dates.clip(after=after)
+            return
 
         yield from (
             d
@@ -321,6 +385,19 @@ class AfterDGen(DGen):
             if d >= after
         )
 
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        after = _bound(self.date, start, end, after, before, calendar, **kwargs) + timedelta(days=1)
+        if (dates := self.gen.__intervals__(start, end, after, before, calendar, **kwargs)) is not None:
+            return dates.clip(after=after)
+
     def __bool__(self):
         if is_dgen(self.date):
             self.date.__compared__ = self
@@ -348,12 +425,10 @@ class AfterOrOnDGen(DGen):
         calendar: Calendar = None,
         **kwargs,
     ):
-        if is_dgen(self.date):
-            after = next(
-                self.date.__invoke__log__(start, end, after, before, calendar, **kwargs)
-            )
-        else:
-            after = self.date
+        after = _bound(self.date, start, end, after, before, calendar, **kwargs)
+        if (dates := self.gen.__intervals__(start, end, after, before, calendar, **kwargs)) is not None:
+            yield from dates.clip(after=after)
+            return
 
         yield from (
             d
@@ -361,6 +436,19 @@ class AfterOrOnDGen(DGen):
             if d >= after
         )
 
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        after = _bound(self.date, start, end, after, before, calendar, **kwargs)
+        if (dates := self.gen.__intervals__(start, end, after, before, calendar, **kwargs)) is not None:
+            return dates.clip(after=after)
+
     def __bool__(self):
         if is_dgen(self.date):
             self.date.__compared__ = self
@@ -388,12 +476,10 @@ class BeforeDGen(DGen):
         calendar: Calendar = None,
         **kwargs,
     ):
-        if is_dgen(self.date):
-            before = next(
-                self.date.__invoke__log__(start, end, after, before, calendar, **kwargs)
-            )
-        else:
-            before = self.date
+        before = _bound(self.date, start, end, after, before, calendar, **kwargs)
+        if (dates := self.gen.__intervals__(start, end, after, before, calendar, **kwargs)) is not None:
+            yield from dates.clip(before=before)
+            return
 
         yield from (
             d
@@ -401,6 +487,19 @@ class BeforeDGen(DGen):
             if d < before
         )
 
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        before = _bound(self.date, start, end, after, before, calendar, **kwargs)
+        if (dates := self.gen.__intervals__(start, end, after, before, calendar, **kwargs)) is not None:
+            return dates.clip(before=before)
+
     def __repr__(self):
         return f"'{self.gen}' < {self.date}"
 
@@ -422,14 +521,10 @@ class BeforeOrOnDGen(DGen):
         calendar: Calendar = None,
         **kwargs,
     ):
-        if is_dgen(self.date):
-            before = next(
-                self.date.__invoke__log__(start, end, after, before, calendar, **kwargs)
-            )
-        else:
-            before = self.date
-
-        before = before + timedelta(days=1)
+        before = _bound(self.date, start, end, after, before, calendar, **kwargs) + timedelta(days=1)
+        if (dates := self.gen.__intervals__(start, end, after, before, calendar, **kwargs)) is not None:
+            yield from dates.clip(before=before)
+            return
 
         yield from (
             d
@@ -437,6 +532,19 @@ class BeforeOrOnDGen(DGen):
             if d < before
         )
 
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        before = _bound(self.date, start, end, after, before, calendar, **kwargs) + timedelta(days=1)
+        if (dates := self.gen.__intervals__(start, end, after, before, calendar, **kwargs)) is not None:
+            return dates.clip(before=before)
+
     def __repr__(self):
         return f"'{self.gen}' <= {self.date}"
 
@@ -461,6 +569,17 @@ class EveryDayDGen(DGen):
             yield start
             start += timedelta(days=1)
 
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        return DateIntervals.run(start if start is not date.min else after, end if end is not date.max else before)
+
     def __repr__(self):
         return "days"
 
@@ -491,6 +610,21 @@ class WeekdaysDGen(DGen):
             if d.weekday() not in we
         )
 
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        if not (dates := self.gen.__intervals__(start, end, after, before, calendar, **kwargs)):
+            return dates
+        if _spans_at_most(dates, _MAX_INTERVAL_DAYS):
+            we = calendar.weekend_days() if calendar else (5, 6)
+            return dates & DateIntervals.weekdays(dates.first(), dates.last(), (d for d in range(7) if d not in we))
+
     def __repr__(self):
         return "weekdays"
 
@@ -521,6 +655,21 @@ class WeekendsDGen(DGen):
             if d.weekday() in we
         )
 
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        if not (dates := self.gen.__intervals__(start, end, after, before, calendar, **kwargs)):
+            return dates
+        if _spans_at_most(dates, _MAX_INTERVAL_DAYS):
+            we = calendar.weekend_days() if calendar else (5, 6)
+            return dates & DateIntervals.weekdays(dates.first(), dates.last(), we)
+
     def __repr__(self):
         return "weekends"
 
@@ -528,6 +677,65 @@ class WeekendsDGen(DGen):
 weekends = WeekendsDGen(EveryDayDGen())
 
 
+# the longest range the weekdays and business days are computed over as runs, longer (or unbounded) ranges are left to
+# generate their dates one at a time
+_MAX_INTERVAL_DAYS = 200 * 366
+
+
+def _spans_at_most(dates: DateIntervals, days: int) -> bool:
+    return (dates.last() - dates.first()).days <= days
+
+
+class BusinessDayLookup:
+    """
+    Looks up the business days of a calendar in its ``BusinessDayTable`` (see ``Calendar.business_day_table``), a
+    table covering the date is fetched from the calendar when the date is not in the current one.
+    """
+
+    __slots__ = ("calendar", "table")
+
+    def __init__(self, calendar: Calendar):
+        self.calendar = calendar
+        self.table = None
+
+    @staticmethod
+    def of(calendar: Calendar) -> "BusinessDayLookup | None":
+        """The lookup for the calendar, None if the calendar does not support a business day table"""
+        f = getattr(calendar, "has_business_day_table", None)
+        return BusinessDayLookup(calendar) if f is not None and f() else None
+
+    def table_for(self, d: date) -> BusinessDayTable:
+        if (t := self.table) is None or not t.covers(d):
+            t = self.table = self.calendar.business_day_table(d, d)
+        return t
+
+    def is_business_day(self, d: date) -> bool:
+        if (t := self.table) is None or not (t.start <= d <= t.end):
+            t = self.table_for(d)
+        return t.is_business_day(d)
+
+    def roll_fwd(self, d: date) -> date:
+        if (t := self.table) is None or not (t.start <= d <= t.end):
+            t = self.table_for(d)
+        r = t.roll_fwd(d)
+        return r if r is not None else self.calendar.add_business_days(d, 0)
+
+    def roll_bwd(self, d: date) -> date:
+        if (t := self.table) is None or not (t.start <= d <= t.end):
+            t = self.table_for(d)
+        r = t.roll_bwd(d)
+        return r if r is not None else self.calendar.sub_business_days(d, 0)
+
+    def business_days(self, start: date, end: date):
+        """The business days from start to end, a year at a time"""
+        while start <= end:
+            year_end = min(end, date(start.year, 12, 31))
+            yield from self.table_for(start).business_days(start, year_end)
+            if year_end == date.max:
+                return
+            start = year_end + timedelta(days=1)
+
+
 class BusinessDaysDGen(DGen):
     def __init__(self, gen):
         self.gen = gen
@@ -545,11 +753,42 @@ class BusinessDaysDGen(DGen):
         **kwargs,
     ):
         assert calendar, "Business days calculation requires a calendar"
-        yield from (
-            d
-            for d in self.gen.__invoke__log__(start, end, after, before, calendar, **kwargs)
-            if not calendar.is_holiday_or_weekend(d)
-        )
+        if (lookup := BusinessDayLookup.of(calendar)) is None:
+            yield from (
+                d
+                for d in self.gen.__invoke__log__(start, end, after, before, calendar, **kwargs)
+                if not calendar.is_holiday_or_weekend(d)
+            )
+        elif type(self.gen) is EveryDayDGen:
+            # the same range as EveryDayDGen
+            yield from lookup.business_days(start if start is not date.min else after,
+                                            end if end is not date.max else before)
+        else:
+            yield from (
+                d
+                for d in self.gen.__invoke__log__(start, end, after, before, calendar, **kwargs)
+                if lookup.is_business_day(d)
+            )
+
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        assert calendar, "Business days calculation requires a calendar"
+        if not (dates := self.gen.__intervals__(start, end, after, before, calendar, **kwargs)):
+            return dates
+        first, last = dates.first(), dates.last()
+        if not _spans_at_most(dates, _MAX_INTERVAL_DAYS) \
+                or (table := calendar.business_day_table(first, last)) is None \
+                or not (table.covers(first) and table.covers(last)):
+            return None
+        i = first.toordinal() - table.start.toordinal()
+        return dates & DateIntervals.of_mask(first, table.business[i:i + (last - first).days + 1])
 
     def __repr__(self):
         return "business_days"
@@ -736,6 +975,10 @@ class JoinDGen(DGen):
         calendar: Calendar = None,
         **kwargs,
     ):
+        if (dates := self.__intervals__(start, end, after, before, calendar, **kwargs)) is not None:
+            yield from dates
+            return
+
         g1 = self.gen1.__invoke__log__(start, end, after, before, calendar, **kwargs)
         g2 = self.gen2.__invoke__log__(start, end, after, before, calendar, **kwargs)
 
@@ -761,6 +1004,20 @@ class JoinDGen(DGen):
                 yield d2
                 d2 = next(g2, None)
 
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        if (dates1 := self.gen1.__intervals__(start, end, after, before, calendar, **kwargs)) is None \
+                or (dates2 := self.gen2.__intervals__(start, end, after, before, calendar, **kwargs)) is None:
+            return None
+        return dates1 | dates2
+
     def __repr__(self):
         return f"{self.gen1} | {self.gen2}"
 
@@ -779,6 +1036,10 @@ class CommonDatesDGen(DGen):
         calendar: Calendar = None,
         **kwargs,
     ):
+        if (dates := self.__intervals__(start, end, after, before, calendar, **kwargs)) is not None:
+            yield from dates
+            return
+
         g1 = self.gen1.__invoke__log__(start, end, after, before, calendar, **kwargs)
         g2 = self.gen2.__invoke__log__(start, end, after, before, calendar, **kwargs)
 
@@ -794,6 +1055,20 @@ class CommonDatesDGen(DGen):
             else:
                 d2 = next(g2, None)
 
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        if (dates1 := self.gen1.__intervals__(start, end, after, before, calendar, **kwargs)) is None \
+                or (dates2 := self.gen2.__intervals__(start, end, after, before, calendar, **kwargs)) is None:
+            return None
+        return dates1 & dates2
+
     def __repr__(self):
         return f"{self.gen1} & {self.gen2}"
 
@@ -812,6 +1087,10 @@ class RemoveDatesDGen(DGen):
         calendar: Calendar = None,
         **kwargs,
     ):
+        if (dates := self.__intervals__(start, end, after, before, calendar, **kwargs)) is not None:
+            yield from dates
+            return
+
         g1 = self.gen1.__invoke__log__(start, end, after, before, calendar, **kwargs)
         g2 = self.gen2.__invoke__log__(start, end, after, before, calendar, **kwargs)
 
@@ -831,6 +1110,20 @@ class RemoveDatesDGen(DGen):
                 yield d1
                 d1 = next(g1, None)
 
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        if (dates1 := self.gen1.__intervals__(start, end, after, before, calendar, **kwargs)) is None \
+                or (dates2 := self.gen2.__intervals__(start, end, after, before, calendar, **kwargs)) is None:
+            return None
+        return dates1 - dates2
+
     def __repr__(self):
         return f"{self.gen1} - {self.gen2}"
 
@@ -925,6 +1218,9 @@ class SubSequenceDGen(DGen):
         self.slice = slice
 
     def __getattr__(self, name):
+        if name.startswith("__") or "sub_sequence" not in self.__dict__:
+            # internal state, or the state is not set yet (i.e. when unpickling)
+            raise AttributeError(name)
         if isinstance(pr := getattr(type(self.sub_sequence), name), property):
             return pr.fget(self)
 
@@ -1186,9 +1482,11 @@ class SliceDGen(DGen):
 
 
 class WithCalendarDGen(DGen):
+    """Evaluates the generator over the calendar, the calendar can be given by name (see ``CalendarRegistry``)"""
+
     def __init__(self, gen, calendar):
         self.gen = gen
-        self.calendar = calendar
+        self.calendar = resolve_calendar(calendar)
 
     def cadence(self):
         return self.gen.cadence
@@ -1206,6 +1504,17 @@ class WithCalendarDGen(DGen):
             d for d in self.gen.__invoke__log__(start, end, after, before, self.calendar)
         )
 
+    def __intervals__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        return self.gen.__intervals__(start, end, after, before, self.calendar)
+
     def __repr__(self):
         return f"{self.gen}.over({self.calendar})"
 
@@ -1213,7 +1522,7 @@ class WithCalendarDGen(DGen):
 class RollFwdDGen(DGen):
     def __init__(self, gen, calendar=None):
         self.gen = gen
-        self.calendar = calendar
+        self.calendar = resolve_calendar(calendar)
 
     def cadence(self):
         return self.gen.cadence()
@@ -1221,6 +1530,9 @@ class RollFwdDGen(DGen):
     def is_single_date_gen(self):
         return self.gen.is_single_date_gen()
 
+    def business_day_calendar(self) -> Calendar | None:
+        return self.calendar
+
     def __invoke__(
         self,
         start: date = date.min,
@@ -1232,8 +1544,15 @@ class RollFwdDGen(DGen):
     ):
         c = self.calendar or calendar
         assert c, "Business days calculation requires a calendar"
+        if self.gen.business_day_calendar() is c:
+            yield from self.gen.__invoke__log__(start, end, after, before, calendar, **kwargs)
+            return
+        if (lookup := BusinessDayLookup.of(c)) is not None:
+            roll = lookup.roll_fwd
+        else:
+            roll = lambda d: c.add_business_days(d, 0)
         yield from (
-            c.add_business_days(d, 0)
+            roll(d)
             for d in self.gen.__invoke__log__(start, end, after, before, calendar, **kwargs)
         )
 
@@ -1255,7 +1574,7 @@ def roll_fwd(x, calendar=None):
 class RollBwdDGen(DGen):
     def __init__(self, gen, calendar=None):
         self.gen = gen
-        self.calendar = calendar
+        self.calendar = resolve_calendar(calendar)
 
     def cadence(self):
         return self.gen.cadence()
@@ -1263,6 +1582,9 @@ class RollBwdDGen(DGen):
     def is_single_date_gen(self):
         return self.gen.is_single_date_gen()
 
+    def business_day_calendar(self) -> Calendar | None:
+        return self.calendar
+
     def __invoke__(
         self,
         start: date = date.min,
@@ -1274,8 +1596,15 @@ class RollBwdDGen(DGen):
     ):
         c = self.calendar or calendar
         assert c, "Business days calculation requires a calendar"
+        if self.gen.business_day_calendar() is c:
+            yield from self.gen.__invoke__log__(start, end, after, before, calendar, **kwargs)
+            return
+        if (lookup := BusinessDayLookup.of(c)) is not None:
+            roll = lookup.roll_bwd
+        else:
+            roll = lambda d: c.sub_business_days(d, 0)
         yield from (
-            c.sub_business_days(d, 0)
+            roll(d)
             for d in self.gen.__invoke__log__(start, end, after, before, calendar, **kwargs)
         )
 
@@ -1356,6 +1685,27 @@ class DGenParameter(DGen):
         return self.name
 
 
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _month_end(d: date) -> date:
+    m = d.month
+    return date(d.year, m, 29 if m == 2 and isleap(d.year) else _DAYS_IN_MONTH[m])
+
+
+def _month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def _distinct(dates):
+    """Drops the repeats of the previous date, i.e. the month ends of the days of a month"""
+    last = None
+    for d in dates:
+        if d != last:
+            yield d
+            last = d
+
+
 class MonthEndDgen(DGen):
     def __init__(self, gen):
         self.gen = gen
@@ -1375,8 +1725,8 @@ class MonthEndDgen(DGen):
         calendar: Calendar = None,
         **kwargs,
     ):
-        for d in self.gen.__invoke__log__(start, end, after, before, calendar, **kwargs):
-            yield date(d.year, d.month, monthrange(d.year, d.month)[1])
+        yield from _distinct(_month_end(d) for d in self.gen.__invoke__log__(start, end, after, before, calendar,
+                                                                             **kwargs))
 
     def __repr__(self):
         return f"month_end({self.gen})"
@@ -1389,11 +1739,94 @@ def month_end(x):
         return MonthEndDgen(x)
 
 
+class MonthLastBDayDGen(DGen):
+    """
+    The last business day of the month of each of the dates of the generator. Over ``months`` the month ends are
+    computed in blocks and rolled with the business day table of the calendar, rather than generating each month and
+    rolling it.
+    """
+
+    _last = True
+
+    def __init__(self, gen, calendar=None):
+        self.gen = gen
+        self.calendar = resolve_calendar(calendar)
+
+    def cadence(self):
+        return self.gen.cadence()
+
+    def is_single_date_gen(self):
+        return self.gen.is_single_date_gen()
+
+    def business_day_calendar(self) -> Calendar | None:
+        return self.calendar
+
+    def __invoke__(
+        self,
+        start: date = date.min,
+        end: date = date.max,
+        after: date = date.min,
+        before: date = date.max,
+        calendar: Calendar = None,
+        **kwargs,
+    ):
+        c = self.calendar or calendar
+        assert c, "Business days calculation requires a calendar"
+        if type(self.gen) is MonthsDGen:
+            start = start if start is not date.min else after
+            end = end if end is not date.max else before
+            yield from _distinct(_month_business_days(c, start, end, self._last))
+            return
+
+        lookup = BusinessDayLookup.of(c)
+        if self._last:
+            boundary = _month_end
+            roll = lookup.roll_bwd if lookup is not None else lambda d: c.sub_business_days(d, 0)
+        else:
+            boundary = _month_start
+            roll = lookup.roll_fwd if lookup is not None else lambda d: c.add_business_days(d, 0)
+        yield from _distinct(
+            roll(boundary(d)) for d in self.gen.__invoke__log__(start, end, after, before, calendar, **kwargs)
+        )
+
+    def __repr__(self):
+        name = "month_last_bday" if self._last else "month_first_bday"
+        return f"{name}({self.gen})" if self.calendar is None else f"{name}({self.gen}, {self.calendar})"
+
+
+class MonthFirstBDayDGen(MonthLastBDayDGen):
+    """The first business day of the month of each of the dates of the generator, see ``MonthLastBDayDGen``"""
+
+    _last = False
+
+
+# the number of months of business days computed at a time
+_MONTHS_BLOCK = 120
+
+
+def _month_business_days(calendar: Calendar, start: date, end: date, last: bool):
+    """The last (or first) business days of the months from the month of start to the month of end"""
+    import numpy as np
+    one_month, one_day = np.timedelta64(1, "M"), np.timedelta64(1, "D")
+    month, stop = np.datetime64(_month_start(start), "M"), np.datetime64(end, "M")
+    while month <= stop:
+        block = np.arange(month, min(month + _MONTHS_BLOCK * one_month, stop + one_month))
+        days = (block + one_month).astype("datetime64[D]") - one_day if last else block.astype("datetime64[D]")
+        table = calendar.business_day_table(days[0].item(), days[-1].item())
+        if table is not None and (rolled := table.sub_business_days(days, 0) if last else
+                                  table.add_business_days(days, 0)) is not None:
+            yield from rolled.tolist()
+        else:
+            roll = calendar.sub_business_days if last else calendar.add_business_days
+            yield from (roll(d, 0) for d in days.tolist())
+        month = block[-1] + one_month
+
+
 def month_last_bday(x, calendar=None):
     if is_op(x) or is_op(calendar):
         return lazy(month_last_bday)(x, calendar)
     else:
-        return roll_bwd(month_end(x), calendar)
+        return MonthLastBDayDGen(x, calendar)
 
 
 class MonthStartDgen(MonthsDGen):
@@ -1412,8 +1845,8 @@ class MonthStartDgen(MonthsDGen):
         calendar: Calendar = None,
         **kwargs,
     ):
-        for d in self.gen.__invoke__log__(start, end, after, before, calendar, **kwargs):
-            yield date(d.year, d.month, 1)
+        yield from _distinct(_month_start(d) for d in self.gen.__invoke__log__(start, end, after, before, calendar,
+                                                                               **kwargs))
 
     def __repr__(self):
         return f"month_start({self.gen})"
@@ -1430,4 +1863,76 @@ def month_first_bday(x, calendar=None):
     if is_op(x) or is_op(calendar):
         return lazy(month_first_bday)(x, calendar)
     else:
-        return roll_fwd(month_start(x), calendar)
+        return MonthFirstBDayDGen(x, calendar)
+
+
+class DGenCursor:
+    """
+    The dates of a generator in order, for code (such as the nodes of a graph) that repeatedly asks for the next date
+    after a date that moves forward. The generator is kept running between the calls rather than started again from
+    the date each time, it is only restarted when the date moves back or jumps far (more than ``RESTART_DAYS`` past the
+    next date) ahead.
+    """
+
+    RESTART_DAYS = 31
+
+    __slots__ = ("gen", "calendar", "kwargs", "_dates", "_after", "_next")
+
+    def __init__(self, gen: DGen, calendar: Calendar | str = None, **kwargs):
+        self.gen = gen
+        self.calendar = resolve_calendar(calendar)
+        self.kwargs = kwargs
+        self._dates = None  # the running generator
+        self._after = None  # the date the cursor is at, the dates are generated after it
+        self._next = None  # the first date generated after the cursor, None once the generator is exhausted
+
+    def next_after(self, d: date | str) -> date | None:
+        """Moves the cursor to the date, the result is the first date generated after it (None if there are none)"""
+        d = make_date(d)
+        if self._dates is None or (self._after is not None and d < self._after) \
+                or (self._next is not None and (d - self._next).days > self.RESTART_DAYS):
+            self._start(d)
+        else:
+            self._after = d
+            n = self._next
+            while n is not None and n <= d:
+                n = next(self._dates, None)
+            self._next = n
+        return self._next
+
+    def peek(self) -> date | None:
+        """The date ``next_after`` returned last, the first date generated if the cursor has not been moved"""
+        if self._dates is None:
+            self._start(self._after)
+        return self._next
+
+    def _start(self, d: date | None):
+        self._after = d
+        if d is None:
+            self._dates = self.gen.__invoke__log__(calendar=self.calendar, **self.kwargs)
+        elif d < date.max:
+            self._dates = self.gen.__invoke__log__(after=d + timedelta(days=1), calendar=self.calendar, **self.kwargs)
+        else:
+            self._dates = iter(())
+        n = next(self._dates, None)
+        while n is not None and d is not None and n <= d:
+            n = next(self._dates, None)
+        self._next = n
+
+    def __repr__(self):
+        return f"DGenCursor({self.gen}, after={self._after})"
+
+
+_NAMED_DGENS = {
+    id(g): n
+    for n, g in (
+        ("days", days),
+        ("weekdays", weekdays),
+        ("weekends", weekends),
+        ("business_days", business_days),
+        ("weeks", weeks),
+        ("months", months),
+        ("quarters", quarters),
+        ("years", years),
+    )
+}
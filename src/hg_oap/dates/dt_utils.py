@@ -1,19 +1,143 @@
-from datetime import date, datetime
+from calendar import isleap
+from datetime import date, datetime, time, timedelta, tzinfo
 from zoneinfo import ZoneInfo
 
-__all__ = ("UTC", "date_tz_to_utc", "date_time_utc_to_tz")
+__all__ = ("UTC", "date_tz_to_utc", "date_time_utc_to_tz", "start_of_day_offsets", "dates_tz_to_utc",
+           "date_times_utc_to_tz", "dates_time_tz_to_utc")
 
 UTC = ZoneInfo("UTC")
 
+_ONE_DAY = timedelta(days=1)
+
+
+class _StartOfDayOffsets:
+    """The UTC offsets at the start (local midnight) of each day of a year in a time-zone"""
+
+    __slots__ = ("base", "offsets", "seconds", "array")
+
+    def __init__(self, tz: tzinfo, year: int):
+        import numpy as np
+        self.base = date(year, 1, 1).toordinal()
+        midnight = time()
+        self.offsets = [datetime.combine(date.fromordinal(self.base + i), midnight, tzinfo=tz).utcoffset()
+                        for i in range(366 if isleap(year) else 365)]
+        self.seconds = [o // timedelta(seconds=1) for o in self.offsets]
+        self.array = np.array(self.seconds, dtype=np.int64)
+
+
+# the offsets of the years of the time-zones, the DST rules are only evaluated once for each day
+_OFFSETS: dict[tuple[tzinfo, int], _StartOfDayOffsets] = {}
+
+
+def _offsets(tz: tzinfo, year: int) -> _StartOfDayOffsets:
+    if (o := _OFFSETS.get((tz, year))) is None:
+        o = _OFFSETS[(tz, year)] = _StartOfDayOffsets(tz, year)
+    return o
+
+
+def _start_of_day(dt: date, tz: tzinfo) -> tuple[datetime, timedelta]:
+    o = _OFFSETS.get((tz, dt.year)) or _offsets(tz, dt.year)
+    offset = o.offsets[dt.toordinal() - o.base]
+    return datetime(dt.year, dt.month, dt.day) - offset, offset
+
+
 def date_tz_to_utc(dt: date, tz: ZoneInfo) -> datetime:
     """
     Provide the UTC ``datetime`` for a date given the tz info provided.
     """
-    local = datetime.combine(dt, datetime.min.time(), tzinfo=tz)
-    result = local.astimezone(UTC)
-    return result.replace(tzinfo=None)
+    return _start_of_day(dt, tz)[0]
+
 
 def date_time_utc_to_tz(dt: datetime, tz: ZoneInfo) -> date:
     """Returns the date represented by this dt (as UTC) in the tz provided."""
+    if dt.tzinfo is not None:
+        dt = dt.replace(tzinfo=None)
+    o = _OFFSETS.get((tz, dt.year)) or _offsets(tz, dt.year)
+    seconds = o.seconds
+    i = dt.toordinal() - o.base
+    offset = seconds[i]
+    # the day of the local date in the year, when the offset is the same all day it is the local date
+    j = i + (dt.hour * 3600 + dt.minute * 60 + dt.second + offset) // 86400
+    if 0 <= j < len(seconds) - 1 and seconds[j] == offset and seconds[j + 1] == offset:
+        return date.fromordinal(o.base + j)
+
+    d = dt.date()
+    # the date in the time-zone is the day before, the same day or the day after the date in UTC
+    start, offset = _start_of_day(d, tz)
+    if dt < start:
+        d -= _ONE_DAY
+        start, offset = _start_of_day(d, tz)
+    else:
+        next_start, next_offset = _start_of_day(d + _ONE_DAY, tz)
+        if dt >= next_start:
+            d += _ONE_DAY
+            start, offset = next_start, next_offset
+    if _start_of_day(d + _ONE_DAY, tz)[1] == offset:
+        return d
+    # the offset changes during the day, for example when the clocks go back at midnight
     return dt.replace(tzinfo=UTC).astimezone(tz).date()
 
+
+def start_of_day_offsets(tz: ZoneInfo, start: date, end: date):
+    """
+    The UTC offsets (as ``numpy.timedelta64[s]``) at the start of each of the days from ``start`` to ``end``
+    (inclusive) in the time-zone. The offsets are computed once for each year of a time-zone and kept.
+    """
+    import numpy as np
+    seconds = [_offsets(tz, y).array for y in range(start.year, end.year + 1)]
+    i = start.toordinal() - date(start.year, 1, 1).toordinal()
+    seconds = seconds[0] if len(seconds) == 1 else np.concatenate(seconds)
+    return seconds[i:i + (end - start).days + 1].astype('timedelta64[s]')
+
+
+def dates_tz_to_utc(dates, tz: ZoneInfo):
+    """``date_tz_to_utc`` over an array of dates (``numpy.datetime64[D]``), the result is ``numpy.datetime64[us]``"""
+    import numpy as np
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    if dates.size == 0:
+        return dates.astype('datetime64[us]')
+    first = dates.min()
+    offsets = start_of_day_offsets(tz, first.item(), dates.max().item())
+    return dates.astype('datetime64[us]') - offsets[(dates - first).astype(np.int64)]
+
+
+def dates_time_tz_to_utc(dates, time_of_day: time, tz: ZoneInfo):
+    """
+    The UTC times (``numpy.datetime64[us]``) of the time of day in the time-zone on each of the dates
+    (``numpy.datetime64[D]``)
+    """
+    import numpy as np
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    if dates.size == 0:
+        return dates.astype('datetime64[us]')
+    first = dates.min()
+    offsets = start_of_day_offsets(tz, first.item(), (dates.max() + np.timedelta64(1, 'D')).item())
+    i = (dates - first).astype(np.int64)
+    since_midnight = datetime.combine(date.min, time_of_day) - datetime.min
+    result = dates.astype('datetime64[us]') + np.timedelta64(since_midnight, 'us') - offsets[i]
+    # the days where the offset changes during the day are converted one at a time
+    for j in np.flatnonzero(offsets[i] != offsets[i + 1]).tolist():
+        result.flat[j] = datetime.combine(dates.flat[j].item(), time_of_day, tzinfo=tz).astimezone(UTC) \
+            .replace(tzinfo=None)
+    return result
+
+
+def date_times_utc_to_tz(date_times, tz: ZoneInfo):
+    """
+    ``date_time_utc_to_tz`` over an array of (UTC) date-times (``numpy.datetime64``), the result is
+    ``numpy.datetime64[D]``
+    """
+    import numpy as np
+    date_times = np.asarray(date_times, dtype='datetime64[us]')
+    if date_times.size == 0:
+        return date_times.astype('datetime64[D]')
+    days = date_times.astype('datetime64[D]')
+    first, last = days.min() - np.timedelta64(1, 'D'), days.max() + np.timedelta64(2, 'D')
+    offsets = start_of_day_offsets(tz, first.item(), last.item())
+    starts = np.arange(first, last + np.timedelta64(1, 'D')).astype('datetime64[us]') - offsets
+    i = np.searchsorted(starts, date_times.ravel(), 'right') - 1
+    result = first + i.astype('timedelta64[D]')
+    # the days where the offset changes during the day are converted one at a time
+    for j in np.flatnonzero(offsets[i] != offsets[i + 1]).tolist():
+        result[j] = date_time_utc_to_tz(date_times.ravel()[j].item(), tz)
+    return result.reshape(date_times.shape)
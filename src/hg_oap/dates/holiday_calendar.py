@@ -0,0 +1,251 @@
+import json
+import os
+from datetime import date
+from pathlib import Path
+from typing import Callable, Iterable, ClassVar, Tuple, Sequence
+
+from hg_oap.dates.calendar import HolidayCalendar
+
+__all__ = ('LazyHolidayCalendar', 'HolidayCalendarRegistry', 'holiday_calendar', 'country_holidays_loader',
+           'financial_holidays_loader')
+
+
+HOLIDAYS_LOADER = Callable[[Tuple[int, ...]], Iterable[date]]
+
+
+def country_holidays_loader(country: str, subdiv: str = None) -> HOLIDAYS_LOADER:
+    """A loader of the holidays of the country (and subdivision) from the ``holidays`` package"""
+    def load(years: Tuple[int, ...]) -> Iterable[date]:
+        import holidays
+        return holidays.country_holidays(country=country, subdiv=subdiv, years=years).keys()
+
+    return load
+
+
+def financial_holidays_loader(market: str) -> HOLIDAYS_LOADER:
+    """A loader of the holidays of the financial market (i.e. "XNYS" or "ECB") from the ``holidays`` package"""
+    def load(years: Tuple[int, ...]) -> Iterable[date]:
+        import holidays
+        return holidays.financial_holidays(market, years=years).keys()
+
+    return load
+
+
+class LazyHolidayCalendar(HolidayCalendar):
+    """
+    A holiday calendar that loads the holidays of a year from the ``HolidayCalendarRegistry`` the first time a date in
+    the year is looked at. The years are loaded in blocks when adding or subtracting business days, so that a long
+    step only loads its holidays once.
+    """
+
+    def __init__(self, name: str, weekend_days: Tuple[int, ...] = (5, 6), registry: "HolidayCalendarRegistry" = None):
+        super().__init__(holidays=(), weekend_days=weekend_days)
+        self.name = name
+        self._registry = registry
+        self._years = set()
+
+    def _load(self, start_year: int, end_year: int) -> bool:
+        """Loads the holidays of the years in the range (inclusive), returns True if any year was loaded"""
+        years = tuple(y for y in range(max(start_year, date.min.year), min(end_year, date.max.year) + 1)
+                      if y not in self._years)
+        if not years:
+            return False
+        registry = HolidayCalendarRegistry.instance() if self._registry is None else self._registry
+        for holidays in registry.holidays(self.name, years).values():
+            self._holidays_set.update(holidays)
+        self._holidays = tuple(sorted(h for h in self._holidays_set if h.weekday() not in self._weekend_days))
+        self._years.update(years)
+        return True
+
+    def is_holiday(self, d: date) -> bool:
+        if d.year not in self._years:
+            self._load(d.year, d.year)
+        return d in self._holidays_set
+
+    def add_business_days(self, d: date, days: int):
+        if days < 0: return self.sub_business_days(d, -days)
+
+        self._load(d.year, _shift(d, 2 * days + 14).year)
+        while True:
+            r = super().add_business_days(d, days)
+            if not self._load(d.year, r.year):
+                return r
+
+    def sub_business_days(self, d: date, days: int):
+        if days < 0: return self.add_business_days(d, -days)
+
+        self._load(_shift(d, -2 * days - 14).year, d.year)
+        while True:
+            r = super().sub_business_days(d, days)
+            if not self._load(r.year, d.year):
+                return r
+
+    def _holidays_between(self, start: date, end: date) -> Sequence[date]:
+        self._load(start.year, end.year)
+        return super()._holidays_between(start, end)
+
+    def __repr__(self):
+        return f"holiday_calendar('{self.name}')"
+
+    def __reduce__(self):
+        return holiday_calendar, (self.name,)
+
+
+def _shift(d: date, days: int) -> date:
+    return date.fromordinal(min(max(d.toordinal() + days, 1), date.max.toordinal()))
+
+
+class HolidayCalendarRegistry:
+    """
+    The named holiday calendars of the process. Each calendar is built once, on first use, and loads its holidays a
+    year at a time. The holidays computed by the loaders are kept in a cache file (one per version of the ``holidays``
+    package, as its rules change between versions) so that they are only computed once rather than on each start of
+    the process.
+
+    The cache is kept in the directory given by the ``HG_OAP_CACHE_DIR`` environment variable, or ``~/.cache/hg_oap``,
+    it is not used when the ``cache_dir`` is ``False``. As the cache is keyed by the version of the ``holidays``
+    package, calendars whose loaders do not only depend on it should be registered with ``persist=False``.
+    """
+
+    __instance__: ClassVar["HolidayCalendarRegistry"] = None
+
+    def __init__(self, cache_dir: Path | str | bool = None):
+        if cache_dir is None:
+            cache_dir = Path(os.environ.get("HG_OAP_CACHE_DIR", Path.home() / ".cache" / "hg_oap"))
+        self.cache_dir = Path(cache_dir) if cache_dir is not False else None
+        self._loaders: dict[str, tuple[HOLIDAYS_LOADER, Tuple[int, ...], bool]] = {}
+        self._calendars: dict[str, LazyHolidayCalendar] = {}
+        self._holidays: dict[str, dict[int, tuple[date, ...]]] = {}
+        self._cache: dict[str, dict[str, list[int]]] | None = None
+
+        self.register("LME", country_holidays_loader("GB"))
+
+    @staticmethod
+    def instance() -> "HolidayCalendarRegistry":
+        if HolidayCalendarRegistry.__instance__ is None:
+            HolidayCalendarRegistry.__instance__ = HolidayCalendarRegistry()
+        return HolidayCalendarRegistry.__instance__
+
+    def make_current(self):
+        """Makes this the registry of the process, replacing the current one"""
+        HolidayCalendarRegistry.__instance__ = self
+
+    def __enter__(self):
+        self._previous = HolidayCalendarRegistry.__instance__
+        self.make_current()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        HolidayCalendarRegistry.__instance__ = self._previous
+
+    def register(self, name: str, loader: HOLIDAYS_LOADER, weekend_days: Tuple[int, ...] = (5, 6),
+                 persist: bool = True):
+        """
+        Registers the loader of the holidays of the named calendar, the loader is called with the years to load and
+        returns the holiday dates in those years.
+        """
+        self._loaders[name] = (loader, tuple(weekend_days), persist)
+        self._calendars.pop(name, None)
+        self._holidays.pop(name, None)
+
+    def calendar(self, name: str) -> LazyHolidayCalendar:
+        """
+        The named calendar. Calendars that are not registered are taken to be the country codes (with an optional
+        subdivision, i.e. "US-NY") or financial markets of the ``holidays`` package, and "A+B" is the union of the
+        calendars A and B.
+        """
+        if (c := self._calendars.get(name)) is None:
+            self._ensure_registered(name)
+            c = self._calendars[name] = LazyHolidayCalendar(name, self._loaders[name][1], registry=self)
+        return c
+
+    def _ensure_registered(self, name: str):
+        if name in self._loaders:
+            return
+        if "+" in name:
+            parts = name.split("+")
+            for p in parts:
+                self._ensure_registered(p)
+            weekend_days = tuple(sorted({w for p in parts for w in self._loaders[p][1]}))
+            loader = lambda years: {d for p in parts for dates in self.holidays(p, years).values() for d in dates}
+            # the parts are cached, so the union is not
+            self.register(name, loader, weekend_days, persist=False)
+            return
+
+        import holidays
+        country, _, subdiv = name.partition("-")
+        if country in holidays.list_supported_countries():
+            self.register(name, country_holidays_loader(country, subdiv or None))
+        elif name in holidays.list_supported_financial():
+            self.register(name, financial_holidays_loader(name))
+        else:
+            raise ValueError(f"No holiday calendar is registered as '{name}'")
+
+    def holidays(self, name: str, years: Iterable[int]) -> dict[int, tuple[date, ...]]:
+        """The holidays of the named calendar in each of the years"""
+        years = tuple(years)
+        self._ensure_registered(name)
+        loader, _, persist = self._loaders[name]
+        loaded = self._holidays.setdefault(name, {})
+        missing = [y for y in years if y not in loaded]
+
+        if missing and persist:
+            cached = self._read_cache().get(name, {})
+            for y in missing:
+                if (ordinals := cached.get(str(y))) is not None:
+                    loaded[y] = tuple(date.fromordinal(o) for o in ordinals)
+            missing = [y for y in missing if y not in loaded]
+
+        if missing:
+            by_year = {y: [] for y in missing}
+            for d in loader(tuple(missing)):
+                if d.year in by_year:
+                    by_year[d.year].append(d)
+            for y, dates in by_year.items():
+                loaded[y] = tuple(sorted(dates))
+            if persist:
+                self._write_cache(name, {y: loaded[y] for y in missing})
+
+        return {y: loaded[y] for y in years}
+
+    def _cache_path(self) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        import holidays
+        return self.cache_dir / f"holidays-{holidays.__version__}.json"
+
+    def _read_cache(self) -> dict[str, dict[str, list[int]]]:
+        if self._cache is None:
+            self._cache = _read_json(self._cache_path())
+        return self._cache
+
+    def _write_cache(self, name: str, holidays: dict[int, tuple[date, ...]]):
+        if (path := self._cache_path()) is None:
+            return
+        # merge with the file as written by other processes since it was read
+        cache = _read_json(path)
+        for n, years in self._read_cache().items():
+            cache.setdefault(n, {}).update(years)
+        self._cache = cache
+        cache.setdefault(name, {}).update({str(y): [d.toordinal() for d in dates] for y, dates in holidays.items()})
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(cache))
+            os.replace(tmp, path)
+        except OSError:
+            pass  # the cache is an optimisation, the holidays are computed again if it cannot be written
+
+
+def _read_json(path: Path | None) -> dict:
+    if path is None:
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def holiday_calendar(name: str) -> LazyHolidayCalendar:
+    """The named holiday calendar from the registry of the process, see ``HolidayCalendarRegistry``"""
+    return HolidayCalendarRegistry.instance().calendar(name)
@@ -1,37 +1,74 @@
 import re
 from calendar import monthrange
 from datetime import timedelta, date
+from typing import ClassVar
 
 __all__ = ('Tenor',)
 
 
+_TENOR_RE = re.compile(r"^(-)?(?:(?:(\d+)y)?(?:(\d+)m)?(?:(\d+)w)?(?:(\d+)d)?|(?:(\d+)b)?)$")
+_UNITS = {u: i for i, u in enumerate("ymwdb")}
+
+
 class Tenor:
+    """
+    A period of years, months, weeks, days or business days. Tenors are immutable values and are interned, there is
+    one instance per distinct period, and the strings the tenors are created from are kept in a cache so creating a
+    tenor from a string, i.e. ``Tenor("3m")``, only parses the string the first time.
+    """
+
+    __slots__ = ('ymwd_b',)
+
     ymwd_b: tuple[int, int, int, int, int]
 
-    def __init__(self, tenor=None, /, *, y=0, m=0, w=0, d=0, b=0):
-        if tenor is not None:
-            assert not any((y, m, w, d, b)), 'cannot specify both a tenor and individual components'
-
-            if type(tenor) is str:
-                if m := re.match(r"^(-)?(?:(?:(\d+)y)?(?:(\d+)m)?(?:(\d+)w)?(?:(\d+)d)?|(?:(\d+)b)?)$", tenor):
-                    sign, y, m, w, d, b = m.groups()
-                    s, y, m, w, d, b = not sign, int(y or 0), int(m or 0), int(w or 0), int(d or 0), int(b or 0)
-                    if sign:
-                        y, m, w, d, b = -y, -m, -w, -d, -b
-
-                    self.ymwd_b = (y, m, w, d, b)
-                else:
-                    raise ValueError(f'"{tenor}" is a invalid tenor string')
-            elif type(tenor) is Tenor:
-                self.ymwd_b = tenor.ymwd_b
-            elif type(tenor) is timedelta:
-                self.ymwd_b = (0, 0, 0, tenor.days, 0)
-            elif type(tenor) is tuple and len(tenor) == 5 and all(isinstance(i, int) for i in tenor):
-                self.ymwd_b = tenor
-            else:
-                raise ValueError(f'"{tenor}" is a invalid tenor value')
-        else:
-            self.ymwd_b = (y, m, w, d, b)
+    _interned: ClassVar[dict[tuple[int, int, int, int, int], "Tenor"]] = {}
+    _parsed: ClassVar[dict[str, "Tenor"]] = {}
+
+    def __new__(cls, tenor=None, /, *, y=0, m=0, w=0, d=0, b=0):
+        if tenor is None:
+            return cls._intern((y, m, w, d, b))
+
+        assert not (y or m or w or d or b), 'cannot specify both a tenor and individual components'
+        if type(tenor) is Tenor:
+            return tenor
+        if type(tenor) is not str:
+            return cls._intern(_parse(tenor))
+        if (t := cls._parsed.get(tenor)) is None:
+            if len(cls._parsed) >= _MAX_PARSED:
+                cls._parsed.clear()
+            t = cls._parsed[tenor] = cls._intern(_parse(tenor))
+        return t
+
+    @classmethod
+    def _intern(cls, ymwd_b: tuple[int, int, int, int, int]) -> "Tenor":
+        if (t := cls._interned.get(ymwd_b)) is None:
+            t = object.__new__(cls)
+            object.__setattr__(t, 'ymwd_b', ymwd_b)
+            cls._interned[ymwd_b] = t
+        return t
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"Tenor is immutable, cannot set '{key}'")
+
+    def __delattr__(self, key):
+        raise AttributeError(f"Tenor is immutable, cannot delete '{key}'")
+
+    def __eq__(self, other):
+        if type(other) is Tenor:
+            return self.ymwd_b == other.ymwd_b
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.ymwd_b)
+
+    def __reduce__(self):
+        return Tenor, (self.ymwd_b,)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __str__(self):
         s = sum(self.ymwd_b)
@@ -44,6 +81,9 @@ class Tenor:
     def __repr__(self):
         return f'"{str(self)}"'
 
+    def __structure__(self):
+        return Tenor, self.ymwd_b
+
     def is_neg(self):
         return sum(self.ymwd_b) < 0
 
@@ -98,3 +138,111 @@ class Tenor:
             raise ValueError('cannot subtract business days tenors without a calendar')
         else:
             return calendar.sub_business_days(dt, self.ymwd_b[-1])
+
+    def add_to_array(self, dates, calendar = None):
+        """
+        ``add_to`` over an array of dates, the dates are a ``numpy.datetime64[D]`` array (or anything convertible to
+        one) and the result is an array of the same shape. Business days tenors need a calendar, the calendars that
+        provide a ``business_day_table`` are stepped in bulk, others a date at a time.
+        """
+        if self.is_neg():
+            return self.__neg__().sub_from_array(dates, calendar)
+
+        import numpy as np
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        y, m, w, d, b = self.ymwd_b
+        if b == 0:  # not a business days tenor
+            return _in_range(_add_months(dates, y * 12 + m) + np.timedelta64(w * 7 + d, 'D'))
+        elif calendar is None:
+            raise ValueError('cannot add business days tenors without a calendar')
+        else:
+            return _add_business_days(dates, b, calendar)
+
+    def sub_from_array(self, dates, calendar = None):
+        """``sub_from`` over an array of dates, see ``add_to_array``"""
+        if self.is_neg():
+            return self.__neg__().add_to_array(dates, calendar)
+
+        import numpy as np
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        y, m, w, d, b = self.ymwd_b
+        if b == 0:  # not a business days tenor
+            return _in_range(_add_months(dates, -y * 12 - m) - np.timedelta64(w * 7 + d, 'D'))
+        elif calendar is None:
+            raise ValueError('cannot subtract business days tenors without a calendar')
+        else:
+            return _add_business_days(dates, -b, calendar)
+
+
+# the number of tenor strings kept parsed, the cache is cleared when full
+_MAX_PARSED = 4096
+
+
+def _parse(tenor) -> tuple[int, int, int, int, int]:
+    if type(tenor) is str:
+        if len(tenor) >= 2 and (unit := _UNITS.get(tenor[-1])) is not None and tenor[:-1].isdecimal():
+            # the common single unit tenors, i.e. "3m" or "1b"
+            ymwd_b = [0, 0, 0, 0, 0]
+            ymwd_b[unit] = int(tenor[:-1])
+            return tuple(ymwd_b)
+        if m := _TENOR_RE.match(tenor):
+            sign, y, m, w, d, b = m.groups()
+            y, m, w, d, b = int(y or 0), int(m or 0), int(w or 0), int(d or 0), int(b or 0)
+            if sign:
+                y, m, w, d, b = -y, -m, -w, -d, -b
+            return y, m, w, d, b
+        raise ValueError(f'"{tenor}" is a invalid tenor string')
+    elif type(tenor) is timedelta:
+        return 0, 0, 0, tenor.days, 0
+    elif type(tenor) is tuple and len(tenor) == 5 and all(isinstance(i, int) for i in tenor):
+        return tenor
+    else:
+        raise ValueError(f'"{tenor}" is a invalid tenor value')
+
+
+def _add_months(dates, months: int):
+    """Moves the dates by the months, the days past the end of the month are moved back to the last day of the month"""
+    if months == 0:
+        return dates
+    import numpy as np
+    month = dates.astype('datetime64[M]')
+    day = dates - month.astype('datetime64[D]')
+    month = month + np.timedelta64(months, 'M')
+    last = (month + np.timedelta64(1, 'M')).astype('datetime64[D]') - np.timedelta64(1, 'D')
+    return np.minimum(month.astype('datetime64[D]') + day, last)
+
+
+def _in_range(dates):
+    import numpy as np
+    if dates.size and (dates.min() < np.datetime64(date.min) or dates.max() > np.datetime64(date.max)):
+        raise OverflowError('date value out of range')
+    return dates
+
+
+def _add_business_days(dates, days: int, calendar):
+    """Adds (or subtracts if negative) the business days to the dates, using the calendar's table when it has one"""
+    import numpy as np
+    if dates.size == 0:
+        return dates.copy()
+
+    start, end = dates.min().item(), dates.max().item()
+    margin = 2 * abs(days) + 14
+    while True:
+        if days >= 0:
+            table = calendar.business_day_table(start, _shift(end, margin))
+        else:
+            table = calendar.business_day_table(_shift(start, -margin), end)
+        if table is None:
+            break
+        if (r := table.add_business_days(dates, days)) is not None:
+            return r.reshape(dates.shape)
+        if (table.end == date.max) if days >= 0 else (table.start == date.min):
+            break  # the dates cannot be stepped in the table, add_business_days raises the error
+        margin *= 2
+
+    step = calendar.add_business_days if days >= 0 else calendar.sub_business_days
+    return np.array([step(d, abs(days)) for d in dates.ravel().tolist()], dtype='datetime64[D]').reshape(dates.shape)
+
+
+def _shift(d: date, days: int) -> date:
+    return date.fromordinal(min(max(d.toordinal() + days, 1), date.max.toordinal()))
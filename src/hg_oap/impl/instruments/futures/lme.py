@@ -7,26 +7,29 @@ The following items are important to deal with when implementing LME Futures:
 """
 from datetime import date, timedelta
 
-import holidays
-
-from hg_oap.dates import HolidayCalendar, DGen, Calendar
+from hg_oap.dates import LazyHolidayCalendar, DGen, Calendar, holiday_calendar, BusinessDayLookup
 from hg_oap.utils import is_op, lazy
 
 
-class LmeTradingHolidayCalendar(HolidayCalendar):
+class LmeTradingHolidayCalendar(LazyHolidayCalendar):
+    """
+    The LME trading calendar, this is the "LME" calendar of the ``HolidayCalendarRegistry``. For now this is set up
+    using the UK holidays in the holidays package, the holidays of a year are loaded when first needed.
+    Prefer ``holiday_calendar("LME")``, which is built once for the process.
+    """
+
     def __init__(self):
-        super().__init__(holidays=frozenset(
-            holidays.country_holidays(country="GB", years=[1990 + i for i in range(date.today().year - 1990 + 10)]),
-        ))
-        # Get 10 years of UK holidays plus time from 1990
-        # For now we just setup the calendar using the UK holidays in the holidays package.
+        super().__init__("LME")
+
+    def __reduce__(self):
+        return LmeTradingHolidayCalendar, ()
 
 
 class LmeRollDGen(DGen):
 
     def __init__(self, gen, calendar=None):
         self.gen = gen
-        self.calendar = LmeTradingHolidayCalendar() if calendar is None else calendar
+        self.calendar = holiday_calendar("LME") if calendar is None else calendar
 
     def cadence(self):
         return self.gen.cadence()
@@ -45,12 +48,13 @@ class LmeRollDGen(DGen):
     ):
         c = self.calendar or calendar
         assert c, "Business days calculation requires a calendar"
+        lookup = BusinessDayLookup.of(self.calendar)
         yield from (
-            self._roll(d)
+            self._roll(d, lookup)
             for d in self.gen.__invoke__log__(start, end, after, before, calendar, **kwargs)
         )
 
-    def _roll(self, d: date):
+    def _roll(self, d: date, lookup: BusinessDayLookup = None):
         """
         From LME Trading Rules:
         If the current date is not a business day, the prompt date is the next business day, unless:
@@ -67,6 +71,16 @@ class LmeRollDGen(DGen):
         calendar month after the contract was made, then the roll should be to the last business day of the third month.
         """
         # TODO: Test this actually does what the rules stipulate
+        if lookup is not None:
+            # the nearest business day, forward first, where only the forward roll is restricted to the month
+            if (fwd := lookup.roll_fwd(d)) == d:
+                return d
+            bwd = lookup.table_for(d).roll_bwd(d)
+            if fwd.month == d.month and (bwd is None or fwd - d <= d - bwd):
+                return fwd
+            if bwd is not None:
+                return bwd
+
         count = 0
         while True:
             dt = d + timedelta(days=count)
@@ -1,15 +1,17 @@
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Generic, TypeVar
 
 from hgraph import TimeSeriesSchema, TS, TSS, CompoundScalar, TSD, TSB, reference_service
 
+from hg_oap.assets.currency import Currency
 from hg_oap.orders.order_type import OrderType, MultiLegOrderType, SingleLegOrderType
 from hg_oap.pricing.price import Price
 from hg_oap.units.quantity import Quantity
 
 __all__ = (
-    'ORDER', 'LEG_ID', 'OriginatorInfo', 'Fill', 'Order', 'SingleLegOrder', 'MultiLegOrder', 'OrderState',
-    'order_states')
+    'ORDER', 'LEG_ID', 'OriginatorInfo', 'Fill', 'FillAccumulator', 'Order', 'SingleLegOrder', 'MultiLegOrder',
+    'OrderState', 'order_states')
 
 
 @dataclass
@@ -39,6 +41,48 @@ class Fill(CompoundScalar):
     additional_ids: tuple[str, ...] = tuple()
 
 
+class FillAccumulator:
+    """
+    Keeps the running totals of the fills received on a single leg. The totals are held as raw floats in the unit of
+    the leg's quantity and the currency of the leg's notional, so applying a fill does not create any ``Quantity`` or
+    ``Price`` instances. Fills in a different (but convertible) unit are converted into the leg's unit, fills in a
+    different currency are rejected.
+    """
+
+    __slots__ = ("unit", "currency", "filled_qty", "remaining_qty", "filled_notional", "fill_count", "last_fill_time")
+
+    def __init__(self, quantity: Quantity, currency: Currency):
+        self.unit = quantity.unit
+        self.currency = currency
+        self.filled_qty: float = 0.0
+        self.remaining_qty: float = quantity.qty
+        self.filled_notional: float = 0.0
+        self.fill_count: int = 0
+        self.last_fill_time: datetime | None = None
+
+    @property
+    def avg_fill_price(self) -> float:
+        """The volume weighted average fill price (notional / qty), NaN if nothing has been filled yet"""
+        return self.filled_notional / self.filled_qty if self.filled_qty else float("nan")
+
+    @property
+    def is_filled(self) -> bool:
+        return self.remaining_qty <= 0.0
+
+    def add(self, fill: Fill, when: datetime):
+        """Apply the fill received at ``when`` to the running totals"""
+        qty = fill.qty
+        q = qty.qty if qty.unit is self.unit else qty.unit.convert(qty.qty, to=self.unit)
+        notional = fill.notional
+        if notional.currency is not self.currency and notional.currency != self.currency:
+            raise ValueError(f"Cannot add a fill with notional in {notional.currency} to a leg in {self.currency}")
+        self.filled_qty += q
+        self.remaining_qty -= q
+        self.filled_notional += notional.price
+        self.fill_count += 1
+        self.last_fill_time = when
+
+
 @dataclass
 class Order(TimeSeriesSchema):
     """
@@ -59,7 +103,8 @@ class SingleLegOrder(Order):
     """
     Orders that operate on a single leg. These orders deal with a single instrument and a quantity.
     The ``fills`` time-series represent the stream of fills received on the order. It does not
-    provide the historical state of all received fills.
+    provide the historical state of all received fills, the running summary of the fills is provided by
+    ``avg_fill_price`` (filled_notional / filled_qty), ``fill_count`` and ``last_fill_time``.
     """
     order_type: TS[SingleLegOrderType]
     remaining_qty: TSB[Quantity]
@@ -67,6 +112,9 @@ class SingleLegOrder(Order):
     filled_notional: TSB[Price]
     is_filled: TS[bool]
     fills: TS[Fill]
+    avg_fill_price: TS[float]
+    fill_count: TS[int]
+    last_fill_time: TS[datetime]
 
 
 LEG_ID = str
@@ -1,13 +1,15 @@
 from collections import defaultdict
 from dataclasses import dataclass, field
+from datetime import datetime
 from typing import Any, cast
 
 from frozendict import frozendict
 from hgraph import request_reply_service, TSD, TS, service_impl, feedback, TSB, \
-    compute_node, map_, TSB_OUT, HgTSTypeMetaData, STATE, TimeSeriesSchema, graph, emit
+    compute_node, map_, TSB_OUT, HgTSTypeMetaData, STATE, TimeSeriesSchema, graph, emit, EvaluationClock
 
+from hg_oap.assets.currency import Currency
 from hg_oap.impl.assets.currency import Currencies
-from hg_oap.orders.order import ORDER, OrderState, SingleLegOrder, MultiLegOrder, order_states
+from hg_oap.orders.order import ORDER, OrderState, SingleLegOrder, MultiLegOrder, order_states, FillAccumulator
 from hg_oap.orders.order_request_response_events import OrderRequest, CreateOrderRequest, OrderResponse, OrderEvent, \
     FillEvent
 from hg_oap.orders.order_type import MultiLegOrderType, SingleLegOrderType
@@ -173,6 +175,11 @@ class PendingRequests:
     pending_requests: list[OrderRequest] = field(default_factory=list)
 
 
+@dataclass
+class SingleLegPendingRequests(PendingRequests):
+    fills: FillAccumulator | None = None
+
+
 @graph
 def _compute_order_state_single(
         requests: TS[tuple[OrderRequest, ...]],
@@ -186,7 +193,10 @@ def _compute_order_state_single(
         filled_qty=confirmed.filled_qty,
         filled_notional=confirmed.filled_notional,
         is_filled=confirmed.is_filled,
-        fills=confirmed.fills
+        fills=confirmed.fills,
+        avg_fill_price=confirmed.avg_fill_price,
+        fill_count=confirmed.fill_count,
+        last_fill_time=confirmed.last_fill_time,
     )
     return TSB[OrderState[SingleLegOrder]].from_ts(requested=requested, confirmed=confirmed)
 
@@ -195,8 +205,9 @@ def _compute_order_state_single(
 def __compute_order_state_single(
         requests: TS[tuple[OrderRequest, ...]],
         responses: TSB[OrderHandlerOutputs],
-        _state: STATE[PendingRequests] = None,
-        _output: TSB_OUT[OrderState[ORDER]] = None
+        _state: STATE[SingleLegPendingRequests] = None,
+        _output: TSB_OUT[OrderState[ORDER]] = None,
+        _clock: EvaluationClock = None
 ) -> TSB[OrderState[SingleLegOrder]]:
     out_confirmed = {}
     out_requested = {}
@@ -213,6 +224,8 @@ def __compute_order_state_single(
             for response in order_responses.values():
                 confirmed, delta = apply_confirmation(confirmed, response)
                 out_confirmed.update(delta)
+                if isinstance(request := response.original_request, CreateOrderRequest):
+                    _state.fills = FillAccumulator(request.order_type.quantity, _leg_currency(request.order_type))
 
             requested = confirmed
             out_requested = requested
@@ -223,7 +236,8 @@ def __compute_order_state_single(
         if responses.order_events.modified:
             order_events = responses.order_events.value
             for order_event in order_events:
-                confirmed, delta = apply_event_single_leg(confirmed, order_event)
+                confirmed, delta = apply_event_single_leg(confirmed, order_event, _state.fills,
+                                                          _clock.evaluation_time)
                 out_confirmed.update(delta)
 
     if requests.modified:
@@ -235,19 +249,34 @@ def __compute_order_state_single(
     return {"requested": out_requested, "confirmed": out_confirmed}
 
 
-def apply_event_single_leg(confirmed: dict, event: OrderEvent) -> tuple[dict, dict]:
+def apply_event_single_leg(
+        confirmed: dict, event: OrderEvent, fills: FillAccumulator, when: datetime) -> tuple[dict, dict]:
+    """
+    Applies the event to the confirmed state. Fills are accumulated into ``fills``, the units and currency of the
+    quantity and notional outputs are set on confirmation, so only the running float totals are ticked here.
+    """
     out = {}
     if isinstance(event, FillEvent):
+        fills.add(event.fill, when)
         out['fills'] = event.fill
-        out['filled_qty'] = confirmed['filled_qty'] + event.fill.qty
-        out['remaining_qty'] = (remaining_qty := confirmed['remaining_qty'] - event.fill.qty)
-        out['filled_notional'] = confirmed['filled_notional'] + event.fill.notional
-        out['is_filled'] = bool(remaining_qty.qty <= 0.0)
+        out['filled_qty'] = {'qty': fills.filled_qty}
+        out['remaining_qty'] = {'qty': fills.remaining_qty}
+        out['filled_notional'] = {'price': fills.filled_notional}
+        out['is_filled'] = fills.is_filled
+        out['avg_fill_price'] = fills.avg_fill_price
+        out['fill_count'] = fills.fill_count
+        out['last_fill_time'] = fills.last_fill_time
 
-    confirmed.update(confirmed)
     return confirmed, out
 
 
+def _leg_currency(order_type: SingleLegOrderType) -> Currency:
+    """The currency the notional of the leg is accumulated in, limit orders use the currency of the limit price"""
+    if (price := getattr(order_type, 'price', None)) is not None:
+        return price.currency
+    return Currencies.USD.value
+
+
 def apply_confirmation(confirmed: dict, response: OrderResponse) -> tuple[Any, dict]:
     request = response.original_request
     if isinstance(request, CreateOrderRequest):
@@ -263,8 +292,9 @@ def apply_confirmation(confirmed: dict, response: OrderResponse) -> tuple[Any, d
             is_suspended=False,
             remaining_qty=order_type.quantity,
             filled_qty=dict(qty=0.0, unit=order_type.quantity.unit),
-            filled_notional=dict(price=0.0, currency=Currencies.USD.value),
+            filled_notional=dict(price=0.0, currency=_leg_currency(order_type)),
             is_filled=False,
+            fill_count=0,
         )
         return v, v
 
@@ -283,8 +313,9 @@ def apply_requested_single_leg(requested: dict, request: OrderRequest) -> tuple[
             is_suspended=False,
             remaining_qty=order_type.quantity,
             filled_qty=dict(qty=0.0, unit=order_type.quantity.unit),
-            filled_notional=dict(price=0.0, currency=Currencies.USD.value),
+            filled_notional=dict(price=0.0, currency=_leg_currency(order_type)),
             is_filled=False,
+            fill_count=0,
         )
         return v, v
 
@@ -0,0 +1,170 @@
+from dataclasses import dataclass, field
+
+import polars as pl
+from hgraph import TS, TSS, TSD, TSB, Frame, CompoundScalar, compute_node, graph, map_, service_impl, STATE, \
+    subscription_service, REMOVE
+
+from hg_oap.portfolio.portfolio import BOOK_ID, Book, get_book
+from hg_oap.units.unit import Unit
+from hg_oap.units.unit_system import UnitSystem
+
+__all__ = ("PositionRow", "PositionTable", "book_position_deltas", "get_book_frame", "get_book_frame_impl",
+           "get_book_impl")
+
+
+@dataclass(frozen=True)
+class PositionRow(CompoundScalar):
+    """
+    The row schema of a columnar position table. The unit is held by name (as resolved against the current unit
+    system) so that the columns remain plain polars types.
+    """
+    instrument_id: str
+    qty: float
+    qty_unit: str
+
+
+class PositionTable:
+    """
+    Holds the positions of a book as a polars frame with the columns described by ``PositionRow``.
+
+    Deltas (for example trades) are applied in batch, as an upsert keyed by instrument: the rows of the instruments
+    already held are updated and the new instruments are added at the end, so the rows keep their order and applying a
+    batch costs in the size of the batch rather than of the book. The quantity of each instrument is kept in the unit
+    it was first seen in, deltas in other units are converted using ``Unit.convert``, the conversion factor is computed
+    once per distinct pair of units in the batch rather than per row.
+    """
+
+    SCHEMA = {"instrument_id": pl.String, "qty": pl.Float64, "qty_unit": pl.String}
+
+    __slots__ = ("frame", "_rows")
+
+    def __init__(self, frame: pl.DataFrame = None):
+        self.frame = pl.DataFrame(schema=self.SCHEMA) if frame is None else frame.select(self.SCHEMA.keys())
+        self._rows = {instrument_id: i for i, instrument_id in enumerate(self.frame["instrument_id"].to_list())}
+
+    def apply(self, deltas: pl.DataFrame) -> pl.DataFrame:
+        """Adds the deltas to the positions and returns the new positions frame"""
+        if deltas.is_empty():
+            return self.frame
+
+        deltas = deltas.select(self.SCHEMA.keys()).cast(self.SCHEMA)
+        ids = deltas["instrument_id"].to_list()
+        frame, rows = self.frame, self._rows
+        if new := [i for i in dict.fromkeys(ids) if i not in rows]:
+            added = deltas.filter(pl.col("instrument_id").is_in(new)).unique(
+                "instrument_id", keep="first", maintain_order=True).with_columns(pl.lit(0.0).alias("qty"))
+            rows.update((instrument_id, i) for i, instrument_id in enumerate(new, frame.height))
+            frame = pl.concat([frame, added])
+
+        at = pl.Series("_row", [rows[i] for i in ids], dtype=pl.UInt32)
+        deltas = deltas.with_columns(at, frame["qty_unit"].gather(at).alias("_to_unit"))
+
+        pairs = deltas.filter(pl.col("qty_unit") != pl.col("_to_unit")).select("qty_unit", "_to_unit").unique()
+        if not pairs.is_empty():
+            factors = pairs.with_columns(pl.Series(
+                "_factor",
+                [_unit_by_name(fr).convert(1.0, to=_unit_by_name(to)) for fr, to in pairs.iter_rows()],
+                dtype=pl.Float64))
+            deltas = deltas.join(factors, on=["qty_unit", "_to_unit"], how="left", maintain_order="left").with_columns(
+                pl.col("qty") * pl.col("_factor").fill_null(1.0))
+
+        changed = deltas.group_by("_row").agg(pl.col("qty").sum())
+        qty = frame["qty"]
+        qty.scatter(changed["_row"], qty.gather(changed["_row"]) + changed["qty"])
+        self.frame = frame.with_columns(qty)
+        return self.frame
+
+
+def _unit_by_name(name: str) -> Unit:
+    return getattr(UnitSystem.instance(), name)
+
+
+@subscription_service
+def book_position_deltas(book_id: TS[BOOK_ID]) -> TS[Frame[PositionRow]]:
+    """Batches of position changes (for example trades) to apply to the book"""
+
+
+@subscription_service
+def get_book_frame(book_id: TS[BOOK_ID]) -> TS[Frame[PositionRow]]:
+    """
+    The positions of the book as a single frame, ticks a full snapshot each time the positions change. This is the
+    view to use for bulk calculations (such as risk) over large books.
+    """
+
+
+@dataclass
+class _PositionTableState:
+    table: PositionTable = field(default_factory=PositionTable)
+
+
+@compute_node
+def _accumulate_positions(deltas: TS[Frame[PositionRow]],
+                          _state: STATE[_PositionTableState] = None) -> TS[Frame[PositionRow]]:
+    return _state.table.apply(deltas.value)
+
+
+@graph
+def _book_frame(key: TS[BOOK_ID]) -> TS[Frame[PositionRow]]:
+    return _accumulate_positions(book_position_deltas(key))
+
+
+@service_impl(interfaces=get_book_frame)
+def get_book_frame_impl(book_id: TSS[BOOK_ID]) -> TSD[BOOK_ID, TS[Frame[PositionRow]]]:
+    """
+    Maintains a columnar position table per requested book from the deltas published by ``book_position_deltas``.
+    """
+    return map_(_book_frame, __keys__=book_id)
+
+
+@dataclass
+class _BookViewState:
+    rows: dict[str, int] = field(default_factory=dict)
+
+
+@compute_node(active=("positions",), valid=("positions",))
+def _book_from_frame(positions: TS[Frame[PositionRow]],
+                     deltas: TS[Frame[PositionRow]],
+                     _state: STATE[_BookViewState] = None) -> TSB[Book]:
+    """
+    Converts the snapshot into the time-series view of the book. Only the rows of the instruments in the batch of
+    deltas applied to the snapshot are converted, these are found by their row in the snapshot as the rows of a
+    ``PositionTable`` keep their order (the new instruments are added at the end). The whole snapshot is converted
+    when it is first seen, or if it does not match the rows seen before.
+    """
+    current = positions.value
+    rows = _state.rows
+    if deltas.modified and rows and current.height >= len(rows):
+        for i, instrument_id in enumerate(current["instrument_id"].slice(len(rows)).to_list(), len(rows)):
+            rows[instrument_id] = i
+        ids = deltas.value["instrument_id"].unique(maintain_order=True).to_list()
+        if None not in (at := [rows.get(i) for i in ids]):
+            changed = current[at]
+            if changed["instrument_id"].to_list() == ids:
+                return _positions(changed, {})
+
+    previous = rows.keys()
+    _state.rows = rows = {instrument_id: i for i, instrument_id in enumerate(current["instrument_id"].to_list())}
+    return _positions(current, {i: REMOVE for i in previous - rows.keys()})
+
+
+def _positions(changed: pl.DataFrame, out: dict) -> dict | None:
+    for i, qty, unit in changed.iter_rows():
+        out[i] = {"qty": qty, "qty_unit": _unit_by_name(unit)}
+    return {"positions": out} if out else None
+
+
+@graph
+def _book_view(key: TS[BOOK_ID]) -> TSB[Book]:
+    return _book_from_frame(get_book_frame(key), book_position_deltas(key))
+
+
+@service_impl(interfaces=get_book)
+def get_book_impl(book_id: TSS[BOOK_ID]) -> TSD[BOOK_ID, TSB[Book]]:
+    """
+    Provides the ``get_book`` view over the columnar position tables of ``get_book_frame``, the per-instrument
+    time-series are only created for the books subscribed to. The subscription of ``get_book`` is by book and its
+    ``Book.positions`` holds every instrument of the book, so the view of a subscribed book covers all its
+    instruments, only the rows of the instruments that changed are converted and tick. Use ``get_book_frame`` to
+    avoid the per-instrument time-series altogether.
+    """
+    return map_(_book_view, __keys__=book_id)
@@ -0,0 +1,93 @@
+from dataclasses import dataclass, field, fields
+
+from hgraph import TS, TSD, TSB, TimeSeriesSchema, compute_node, graph, map_, STATE, REMOVE_IF_EXISTS, \
+    LOGGER
+from hgraph.stream.stream import Stream, StreamStatus
+
+from hg_oap.instruments.instrument import INSTRUMENT_ID
+from hg_oap.portfolio.portfolio import PositionQuantity
+from hg_oap.pricing_service.price import Price
+from hg_oap.pricing_service.price_service import subscribe_price
+from hg_oap.units.unit import Unit
+
+__all__ = ("MarkToMarket", "mark_to_market", "position_value")
+
+
+class MarkToMarket(TimeSeriesSchema):
+    """The mark-to-market value of each instrument held and the total over all the instruments"""
+    values: TSD[INSTRUMENT_ID, TS[float]]
+    total: TS[float]
+
+
+_PRICE_FIELDS = tuple(f.name for f in fields(Price))
+
+
+def position_value(qty: float, qty_unit: Unit, price: Price, currency: Unit) -> float:
+    """
+    The value of the quantity at the price, in the currency. The price provides the conversion factor from the unit of
+    the quantity to the currency of the price (see ``Price.unit_conversion_factors``), converting from the price
+    currency to ``currency`` requires them to be in the same dimension (i.e. USX to USD) or a conversion context
+    (for example holding FX rates) to be active.
+    """
+    with price:
+        return qty_unit.convert(qty, to=currency)
+
+
+@graph
+def mark_to_market(positions: TSD[INSTRUMENT_ID, TSB[PositionQuantity]], currency: Unit,
+                   path: str = "instrument_price") -> TSB[MarkToMarket]:
+    """
+    Values the positions using the prices from ``subscribe_price``. Only the instruments whose position or price ticked
+    are re-valued, and the total is updated by the change in their value. Instruments without a usable price
+    (not valid or with a status other than OK or STALE) are left out of the values and the total, as are the
+    instruments whose value cannot be converted to ``currency`` (for example a price in another currency without an
+    FX conversion context, or a price per unit the position quantity cannot be converted to).
+    """
+    prices = map_(lambda key: subscribe_price[TSB[Stream[Price]]](key, path=path), __keys__=positions.key_set)
+    return _mark_to_market(positions, prices, currency)
+
+
+@dataclass
+class _MarkToMarketState:
+    instrument_values: dict[INSTRUMENT_ID, float] = field(default_factory=dict)
+    total: float = 0.0
+
+
+@compute_node(valid=())
+def _mark_to_market(positions: TSD[INSTRUMENT_ID, TSB[PositionQuantity]],
+                    prices: TSD[INSTRUMENT_ID, TSB[Stream[Price]]],
+                    currency: Unit,
+                    _state: STATE[_MarkToMarketState] = None,
+                    _logger: LOGGER = None) -> TSB[MarkToMarket]:
+    values = _state.instrument_values
+    out = {}
+    removed = set(positions.removed_keys())
+    for i in set(positions.modified_keys()) | set(prices.modified_keys()) | removed:
+        previous = values.pop(i, None)
+        value = None if i in removed else _value(i, positions.get(i), prices.get(i), currency, _logger)
+        if value is not None:
+            values[i] = value
+            if value != previous:
+                out[i] = value
+        elif previous is not None:
+            out[i] = REMOVE_IF_EXISTS
+        if value != previous:
+            _state.total += (value or 0.0) - (previous or 0.0)
+
+    if out:
+        return {"values": out, "total": _state.total}
+
+
+def _value(instrument, position, price, currency: Unit, logger) -> float | None:
+    if position is None or price is None or not (position.qty.valid and position.qty_unit.valid):
+        return None
+    if not (price.val.valid and price.unit.valid and price.currency_unit.valid):
+        return None
+    if price.status.valid and price.status.value not in (StreamStatus.OK, StreamStatus.STALE):
+        return None
+    price = Price(**{f: getattr(price, f).value for f in _PRICE_FIELDS})
+    try:
+        return position_value(position.qty.value, position.qty_unit.value, price, currency)
+    except ValueError as e:
+        logger.warning(f"Cannot value the position in {instrument} in {currency}: {e}")
+        return None
@@ -26,7 +26,7 @@ class Book(TimeSeriesSchema):
 
 
 @subscription_service
-def get_book(book_id: TS[BOOK_ID]) -> Book:
+def get_book(book_id: TS[BOOK_ID]) -> TSB[Book]:
     """Returns a book for the given id"""
 
 
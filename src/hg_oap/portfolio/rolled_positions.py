@@ -0,0 +1,264 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from hgraph import TSS, TSD, TSB, TS, compute_node, graph, map_, feedback, service_impl, STATE, REMOVE_IF_EXISTS, \
+    TSD_OUT
+
+from hg_oap.instruments.instrument import INSTRUMENT_ID
+from hg_oap.portfolio.portfolio import PORTFOLIO_ID, BOOK_ID, PositionQuantity, Portfolio, Book, get_portfolio, \
+    get_book, rolled_positions
+from hg_oap.units.unit import Unit
+
+__all__ = ("PositionRollUp", "rolled_positions_impl")
+
+
+class PositionRollUp:
+    """
+    Maintains the aggregated positions of every portfolio in a portfolio hierarchy.
+
+    The hierarchy is a DAG of portfolios (nodes) and books (leaves). For each book the set of portfolios that can reach
+    it (its ancestors) is kept, a change to a book position is converted into a delta and the delta is applied once to
+    each ancestor. Since the ancestors are a set, a book reachable from a portfolio via more than one path (a diamond)
+    is only counted once. Changes to the structure of the hierarchy only re-compute the ancestors of the books below
+    the portfolio that changed, and apply the book positions to the ancestors gained or lost.
+
+    Quantities are held as floats in a single unit per instrument (the first unit seen for the instrument), positions
+    reported in other units are normalised using ``Unit.convert``.
+    """
+
+    def __init__(self):
+        self._portfolio_books: dict[PORTFOLIO_ID, frozenset[BOOK_ID]] = {}
+        self._portfolio_children: dict[PORTFOLIO_ID, frozenset[PORTFOLIO_ID]] = {}
+        self._book_parents: dict[BOOK_ID, set[PORTFOLIO_ID]] = defaultdict(set)
+        self._portfolio_parents: dict[PORTFOLIO_ID, set[PORTFOLIO_ID]] = defaultdict(set)
+        self._book_ancestors: dict[BOOK_ID, frozenset[PORTFOLIO_ID]] = {}
+        self._book_positions: dict[BOOK_ID, dict[INSTRUMENT_ID, float]] = defaultdict(dict)
+        self._units: dict[INSTRUMENT_ID, Unit] = {}
+        self._totals: dict[PORTFOLIO_ID, dict[INSTRUMENT_ID, float]] = defaultdict(dict)
+        self._counts: dict[PORTFOLIO_ID, dict[INSTRUMENT_ID, int]] = defaultdict(dict)
+        self._modified: dict[PORTFOLIO_ID, set[INSTRUMENT_ID]] = defaultdict(set)
+
+    def positions(self, portfolio_id: PORTFOLIO_ID) -> dict[INSTRUMENT_ID, float]:
+        """The aggregated quantities of the portfolio, in the unit returned by ``unit``"""
+        return self._totals.get(portfolio_id, {})
+
+    def unit(self, instrument_id: INSTRUMENT_ID) -> Unit:
+        """The unit the quantities of this instrument are aggregated in"""
+        return self._units[instrument_id]
+
+    def ancestors(self, book_id: BOOK_ID) -> frozenset[PORTFOLIO_ID]:
+        """The portfolios that (directly or indirectly) contain the book"""
+        return self._book_ancestors.get(book_id, frozenset())
+
+    def drain_modified(self) -> dict[PORTFOLIO_ID, set[INSTRUMENT_ID]]:
+        """Returns the portfolio instruments modified since the last call"""
+        modified = self._modified
+        self._modified = defaultdict(set)
+        return modified
+
+    def set_portfolio(self, portfolio_id: PORTFOLIO_ID, books: Iterable[BOOK_ID], portfolios: Iterable[PORTFOLIO_ID]):
+        """Sets (or replaces) the books and child portfolios of the portfolio"""
+        affected = self._descendant_books(portfolio_id)
+        self._unlink(portfolio_id)
+        self._portfolio_books[portfolio_id] = books = frozenset(books)
+        self._portfolio_children[portfolio_id] = portfolios = frozenset(portfolios)
+        for book_id in books:
+            self._book_parents[book_id].add(portfolio_id)
+        for child_id in portfolios:
+            self._portfolio_parents[child_id].add(portfolio_id)
+        affected |= self._descendant_books(portfolio_id)
+        for book_id in affected:
+            self._update_ancestors(book_id)
+
+    def remove_portfolio(self, portfolio_id: PORTFOLIO_ID):
+        """Removes the portfolio (but not its children) from the hierarchy"""
+        affected = self._descendant_books(portfolio_id)
+        self._unlink(portfolio_id)
+        self._portfolio_books.pop(portfolio_id, None)
+        self._portfolio_children.pop(portfolio_id, None)
+        for book_id in affected:
+            self._update_ancestors(book_id)
+        self._totals.pop(portfolio_id, None)
+        self._counts.pop(portfolio_id, None)
+        self._modified.pop(portfolio_id, None)
+
+    def update_position(self, book_id: BOOK_ID, instrument_id: INSTRUMENT_ID, qty: float, unit: Unit):
+        """Sets the position of the instrument in the book, the difference is pushed to the ancestors of the book"""
+        if (canonical := self._units.setdefault(instrument_id, unit)) is not unit:
+            qty = unit.convert(qty, to=canonical)
+        positions = self._book_positions[book_id]
+        previous = positions.get(instrument_id)
+        positions[instrument_id] = qty
+        if previous is None:
+            delta, count = qty, 1
+        elif (delta := qty - previous) == 0.0:
+            return
+        else:
+            count = 0
+        for portfolio_id in self._book_ancestors.get(book_id, ()):
+            self._apply(portfolio_id, instrument_id, delta, count)
+
+    def remove_position(self, book_id: BOOK_ID, instrument_id: INSTRUMENT_ID):
+        if (previous := self._book_positions[book_id].pop(instrument_id, None)) is not None:
+            for portfolio_id in self._book_ancestors.get(book_id, ()):
+                self._apply(portfolio_id, instrument_id, -previous, -1)
+
+    def remove_book(self, book_id: BOOK_ID):
+        for instrument_id in list(self._book_positions.get(book_id, ())):
+            self.remove_position(book_id, instrument_id)
+        self._book_positions.pop(book_id, None)
+
+    def _apply(self, portfolio_id: PORTFOLIO_ID, instrument_id: INSTRUMENT_ID, delta: float, count: int):
+        counts = self._counts[portfolio_id]
+        totals = self._totals[portfolio_id]
+        if c := counts.get(instrument_id, 0) + count:
+            counts[instrument_id] = c
+            totals[instrument_id] = totals.get(instrument_id, 0.0) + delta
+        else:
+            # No book in the portfolio holds the instrument any longer
+            counts.pop(instrument_id, None)
+            totals.pop(instrument_id, None)
+        self._modified[portfolio_id].add(instrument_id)
+
+    def _unlink(self, portfolio_id: PORTFOLIO_ID):
+        for book_id in self._portfolio_books.get(portfolio_id, ()):
+            self._book_parents[book_id].discard(portfolio_id)
+        for child_id in self._portfolio_children.get(portfolio_id, ()):
+            self._portfolio_parents[child_id].discard(portfolio_id)
+
+    def _update_ancestors(self, book_id: BOOK_ID):
+        new = self._ancestors(book_id)
+        old = self._book_ancestors.get(book_id, frozenset())
+        if new == old:
+            return
+        if positions := self._book_positions.get(book_id):
+            for portfolio_id in old - new:
+                for instrument_id, qty in positions.items():
+                    self._apply(portfolio_id, instrument_id, -qty, -1)
+            for portfolio_id in new - old:
+                for instrument_id, qty in positions.items():
+                    self._apply(portfolio_id, instrument_id, qty, 1)
+        if new:
+            self._book_ancestors[book_id] = new
+        else:
+            self._book_ancestors.pop(book_id, None)
+
+    def _ancestors(self, book_id: BOOK_ID) -> frozenset[PORTFOLIO_ID]:
+        ancestors = set()
+        stack = list(self._book_parents.get(book_id, ()))
+        while stack:
+            if (portfolio_id := stack.pop()) not in ancestors:
+                ancestors.add(portfolio_id)
+                stack.extend(self._portfolio_parents.get(portfolio_id, ()))
+        return frozenset(ancestors)
+
+    def _descendant_books(self, portfolio_id: PORTFOLIO_ID) -> set[BOOK_ID]:
+        books = set()
+        visited = set()
+        stack = [portfolio_id]
+        while stack:
+            if (p := stack.pop()) not in visited:
+                visited.add(p)
+                books.update(self._portfolio_books.get(p, ()))
+                stack.extend(self._portfolio_children.get(p, ()))
+        return books
+
+
+@service_impl(interfaces=rolled_positions)
+def rolled_positions_impl(
+        portfolio_id: TSS[PORTFOLIO_ID]) -> TSD[PORTFOLIO_ID, TSD[INSTRUMENT_ID, TSB[PositionQuantity]]]:
+    """
+    Reference implementation of ``rolled_positions`` using ``get_portfolio`` and ``get_book``. The portfolio hierarchy
+    below the requested portfolios is discovered by subscribing to the child portfolios as they are reported, the
+    positions of all the books found are then rolled up incrementally using the ``PositionRollUp``.
+    """
+    reachable = feedback(TSS[PORTFOLIO_ID])
+    portfolios = map_(_get_portfolio, __keys__=reachable())
+    reachable(_reachable_portfolios(portfolio_id, portfolios))
+    books = map_(_get_book, __keys__=_reachable_books(portfolios))
+    return _roll_up_positions(portfolio_id, portfolios, books)
+
+
+@graph
+def _get_portfolio(key: TS[PORTFOLIO_ID]) -> TSB[Portfolio]:
+    return get_portfolio(key)
+
+
+@graph
+def _get_book(key: TS[BOOK_ID]) -> TSB[Book]:
+    return get_book(key)
+
+
+def _set_value(tss) -> frozenset:
+    return tss.value if tss.valid else frozenset()
+
+
+@compute_node(valid=("requested",))
+def _reachable_portfolios(
+        requested: TSS[PORTFOLIO_ID], portfolios: TSD[PORTFOLIO_ID, TSB[Portfolio]]) -> TSS[PORTFOLIO_ID]:
+    reachable = set()
+    stack = list(requested.value)
+    while stack:
+        if (portfolio_id := stack.pop()) not in reachable:
+            reachable.add(portfolio_id)
+            if (portfolio := portfolios.get(portfolio_id)) is not None:
+                stack.extend(_set_value(portfolio.portfolios))
+    return frozenset(reachable)
+
+
+@compute_node
+def _reachable_books(portfolios: TSD[PORTFOLIO_ID, TSB[Portfolio]]) -> TSS[BOOK_ID]:
+    return frozenset(b for portfolio in portfolios.values() for b in _set_value(portfolio.books))
+
+
+@dataclass
+class RollUpState:
+    roll_up: PositionRollUp = field(default_factory=PositionRollUp)
+
+
+@compute_node(valid=("portfolio_id",))
+def _roll_up_positions(
+        portfolio_id: TSS[PORTFOLIO_ID],
+        portfolios: TSD[PORTFOLIO_ID, TSB[Portfolio]],
+        books: TSD[BOOK_ID, TSB[Book]],
+        _state: STATE[RollUpState] = None,
+        _output: TSD_OUT[PORTFOLIO_ID, TSD[INSTRUMENT_ID, TSB[PositionQuantity]]] = None,
+) -> TSD[PORTFOLIO_ID, TSD[INSTRUMENT_ID, TSB[PositionQuantity]]]:
+    roll_up = _state.roll_up
+
+    # Apply structural changes first, so position changes in this cycle are pushed to the new ancestors
+    for p in portfolios.removed_keys():
+        roll_up.remove_portfolio(p)
+    for p, portfolio in portfolios.modified_items():
+        if portfolio.books.modified or portfolio.portfolios.modified:
+            roll_up.set_portfolio(p, _set_value(portfolio.books), _set_value(portfolio.portfolios))
+
+    for b in books.removed_keys():
+        roll_up.remove_book(b)
+    for b, book in books.modified_items():
+        positions = book.positions
+        for i in positions.removed_keys():
+            roll_up.remove_position(b, i)
+        for i, position in positions.modified_items():
+            if position.qty.valid and position.qty_unit.valid:
+                roll_up.update_position(b, i, position.qty.value, position.qty_unit.value)
+
+    modified = roll_up.drain_modified()
+    out = {}
+    for p in portfolio_id.removed():
+        out[p] = REMOVE_IF_EXISTS
+    for p in portfolio_id.added():
+        out[p] = {i: {"qty": qty, "qty_unit": roll_up.unit(i)} for i, qty in roll_up.positions(p).items()}
+    requested = portfolio_id.value
+    for p, instruments in modified.items():
+        if p in requested and p not in out:
+            totals = roll_up.positions(p)
+            current = _output.get(p)
+            out[p] = {
+                i: REMOVE_IF_EXISTS if (qty := totals.get(i)) is None else
+                {"qty": qty} if current is not None and i in current else
+                {"qty": qty, "qty_unit": roll_up.unit(i)}
+                for i in instruments
+            }
+    return out
@@ -5,3 +5,5 @@ from hg_oap.pricing_service.timed_value import *
 from hg_oap.pricing_service.timed_value_operators import *
 from hg_oap.pricing_service.utils import *
 from hg_oap.pricing_service.pricing_regime_context import *
+from hg_oap.pricing_service.pricing_trace import *
+from hg_oap.pricing_service.pricing_cache import *
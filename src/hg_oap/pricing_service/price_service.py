@@ -1,9 +1,10 @@
 import logging
+from datetime import timedelta
 from typing import Type
 
 from hgraph import subscription_service, TS, graph, service_impl, TSS, TSD, AUTO_RESOLVE, dispatch, type_, \
     COMPOUND_SCALAR, mesh_, operator, combine, if_then_else, try_except, dedup, compute_node, filter_, log_, str_, \
-    CompoundScalar, switch_, valid, or_, TSB, default, getattr_, SCALAR
+    CompoundScalar, switch_, valid, or_, TSB, default, getattr_, SCALAR, null_sink, schedule
 from hgraph.stream.stream import StreamStatus
 
 from hg_oap.instrument_data_service.instrument_data_service import instrument_by_name
@@ -12,7 +13,10 @@ from hg_oap.pricing_service import PricingRegimeContext, delayed_log, combine_er
 from hg_oap.pricing_service.data_types import PriceOpts, PricingModel, PricingRequest
 from hg_oap.pricing_service.price import PRICE, PriceType
 from hg_oap.pricing_service.price_mesh_ui import create_price_view, price_row_key, publish_price_row, PriceUIView
+from hg_oap.pricing_service.pricing_cache import PricingResultCache, price_cache_hit, cached_price, cache_price
 from hg_oap.pricing_service.pricing_model_choice import choose_pricing_model
+from hg_oap.pricing_service.pricing_trace import PricingTracer, PricingStage, trace_start, trace_stage, \
+    pricing_trace_dump
 from hg_oap.units import Unit
 
 __all__ = ("subscribe_price", "subscribe_price_by_name", "price_service", "pricing_model", "pricing_service_impl")
@@ -60,7 +64,25 @@ def pricing_service_impl(
         path: str,
         pricing_regime_context: PricingRegimeContext,
         price_type: Type[PRICE] = AUTO_RESOLVE,
-        publish_to_ui: bool = True) -> TSD[PricingRequest, PRICE]:
+        publish_to_ui: bool = True,
+        trace: bool = False,
+        trace_dump_interval: timedelta = None,
+        cache: str = None) -> TSD[PricingRequest, PRICE]:
+    """
+    With ``trace`` set, the latency of each stage of the pricing pipeline is recorded per request (see
+    ``PricingTracer``), the summaries are available with ``pricing_trace_stats`` and are logged every
+    ``trace_dump_interval`` if one is given. Without it no tracing nodes are wired.
+
+    With ``cache`` set to the name of a registered ``PricingResultCache``, the prices computed by the models are
+    cached by request, business date and model. A request with a price in the cache is given the cached price, rather
+    than being priced by the model, until the price expires. The services sharing a cache reuse each other's prices.
+    """
+    if cache is not None:
+        PricingResultCache.instance(cache)  # the cache is registered before the services using it are wired
+    if trace:
+        PricingTracer.register(path)
+        if trace_dump_interval is not None:
+            log_("Pricing latencies for {}:\n{}", path, pricing_trace_dump(schedule(trace_dump_interval), path))
 
     with pricing_regime_context:
 
@@ -82,10 +104,25 @@ def pricing_service_impl(
 
             pricing_model_dispatch = extract_pricing_model_dispatch(pricing_regime_context, price_type)
 
-            price_result = try_except(pricing_model_dispatch, instrument, opts, model)
+            if cache is None:
+                price_result = try_except(pricing_model_dispatch, instrument, opts, model)
+            else:
+                price_result = try_except(_cached_pricing_model(pricing_model_dispatch, cache, price_type),
+                                          instrument, opts, model, key)
+
+            branches = {True: _exception_price, False: _no_exception_price}
+            trace_kwargs = {}
+            if trace:
+                mark = trace_start(key)
+                for stage, ts in ((PricingStage.INSTRUMENT, instrument),
+                                  (PricingStage.MODEL, model),
+                                  (PricingStage.PRICE, price_result)):
+                    mark = trace_stage(ts, mark, key, model, stage=stage, path=path)
+                branches = {True: _traced_exception_price, False: _traced_no_exception_price}
+                trace_kwargs = dict(trace_mark=mark, trace_request=key, trace_path=path)
+
             price = switch_(valid(price_result.exception),
-                           {True: _exception_price,
-                                     False: _no_exception_price},
+                           branches,
                            symbol=symbol,
                            model=model,
                            ref_data_error=ref_data_error,
@@ -93,7 +130,8 @@ def pricing_service_impl(
                            exception=str_(price_result.exception),
                            price_type=price_type,
                            opts=opts,
-                           publish_to_ui=publish_to_ui)
+                           publish_to_ui=publish_to_ui,
+                           **trace_kwargs)
             return price.copy_with(
                 origin=default(price.origin, "pricing"),
                 unit=default(price.unit, getattr_[SCALAR: Unit](instrument, "unit")),
@@ -103,6 +141,31 @@ def pricing_service_impl(
         return mesh_(_invoke_pricing_model, __keys__=request, __name__=f"pricing_service_{path}[{str(price_type)}]")
 
 
+def _cached_pricing_model(pricing_model_dispatch, cache: str, price_type: Type[PRICE]):
+    """The pricing model given the cached price for the request if there is one, caching the prices it computes"""
+
+    @graph
+    def _from_cache(instrument: TS[Instrument], opts: TS[PriceOpts], model: TS[PricingModel],
+                    request: TS[PricingRequest]) -> price_type:
+        return cached_price(request, model, cache=cache, price_type=price_type)
+
+    @graph
+    def _from_model(instrument: TS[Instrument], opts: TS[PriceOpts], model: TS[PricingModel],
+                    request: TS[PricingRequest]) -> price_type:
+        price = pricing_model_dispatch(instrument, opts, model)
+        cache_price(price, request, model, cache=cache, price_type=price_type)
+        return price
+
+    @graph
+    def _pricing_model(instrument: TS[Instrument], opts: TS[PriceOpts], model: TS[PricingModel],
+                       request: TS[PricingRequest]) -> price_type:
+        return switch_(price_cache_hit(request, model, cache=cache, price_type=price_type),
+                       {True: _from_cache, False: _from_model},
+                       instrument, opts, model, request)
+
+    return _pricing_model
+
+
 @graph
 def _exception_price(symbol: TS[str],
                      model: TS[PricingModel],
@@ -112,11 +175,7 @@ def _exception_price(symbol: TS[str],
                      price_type: Type[PRICE],
                      opts: TS[PriceOpts],
                      publish_to_ui: bool) -> PRICE:
-    log_("Exception attempting to execute {} for {}: {}", type_(model).name, symbol, exception, level=logging.FATAL)
-    if publish_to_ui:
-        view = combine[TSB[PriceUIView]](status=exception)
-        publish_price_row(price_row_key(symbol, model, opts), view)
-    return error_return(symbol, model, opts, exception, price, StreamStatus.FATAL, price_type)
+    return _exception_error(symbol, model, price, exception, price_type, opts, publish_to_ui)
 
 
 @graph
@@ -128,8 +187,65 @@ def _no_exception_price(symbol: TS[str],
                         price_type: Type[PRICE],
                         opts: TS[PriceOpts],
                         publish_to_ui: bool) -> PRICE:
+    return _price_or_error(symbol, model, ref_data_error, price, price_type, opts, publish_to_ui)
+
+
+@graph
+def _traced_exception_price(symbol: TS[str],
+                            model: TS[PricingModel],
+                            ref_data_error: TS[str],
+                            price: PRICE,
+                            exception: TS[str],
+                            price_type: Type[PRICE],
+                            opts: TS[PriceOpts],
+                            publish_to_ui: bool,
+                            trace_mark: TS[float],
+                            trace_request: TS[PricingRequest],
+                            trace_path: str) -> PRICE:
+    return _exception_error(symbol, model, price, exception, price_type, opts, publish_to_ui,
+                            (trace_mark, trace_request, trace_path))
+
+
+@graph
+def _traced_no_exception_price(symbol: TS[str],
+                               model: TS[PricingModel],
+                               ref_data_error: TS[str],
+                               price: PRICE,
+                               exception: TS[str],
+                               price_type: Type[PRICE],
+                               opts: TS[PriceOpts],
+                               publish_to_ui: bool,
+                               trace_mark: TS[float],
+                               trace_request: TS[PricingRequest],
+                               trace_path: str) -> PRICE:
+    return _price_or_error(symbol, model, ref_data_error, price, price_type, opts, publish_to_ui,
+                           (trace_mark, trace_request, trace_path))
+
+
+def _exception_error(symbol, model, price, exception, price_type, opts, publish_to_ui, trace=None):
+    """Wires the error price and UI publication of a pricing model that raised, tracing the stages if trace is given"""
+    log_("Exception attempting to execute {} for {}: {}", type_(model).name, symbol, exception, level=logging.FATAL)
+    error = error_return(symbol, model, opts, exception, price, StreamStatus.FATAL, price_type)
+    if trace:
+        mark, request, path = trace
+        mark = trace_stage(error, mark, request, model, stage=PricingStage.ERRORS, path=path)
+    if publish_to_ui:
+        view = combine[TSB[PriceUIView]](status=exception)
+        publish_price_row(price_row_key(symbol, model, opts), view)
+        if trace:
+            mark = trace_stage(view, mark, request, model, stage=PricingStage.PUBLISH, path=path)
+    if trace:
+        null_sink(mark)
+    return error
+
+
+def _price_or_error(symbol, model, ref_data_error, price, price_type, opts, publish_to_ui, trace=None):
+    """Wires the error handling and UI publication of a price, tracing the stages if trace is supplied"""
     error = dedup(combine_errors(symbol, ref_data_error, price.status_msg))
     delayed_log(symbol, error)
+    if trace:
+        mark, request, path = trace
+        mark = trace_stage(error, mark, request, model, stage=PricingStage.ERRORS, path=path)
     no_good_price_yet = default(or_(price.status >= StreamStatus.WAITING, ref_data_error != ""), True)
     price = if_then_else(no_good_price_yet,
                          filter_(no_good_price_yet,
@@ -138,6 +254,10 @@ def _no_exception_price(symbol: TS[str],
     if publish_to_ui:
         view = create_price_view(price, model)
         publish_price_row(price_row_key(symbol, model, opts), view)
+        if trace:
+            mark = trace_stage(view, mark, request, model, stage=PricingStage.PUBLISH, path=path)
+    if trace:
+        null_sink(mark)
     return price
 
 
@@ -1,16 +1,19 @@
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Type
 
 from hg_oap.pricing_service import Price, PRICE, PriceType
 from hg_oap.units import Unit
 from hgraph import (mul_, TSB, TS, NUMBER, compute_node, add_, graph, sub_, div_, combine, TIME_SERIES_TYPE, sink_node,
-                    WiringNodeClass, zero, MIN_DT, SCALAR, AUTO_RESOLVE, DivideByZero)
-from hgraph.stream.stream import Stream, combine_statuses, combine_status_messages, merge_join, StreamStatus
+                    WiringNodeClass, zero, MIN_DT, SCALAR, AUTO_RESOLVE, DivideByZero, CompoundScalar, TSB_OUT,
+                    STATE)
+from hgraph.stream.stream import Stream, combine_status_messages, merge_join, StreamStatus
 
 __all__ = ("add_price_stream_number", "sub_price_stream_number", "mul_price_stream_number", "div_price_stream_number",
            "add_two_price_streams", "sub_two_price_streams", "mul_two_price_streams", "div_two_price_streams",
            "zero_price", "combine_origins", "combine_two_price_streams",
-           "assert_not_equal", "combine_price_types", "combine_timestamps")
+           "assert_not_equal", "combine_price_types", "combine_timestamps", "PriceMetadata",
+           "combine_price_metadata")
 
 
 @graph(overloads=add_)
@@ -62,21 +65,8 @@ def combine_two_price_streams(lhs: PRICE,
                               price: TS[SCALAR],
                               price_type: Type[PRICE] = AUTO_RESOLVE,
                               __strict__: bool = True) -> PRICE:
-    if __strict__:
-        assert_equal(lhs.currency_unit, rhs.currency_unit,
-                     "Cannot combine two price streams with different currency units: {} / {}")
-        assert_equal(lhs.unit, rhs.unit,
-                     "Cannot combine two price streams with different units: {} / {}")
-
-    return combine[price_type](
-        currency_unit=combine_units(lhs.currency_unit, rhs.currency_unit),
-        origin=combine_origins(lhs.origin, rhs.origin),
-        price_type=combine_price_types(lhs.price_type, rhs.price_type),
-        val=price,
-        unit=combine_units(lhs.unit, rhs.unit),
-        status=combine_statuses(lhs.status, rhs.status),
-        status_msg=combine_status_messages(lhs.status_msg, rhs.status_msg),
-        timestamp=combine_timestamps(lhs.timestamp, rhs.timestamp))
+    metadata = combine_price_metadata(lhs, rhs, __strict__)
+    return combine[price_type](val=price, **metadata.as_dict())
 
 
 @compute_node(valid=())
@@ -111,6 +101,67 @@ def combine_timestamps(lhs: TS[datetime], rhs: TS[datetime]) -> TS[datetime]:
         return max(lhs.value.replace(tzinfo=None), rhs.value.replace(tzinfo=None))
 
 
+@dataclass(frozen=True)
+class PriceMetadata(CompoundScalar):
+    """The fields of a price that describe its value, these are combined separately from the value"""
+    currency_unit: Unit
+    origin: str
+    price_type: PriceType
+    unit: Unit
+    status: StreamStatus
+    status_msg: str
+    timestamp: datetime
+
+
+@graph
+def combine_price_metadata(lhs: PRICE, rhs: PRICE, __strict__: bool = True) -> TSB[PriceMetadata]:
+    """
+    The metadata of the price combined from the two prices. Only the metadata fields of the prices are bound, so the
+    ticks of their values do not cause the metadata to be combined again. When strict the prices must have the same
+    currency units and units.
+    """
+    fields = PriceMetadata.__meta_data_schema__.keys()
+    return _combine_price_metadata(TSB[PriceMetadata].from_ts(**{k: getattr(lhs, k) for k in fields}),
+                                   TSB[PriceMetadata].from_ts(**{k: getattr(rhs, k) for k in fields}),
+                                   __strict__)
+
+
+@dataclass
+class _CombinedInputs:
+    inputs: dict = field(default_factory=dict)
+
+
+@compute_node(valid=())
+def _combine_price_metadata(lhs: TSB[PriceMetadata],
+                            rhs: TSB[PriceMetadata],
+                            strict: bool,
+                            _output: TSB_OUT[PriceMetadata] = None,
+                            _state: STATE[_CombinedInputs] = None) -> TSB[PriceMetadata]:
+    """
+    Only the fields whose inputs have changed (in value, the prices often re-publish unchanged metadata with each
+    value) are combined again, and only the fields whose combined values have changed tick.
+    """
+    out = {}
+    for k, combine_field in _METADATA_COMBINERS.items():
+        l, r = lhs[k], rhs[k]
+        if not (l.modified or r.modified):
+            continue
+        inputs = (l.value, r.value)
+        if _state.inputs.get(k) == inputs:
+            continue
+        _state.inputs[k] = inputs
+        if strict and k in _STRICT_ERRORS and l.valid and r.valid and l.value != r.value:
+            raise AssertionError(_STRICT_ERRORS[k].format(l.value, r.value))
+        value = combine_field(l, r)
+        if value is not None and (not (o := _output[k]).valid or o.value != value):
+            out[k] = value
+    return out or None
+
+
+def _combine_statuses(lhs, rhs) -> StreamStatus:
+    return max(lhs.value, rhs.value, key=lambda s: s.value) if lhs.valid and rhs.valid else StreamStatus.WAITING
+
+
 @compute_node(valid=())
 def combine_price_types(lhs: TS[PriceType], rhs: TS[PriceType]) -> TS[PriceType]:
     lhs = lhs.value
@@ -134,6 +185,22 @@ def combine_price_types(lhs: TS[PriceType], rhs: TS[PriceType]) -> TS[PriceType]
                     case _: return PriceType.IMPLIED
 
 
+_STRICT_ERRORS = {
+    "currency_unit": "Cannot combine two price streams with different currency units: {} / {}",
+    "unit": "Cannot combine two price streams with different units: {} / {}",
+}
+
+_METADATA_COMBINERS = {
+    "currency_unit": combine_units.fn,
+    "origin": lambda lhs, rhs: merge_join.fn(lhs, rhs, "/"),
+    "price_type": combine_price_types.fn,
+    "unit": combine_units.fn,
+    "status": _combine_statuses,
+    "status_msg": combine_status_messages.fn,
+    "timestamp": combine_timestamps.fn,
+}
+
+
 @graph(overloads=zero)
 def zero_price(tp: Type[TSB[Stream[Price]]], op: WiringNodeClass) -> TSB[Stream[Price]]:
     return combine[tp](status=StreamStatus.OK,
@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import ClassVar, Type
+
+from hgraph import TS, CONTEXT, REQUIRED, STATE, EvaluationClock, SCHEDULER, compute_node, sink_node
+from hgraph.stream.stream import StreamStatus
+
+from hg_oap.pricing_service.data_types import PricingModel, PricingRequest
+from hg_oap.pricing_service.price import PRICE
+
+__all__ = ("PricingResultCache", "price_cache_hit", "cached_price", "cache_price")
+
+
+class PricingResultCache:
+    """
+    The prices computed by the pricing models keyed by the request, the business date and the model (along with the
+    type of the price). The caches are named, the pricing services wired with the name of a cache share it so that a
+    price computed on one path, or in one pricing regime, is reused by the others rather than priced again.
+
+    A price is reused for ``ttl`` (of engine time) after it was computed, or for as long as it is cached when there is
+    no ``ttl``. The least recently used prices are evicted once there are more than ``max_size``.
+    """
+
+    _caches: ClassVar[dict[str, "PricingResultCache"]] = {}
+
+    def __init__(self, name: str, ttl: timedelta = None, max_size: int = None):
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self._prices: OrderedDict[tuple, tuple[object, datetime]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def register(cls, name: str, ttl: timedelta = None, max_size: int = None) -> "PricingResultCache":
+        """Creates a new cache with the name, replacing any previous one"""
+        cls._caches[name] = cache = cls(name, ttl, max_size)
+        return cache
+
+    @classmethod
+    def instance(cls, name: str) -> "PricingResultCache":
+        if (cache := cls._caches.get(name)) is None:
+            raise ValueError(f"No pricing result cache is registered as '{name}'")
+        return cache
+
+    @staticmethod
+    def key(request: PricingRequest, business_date: date, model: PricingModel, price_type: type) -> tuple:
+        return request, business_date, model, price_type
+
+    def get(self, key: tuple, now: datetime):
+        """The price cached for the key, None if there is none or it has expired. The lookup is counted in the stats"""
+        if (price := self.peek(key, now)) is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return price
+
+    def peek(self, key: tuple, now: datetime):
+        """``get`` without counting the lookup"""
+        if (entry := self._prices.get(key)) is None or self.expiry(entry[1]) <= now:
+            return None
+        self._prices.move_to_end(key)
+        return entry[0]
+
+    def expires_at(self, key: tuple) -> datetime | None:
+        """The time the price cached for the key expires, None if there is no price cached"""
+        return None if (entry := self._prices.get(key)) is None else self.expiry(entry[1])
+
+    def expiry(self, cached_at: datetime) -> datetime:
+        return datetime.max if self.ttl is None else cached_at + self.ttl
+
+    def put(self, key: tuple, price, now: datetime):
+        self._prices[key] = (price, now)
+        self._prices.move_to_end(key)
+        if self.max_size is not None:
+            while len(self._prices) > self.max_size:
+                self._prices.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        self._prices.clear()
+
+    def __len__(self):
+        return len(self._prices)
+
+
+@dataclass
+class _CacheHitState:
+    key: tuple | None = None
+    hit: bool | None = None
+
+
+@compute_node(valid=("request", "model"))
+def price_cache_hit(request: TS[PricingRequest],
+                    model: TS[PricingModel],
+                    cache: str,
+                    price_type: Type[PRICE],
+                    business_date: CONTEXT[TS[date]] = REQUIRED["business_date"],
+                    _clock: EvaluationClock = None,
+                    _scheduler: SCHEDULER = None,
+                    _state: STATE[_CacheHitState] = None) -> TS[bool]:
+    """
+    True while the cache has an unexpired price for the request, business date and model. It turns False when the
+    price expires, it does not turn True while the price is being computed (and cached) by the model.
+    """
+    key = PricingResultCache.key(request.value, business_date.value, model.value, price_type)
+    if key == _state.key and not _scheduler.is_scheduled_now:
+        return
+    _state.key = key
+    cache = PricingResultCache.instance(cache)
+    hit = cache.get(key, _clock.evaluation_time) is not None
+    if hit and (expires_at := cache.expires_at(key)) < datetime.max:
+        _scheduler.schedule(expires_at, tag="expiry")
+    elif _scheduler.has_tag("expiry"):
+        _scheduler.un_schedule("expiry")
+    if hit != _state.hit:
+        _state.hit = hit
+        return hit
+
+
+@compute_node(valid=("request", "model"))
+def cached_price(request: TS[PricingRequest],
+                 model: TS[PricingModel],
+                 cache: str,
+                 price_type: Type[PRICE],
+                 business_date: CONTEXT[TS[date]] = REQUIRED["business_date"],
+                 _clock: EvaluationClock = None) -> PRICE:
+    """The price cached for the request, business date and model"""
+    key = PricingResultCache.key(request.value, business_date.value, model.value, price_type)
+    return PricingResultCache.instance(cache).peek(key, _clock.evaluation_time)
+
+
+@sink_node(valid=("price", "request", "model"))
+def cache_price(price: PRICE,
+                request: TS[PricingRequest],
+                model: TS[PricingModel],
+                cache: str,
+                price_type: Type[PRICE],
+                business_date: CONTEXT[TS[date]] = REQUIRED["business_date"],
+                _clock: EvaluationClock = None):
+    """Caches the price computed by the model for the request and business date, the prices in error are not cached"""
+    if price.status.valid and price.status.value is StreamStatus.OK:
+        key = PricingResultCache.key(request.value, business_date.value, model.value, price_type)
+        PricingResultCache.instance(cache).put(key, price.value, _clock.evaluation_time)
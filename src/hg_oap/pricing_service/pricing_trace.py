@@ -0,0 +1,200 @@
+from bisect import bisect_left
+from collections import defaultdict, OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from time import perf_counter
+from typing import ClassVar
+
+from hgraph import CompoundScalar, TS, TIME_SERIES_TYPE, SIGNAL, STATE, MIN_DT, compute_node, graph
+
+from hg_oap.pricing_service.data_types import PricingModel, PricingRequest
+
+__all__ = ("PricingStage", "PricingLatency", "LatencyHistogram", "PricingTracer", "pricing_trace_stats",
+           "pricing_trace_dump", "trace_start", "trace_stage")
+
+
+class PricingStage(Enum):
+    """The stages of the pricing pipeline of the pricing service, in the order a request flows through them"""
+    INSTRUMENT = "instrument_by_name"
+    MODEL = "choose_pricing_model"
+    PRICE = "pricing_model"
+    ERRORS = "combine_errors"
+    PUBLISH = "publish_to_ui"
+
+
+@dataclass(frozen=True)
+class PricingLatency(CompoundScalar):
+    """
+    A summary of the latencies of a stage of the pricing pipeline, for the requests priced by the model on the path.
+    The latencies are in seconds, ``clock`` is either "wall" or "engine". The bucket counts are for the latencies up
+    to the matching bound in ``LatencyHistogram.BOUNDS``.
+    """
+    path: str
+    model: str
+    stage: PricingStage
+    clock: str
+    count: int
+    mean: float
+    max: float
+    buckets: tuple[int, ...]
+
+
+class LatencyHistogram:
+    """A histogram of latencies (in seconds) with logarithmic buckets from a micro-second to ten seconds"""
+
+    BOUNDS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0, float("inf"))
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(self.BOUNDS)
+
+    def record(self, latency: float):
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+        self.buckets[bisect_left(self.BOUNDS, latency)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class PricingTracer:
+    """
+    Collects the stage latencies of a pricing service. There is one tracer per service path, it is registered when the
+    service is wired with tracing enabled and is then looked up by the tracing nodes by path.
+
+    Besides the histograms, the latest latencies of each stage are kept per request, to find the requests that are
+    slow to price. These are kept for the ``max_requests`` most recently traced requests, so the requests that are no
+    longer priced are dropped.
+    """
+
+    MAX_REQUESTS: ClassVar[int] = 10_000
+
+    _tracers: ClassVar[dict[str, "PricingTracer"]] = {}
+
+    def __init__(self, path: str, max_requests: int = None):
+        self.path = path
+        self.max_requests = self.MAX_REQUESTS if max_requests is None else max_requests
+        self.histograms: dict[tuple[str, PricingStage, str], LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.latest: OrderedDict[PricingRequest, dict[PricingStage, tuple[float, float]]] = OrderedDict()
+
+    @classmethod
+    def register(cls, path: str, max_requests: int = None) -> "PricingTracer":
+        """Creates a new tracer for the path, replacing any previous one"""
+        cls._tracers[path] = tracer = cls(path, max_requests)
+        return tracer
+
+    @classmethod
+    def instance(cls, path: str) -> "PricingTracer":
+        if (tracer := cls._tracers.get(path)) is None:
+            raise ValueError(f"No pricing tracer is registered for '{path}'")
+        return tracer
+
+    def record(self, request: PricingRequest, model: PricingModel, stage: PricingStage, engine: float, wall: float):
+        model_name = type(model).__name__
+        self.histograms[(model_name, stage, "engine")].record(engine)
+        self.histograms[(model_name, stage, "wall")].record(wall)
+        if (latest := self.latest.get(request)) is None:
+            latest = self.latest[request] = {}
+            if len(self.latest) > self.max_requests:
+                self.latest.popitem(last=False)
+        else:
+            self.latest.move_to_end(request)
+        latest[stage] = (engine, wall)
+
+    def snapshot(self) -> tuple[PricingLatency, ...]:
+        return tuple(
+            PricingLatency(path=self.path, model=model, stage=stage, clock=clock, count=h.count, mean=h.mean,
+                           max=h.max, buckets=tuple(h.buckets))
+            for (model, stage, clock), h in sorted(self.histograms.items(), key=_histogram_order)
+        )
+
+    def dump(self) -> str:
+        lines = [f"{'model':<30} {'stage':<22} {'clock':<6} {'count':>8} {'mean (ms)':>10} {'max (ms)':>10}"]
+        for s in self.snapshot():
+            lines.append(f"{s.model:<30} {s.stage.value:<22} {s.clock:<6} {s.count:>8} {s.mean * 1e3:>10.3f} "
+                         f"{s.max * 1e3:>10.3f}")
+        return "\n".join(lines)
+
+
+_STAGE_ORDER = {stage: i for i, stage in enumerate(PricingStage)}
+
+
+def _histogram_order(item) -> tuple:
+    (model, stage, clock), _ = item
+    return model, _STAGE_ORDER[stage], clock
+
+
+@compute_node
+def trace_start(ts: TIME_SERIES_TYPE) -> TS[float]:
+    """Marks the (wall-clock) time the time-series ticked, this is the start of the traced pipeline"""
+    return perf_counter()
+
+
+@dataclass
+class _StageState:
+    pending: tuple[float, float] | None = None
+    measured: datetime = MIN_DT
+
+
+@compute_node(active=("ts", "model"), valid=("ts",))
+def trace_stage(ts: TIME_SERIES_TYPE,
+                previous: TS[float],
+                request: TS[PricingRequest],
+                model: TS[PricingModel],
+                stage: PricingStage,
+                path: str,
+                _state: STATE[_StageState] = None) -> TS[float]:
+    """
+    Records the latency between the tick of the previous stage (the mark produced by ``trace_start`` or a previous
+    ``trace_stage``) and the tick of ``ts``, the output of this stage, and marks the time for the next stage.
+    The latency is recorded once the model is known, as the stages before choosing the model complete before it.
+
+    Each mark of the previous stage is measured from once. The later ticks of a stage without a new mark from the
+    previous stage (i.e. a streaming price ticking long after the request was subscribed) are not recorded, they still
+    mark the time for the next stage so its latency is measured from this latest tick.
+    """
+    now = None
+    if ts.modified:
+        now = perf_counter()
+        if previous.valid and previous.last_modified_time > _state.measured:
+            _state.measured = previous.last_modified_time
+            engine = (ts.last_modified_time - previous.last_modified_time).total_seconds()
+            _state.pending = (engine, now - previous.value)
+
+    if _state.pending is not None and model.valid and request.valid:
+        PricingTracer.instance(path).record(request.value, model.value, stage, *_state.pending)
+        _state.pending = None
+
+    return now
+
+
+@compute_node
+def _trace_snapshot(trigger: SIGNAL, path: str) -> TS[tuple[PricingLatency, ...]]:
+    return PricingTracer.instance(path).snapshot()
+
+
+@compute_node
+def _trace_dump(trigger: SIGNAL, path: str) -> TS[str]:
+    return PricingTracer.instance(path).dump()
+
+
+@graph
+def pricing_trace_stats(trigger: SIGNAL, path: str = "instrument_price") -> TS[tuple[PricingLatency, ...]]:
+    """
+    The latency summaries of the pricing service on the path, sampled when the trigger ticks (for example on a
+    ``schedule``). The service must have been wired with ``trace=True``.
+    """
+    return _trace_snapshot(trigger, path)
+
+
+@graph
+def pricing_trace_dump(trigger: SIGNAL, path: str = "instrument_price") -> TS[str]:
+    """A printable table of the latency summaries of the pricing service on the path, sampled when the trigger ticks"""
+    return _trace_dump(trigger, path)
@@ -1,54 +1,101 @@
 from abc import abstractmethod
-from dataclasses import dataclass, Field, MISSING, field, InitVar, KW_ONLY
+from dataclasses import dataclass, Field, MISSING, field, InitVar, KW_ONLY, _FIELD_INITVAR
 from datetime import date
+from graphlib import TopologicalSorter, CycleError
 from inspect import isfunction, signature
+from operator import attrgetter
 
-from .op import Op, Expression, is_op, lazy
+from .op import Op, Expression, is_op, lazy, calc, GetattrOp, ParameterOp, FailedOp, find_op, IterOp, Iterator, \
+    ComprehensionOp, ChainCompareOp, optimise
 
-__all__ = ("dataclassex", "exprclass", "ExprClass", "replace")
+__all__ = ("dataclassex", "exprclass", "ExprClass", "replace", "evaluate_all")
 
 
-class _NO_VALUE: ...
+class _NO_VALUE:
+    def __reduce__(self):
+        return "NO_VALUE"
 
 
 NO_VALUE = _NO_VALUE()
 
 
 class _BaseExDescriptor:
+    """
+    Computes the value of an expression attribute on first access and caches it on the instance. The value can be
+    overridden (for example from the constructor), the override takes precedence over the expression.
+
+    The descriptors of an ``ExprClass`` have an ``index`` in the expression layout of the class (``__ex_layout__``).
+    The values of all the expressions of an instance are cached in a single list, created on first access, and the
+    overrides are recorded in a single field (``_ex_overrides``, a flat tuple of names and values) and copied into the
+    cache. Nothing is stored for expressions that are not used, and the instance dict is not touched so the attributes
+    can stay in the compact in-line layout of the interpreter. Stand-alone descriptors (``index`` is None) keep an
+    attribute per value.
+    """
+
+    index: int | None = None
+    depends_on: frozenset[str] | None = None  # the attributes of SELF used by the expression, None if not known
+    shared: Op | None = None  # the expression with the attribute chains of SELF replaced by _SelfChainOp
+
     def __init__(self, expr):
         self.expr = expr
 
     def __get__(self, instance, owner=None):
         if instance is not None:
-            if (
-                v := instance.__dict__.get(self.override_name, NO_VALUE)
-            ) is not NO_VALUE:
-                return v
-            if (v := instance.__dict__.get(self.cache_name, NO_VALUE)) is not NO_VALUE:
+            if (i := self.index) is None:
+                return self._get_attribute(instance)
+
+            if (cache := instance.__ex_cache__) is None:
+                cache = _new_cache(instance)
+            elif (v := cache[i]) is not NO_VALUE:
                 return v
 
             v = self.__calc__(instance)
-            object.__setattr__(instance, self.cache_name, v)
+            cache[i] = v
             return v
         elif owner:
             return self
 
+    def _get_attribute(self, instance):
+        if (v := instance.__dict__.get(self.override_name, NO_VALUE)) is not NO_VALUE:
+            return v
+        if (v := instance.__dict__.get(self.cache_name, NO_VALUE)) is not NO_VALUE:
+            return v
+
+        v = self.__calc__(instance)
+        object.__setattr__(instance, self.cache_name, v)
+        return v
+
     @abstractmethod
     def __calc__(self, instance): ...
 
+    def __result__(self, r):
+        """Converts the result of the expression to the value of the attribute"""
+        return r
+
+    def __evaluate__(self, instance):
+        """Computes the value of the attribute as part of ``evaluate_all``"""
+        if self.shared is None:
+            return self.__calc__(instance)
+        return self.__result__(calc(self.shared, instance))
+
     def __set__(self, instance, value):
         if value is not self and instance is not None:
             if not instance.__dataclass_params__.frozen:
-                setattr(instance, self.override_name, value)
+                self.__override__(instance, value)
             else:
                 raise AttributeError(f"field {self.name} in {instance} is readonly")
 
     def __override__(self, instance, value):
         if value is not self and instance is not None:
-            object.__setattr__(instance, self.override_name, value)
+            if self.index is None:
+                object.__setattr__(instance, self.override_name, value)
+            else:
+                _set_overrides(instance, {self.name: value})
 
     def __overriden__(self, instance):
-        return getattr(instance, self.override_name, NO_VALUE) is not NO_VALUE
+        if self.index is None:
+            return getattr(instance, self.override_name, NO_VALUE) is not NO_VALUE
+        return self.name in instance._ex_overrides[::2]
 
     def __set_name__(self, owner, name):
         self.name = name
@@ -56,6 +103,30 @@ class _BaseExDescriptor:
         self.override_name = f"_override_{self.name or id(self)}"
 
 
+_OVERRIDES = "_ex_overrides"
+_CACHE = "__ex_cache__"
+
+
+def _new_cache(instance) -> list:
+    cache = [NO_VALUE] * len(type(instance).__ex_layout__)
+    object.__setattr__(instance, _CACHE, cache)
+    return cache
+
+
+def _set_overrides(instance, overrides: dict):
+    """Records the overrides of the expressions of the instance, and replaces any value computed for them"""
+    current = instance._ex_overrides
+    overrides = dict(zip(current[::2], current[1::2])) | overrides
+    layout = type(instance).__ex_layout__
+    object.__setattr__(instance, _OVERRIDES, tuple(i for k in sorted(overrides, key=layout.get)
+                                                   for i in (k, overrides[k])))
+    # the cache may be shared with a copy of the instance
+    cache = list(instance.__ex_cache__ or (NO_VALUE,) * len(layout))
+    for k, v in overrides.items():
+        cache[layout[k]] = v
+    object.__setattr__(instance, _CACHE, cache)
+
+
 class CallableDescriptor(_BaseExDescriptor):
     def __calc__(self, instance):
         return self.expr(instance)
@@ -69,12 +140,17 @@ class CallableExpressionDescriptor(_BaseExDescriptor):
         else:
             return expr
 
+    def __evaluate__(self, instance):
+        return self.__calc__(instance)
+
 
 class DateDescriptor(_BaseExDescriptor):
     def __calc__(self, instance):
+        return self.__result__(self.expr(instance))
+
+    def __result__(self, r):
         from hg_oap.dates import is_dgen, make_date
 
-        r = self.expr(instance)
         if isinstance(r, date):
             return r
         elif is_dgen(r):
@@ -85,9 +161,11 @@ class DateDescriptor(_BaseExDescriptor):
 
 class DateListDescriptor(_BaseExDescriptor):
     def __calc__(self, instance):
+        return self.__result__(self.expr(instance))
+
+    def __result__(self, r):
         from hg_oap.dates import is_dgen, make_date
 
-        r = self.expr(instance)
         if isinstance(r, date):
             return [r]
         elif is_dgen(r):
@@ -99,8 +177,7 @@ class DateListDescriptor(_BaseExDescriptor):
 def _process_ops_and_lambdas(cls):
     cls.__annotations__.pop("SELF", None)
 
-    overridable = []
-    new_annotations = {}
+    layout = _inherited_layout(cls)
 
     for k, a in cls.__annotations__.items():
         if (op := getattr(cls, k, None)) is not None:
@@ -124,29 +201,27 @@ def _process_ops_and_lambdas(cls):
 
             if d:
                 cls.__annotations__[k] = InitVar[a]
-                overridable.append(k)
-
-                override = f"_override_{k}"
-                new_annotations[override] = a
-                setattr(
-                    cls,
-                    override,
-                    field(
-                        default=NO_VALUE,
-                        init=False,
-                        repr=False,
-                        metadata={"hidden": True},
-                    ),
-                )
+                d.index = layout.setdefault(k, len(layout))
+
+    cls.__ex_layout__ = layout
+    cls.__ex_cache__ = None
+    cls.__ex_dependencies__ = _dependencies(cls, layout)
+    cls.__ex_order__ = _evaluation_order(cls.__ex_dependencies__)
+
+    new_annotations = {}
+    if layout and not any(_OVERRIDES in getattr(b, "__dataclass_fields__", {}) for b in cls.__mro__[1:]):
+        new_annotations[_OVERRIDES] = tuple
+        setattr(cls, _OVERRIDES, field(default=(), init=False, repr=False, metadata={"hidden": True}))
 
     cls.__annotations__ = {"_": KW_ONLY, **cls.__annotations__, **new_annotations}
 
     original_post_init = getattr(cls, "__post_init__", None)
 
     def post_init(self, *args):
-        for k, v in zip(overridable, args):
-            if not isinstance(v, _BaseExDescriptor):
-                object.__setattr__(self, f"_override_{k}", v)
+        overrides = {k: v for i, k in _expression_init_vars(type(self))
+                     if i < len(args) and not isinstance(v := args[i], _BaseExDescriptor)}
+        if overrides:
+            _set_overrides(self, overrides)
         if original_post_init:
             # ideally we would figure out if there were any initvars in the original annotations and filter on those
             # and pass in but dataclasses using positional args for initvars makes it difficult to do this
@@ -157,10 +232,127 @@ def _process_ops_and_lambdas(cls):
     return cls
 
 
+def _inherited_layout(cls) -> dict[str, int]:
+    """The expression layout of the base classes, the expressions keep the positions they have in the bases"""
+    layout = {}
+    for base in cls.__mro__[:0:-1]:
+        for k, i in base.__dict__.get("__ex_layout__", {}).items():
+            if layout.setdefault(k, i) != i or list(layout.values()).count(i) > 1:
+                raise TypeError(f"{cls.__name__} inherits expressions from more than one ExprClass base with "
+                                f"conflicting layouts")
+    return dict(sorted(layout.items(), key=lambda item: item[1]))
+
+
+def _expression_init_vars(cls) -> tuple[tuple[int, str], ...]:
+    """
+    The positions (in the arguments passed to ``__post_init__``) and names of the InitVars of the dataclass that are
+    expressions
+    """
+    if (init_vars := cls.__dict__.get("__ex_init_vars__")) is None:
+        names = [k for k, f in getattr(cls, "__dataclass_fields__", {}).items() if f._field_type is _FIELD_INITVAR]
+        init_vars = tuple((i, k) for i, k in enumerate(names) if k in cls.__ex_layout__)
+        cls.__ex_init_vars__ = init_vars
+    return init_vars
+
+
+def _dependencies(cls, layout: dict[str, int]) -> dict[str, frozenset[str] | None]:
+    """The expressions (of the layout) each expression of the class depends on, None if not known (i.e. lambdas)"""
+    dependencies = {}
+    for k in layout:
+        if isinstance(d := getattr(cls, k, None), _BaseExDescriptor):
+            dependencies[k] = None if d.depends_on is None else frozenset(d.depends_on & layout.keys())
+    return dependencies
+
+
+def _evaluation_order(dependencies: dict[str, frozenset[str] | None]) -> tuple[str, ...]:
+    """
+    The order to evaluate the expressions in so that each is computed after the expressions it depends on. The
+    expressions with unknown dependencies come last, and should there be a cycle (which is possible if one of the
+    expressions is always overridden) the expressions are left in the order they are declared.
+    """
+    known = {k: d for k, d in dependencies.items() if d is not None}
+    try:
+        order = tuple(TopologicalSorter(known).static_order())
+    except CycleError:
+        order = tuple(known)
+    return order + tuple(k for k, d in dependencies.items() if d is None)
+
+
+def _is_self(op) -> bool:
+    return isinstance(op, ParameterOp) and (op._index == 0 or op._name == "SELF")
+
+
+def _self_chain(op) -> tuple[str, ...] | None:
+    """The attribute names of ``op`` if it is a chain of attribute lookups on SELF (i.e. ``SELF.series.spec``)"""
+    attributes = []
+    while isinstance(op, GetattrOp):
+        attributes.append(op._attr)
+        op = op._obj
+    return tuple(reversed(attributes)) if attributes and _is_self(op) else None
+
+
+def _analyse(descriptor: _BaseExDescriptor, op: Op):
+    """
+    Finds the attribute chains of SELF in the expression, the first attribute of each chain gives the dependencies of
+    the expression. Unless the expression contains a comprehension or chained comparison (these bind parameters of
+    their own), a copy of the expression is made for ``evaluate_all`` with each chain looked up in one step.
+    """
+    chains = {}
+
+    def visit(x):
+        if isinstance(x, Op):
+            if (chain := _self_chain(x)) is not None:
+                chains[x] = chain
+            else:
+                x.__visit_operands__(visit)
+        return False, True
+
+    visit(op)
+    descriptor.depends_on = frozenset(c[0] for c in chains.values())
+    if chains and not find_op(op, (IterOp, Iterator, ComprehensionOp, ChainCompareOp)):
+
+        def rewrite(x):
+            if not isinstance(x, Op):
+                return x
+            if (chain := chains.get(x)) is not None:
+                return _SelfChainOp(chain)
+            return x.__transform__(rewrite)
+
+        descriptor.shared = optimise(rewrite(op))
+
+
+class _SelfChainOp(Op):
+    """A chain of attribute lookups on SELF (the first argument), i.e. ``SELF.series.spec``, performed in one step"""
+
+    def __init__(self, _chain: tuple[str, ...]):
+        super().__init__(16)
+        self._chain = _chain
+        self._getter = attrgetter(".".join(_chain))
+
+    def __repr__(self):
+        return ".".join(("SELF",) + self._chain)
+
+    def __invoke__(self, *args, **kwargs):
+        try:
+            return self._getter(args[0])
+        except AttributeError as e:
+            return FailedOp(f"{args[0]} does not have the attribute chain {'.'.join(self._chain)}", _cause=e)
+
+    def __visit_operands__(self, fn):
+        return None
+
+    def __args__(self):
+        return self._chain,
+
+    def __transform__(self, fn=lambda x: x):
+        return self.__class__(self._chain)
+
+
 def _make_descriptor(annotation, cls, descriptor_type, name, op):
     if isinstance(op, Op):
         descriptor = descriptor_type(Expression(op))
         descriptor.__set_name__(cls, name)
+        _analyse(descriptor, op)
         return descriptor
     elif isfunction(op) and op.__name__ == "<lambda>":
         if len(signature(op).parameters) == 1:
@@ -185,6 +377,31 @@ def exprclass(cls):
     return _process_ops_and_lambdas(cls)
 
 
+def evaluate_all(obj, /, raise_: bool = True) -> dict:
+    """
+    Computes all the expression attributes of the instance of an ExprClass (the ones not already computed or
+    overridden), rather than one at a time on first access, and returns the values by name.
+
+    The expressions are evaluated in dependency order, as worked out when the class was created, so the expressions
+    used by other expressions are computed (and cached) first. The attribute chains of SELF (i.e.
+    ``SELF.series.spec.tick_size``) are looked up in one step rather than an attribute at a time.
+
+    With ``raise_=False`` the attributes that fail to compute are left out (and raise when accessed) rather than
+    stopping the evaluation.
+    """
+    cls = type(obj)
+    cache = obj.__ex_cache__ or _new_cache(obj)
+    for k in cls.__ex_order__:
+        d = getattr(cls, k)
+        if cache[d.index] is NO_VALUE:
+            try:
+                cache[d.index] = d.__evaluate__(obj)
+            except Exception:
+                if raise_:
+                    raise
+    return {k: v for k, i in cls.__ex_layout__.items() if (v := cache[i]) is not NO_VALUE}
+
+
 def replace(obj, /, **changes):
     """Return a new object replacing specified fields with new values. Make sure to NOT copy expression fields unless
     they are overridden on the source object
@@ -1,10 +1,12 @@
 import inspect
 import itertools
 import operator
+import threading
 from collections import defaultdict
 from typing import Callable, Union, Sequence, Mapping, Any
 
-__all__ = ('lazy', 'calc', 'ParameterOp', 'Expression', 'is_op')
+__all__ = ('lazy', 'calc', 'ParameterOp', 'Expression', 'is_op', 'structure', 'structural_hash', 'structurally_equal',
+           'OpKey', 'optimise', 'SharedOp', 'SharedScopeOp')
 
 
 def is_op(obj):
@@ -85,6 +87,21 @@ class Op:
         """
         raise NotImplementedError()
 
+    def __args__(self) -> tuple:
+        """
+        The arguments to construct a copy of this ``Op`` with, ``type(op)(*op.__args__())`` produces an equivalent op.
+        This is used to pickle and copy the op, and is the basis of its ``__structure__``.
+        """
+        raise NotImplementedError()
+
+    def __structure__(self) -> tuple:
+        """
+        A hashable description of the tree rooted at this op, two trees with the same structure compute the same
+        result. As ``__eq__`` builds an AST rather than comparing, use ``structurally_equal``, ``structural_hash``
+        or ``OpKey`` to compare ops or to use them as keys.
+        """
+        return (type(self),) + tuple(structure(a) for a in self.__args__())
+
     def __transform__(self, fn=lambda x: x):
         """
         Supports transforming an ``Op`` instance from its current type to some other type as defined by the ``fn``.
@@ -137,10 +154,9 @@ class Op:
         """
         This will construct the BinaryOpReversible AST element, with a priority of 6 and self with the other as the
         binary parameters. The operator.lt is the standard Python implementation.
-        To reverse this, we use the rhs > lhs lambda.
+        To reverse this, we use rhs > lhs.
         """
-        o = BinaryOpReversible(COMPARISON_OPERATOR_PRIORITY, self, other, operator.lt, '<',
-                               lambda x: x._rhs > x._lhs)
+        o = BinaryOpReversible(COMPARISON_OPERATOR_PRIORITY, self, other, operator.lt, '<', _reverse_lt)
 
         if lhs := self.__compared__:
             return ChainCompareOp(self, lhs, o)
@@ -148,8 +164,7 @@ class Op:
             return o
 
     def __le__(self, other):
-        o = BinaryOpReversible(COMPARISON_OPERATOR_PRIORITY, self, other, operator.le, '<=',
-                               lambda x: x._rhs >= x._lhs)
+        o = BinaryOpReversible(COMPARISON_OPERATOR_PRIORITY, self, other, operator.le, '<=', _reverse_le)
 
         if lhs := self.__compared__:
             return ChainCompareOp(self, lhs, o)
@@ -163,12 +178,10 @@ class Op:
         return BinaryOp(COMPARISON_OPERATOR_PRIORITY, self, other, operator.ne, '!=')
 
     def __gt__(self, other):
-        return BinaryOpReversible(COMPARISON_OPERATOR_PRIORITY, self, other, operator.gt, '>',
-                                  lambda x: x._rhs < x._lhs)
+        return BinaryOpReversible(COMPARISON_OPERATOR_PRIORITY, self, other, operator.gt, '>', _reverse_gt)
 
     def __ge__(self, other):
-        return BinaryOpReversible(COMPARISON_OPERATOR_PRIORITY, self, other, operator.ge, '>=',
-                                  lambda x: x._rhs <= x._lhs)
+        return BinaryOpReversible(COMPARISON_OPERATOR_PRIORITY, self, other, operator.ge, '>=', _reverse_ge)
 
     def __hash__(self):
         return id(self)
@@ -276,16 +289,33 @@ class Op:
         return IterOp(self)
 
     def __copy__(self):
-        raise NotImplementedError()
+        return type(self)(*self.__args__())
 
     def __deepcopy__(self, memo):
-        raise NotImplementedError()
+        from copy import deepcopy
+        return type(self)(*deepcopy(self.__args__(), memo))
 
     def __reduce__(self):
-        raise NotImplementedError()
+        return type(self), self.__args__()
 
     def __reduce_ex__(self, protocol):
-        raise NotImplementedError()
+        return self.__reduce__()
+
+
+def _reverse_lt(x):
+    return x._rhs > x._lhs
+
+
+def _reverse_le(x):
+    return x._rhs >= x._lhs
+
+
+def _reverse_gt(x):
+    return x._rhs < x._lhs
+
+
+def _reverse_ge(x):
+    return x._rhs <= x._lhs
 
 
 class ConstOp(Op):
@@ -313,6 +343,9 @@ class ConstOp(Op):
     def __visit_operands__(self, fn):
         return fn(self._value)[0]
 
+    def __args__(self):
+        return self._value,
+
     def __transform__(self, fn=lambda x: x):
         return ConstOp(self._value)
 
@@ -342,6 +375,9 @@ class GetattrOp(Op):
         r, c = fn(self._obj)
         return r
 
+    def __args__(self):
+        return self._obj, self._attr
+
     def __transform__(self, fn=lambda x: x):
         return self.__class__(fn(self._obj), self._attr)
 
@@ -370,6 +406,9 @@ class UnaryOp(Op):
         r, c = fn(self._obj)
         return r
 
+    def __args__(self):
+        return self._priority, self._obj, self._op, self._format
+
     def __transform__(self, fn=lambda x: x):
         return self.__class__(self._priority, fn(self._obj), self._op, self._format)
 
@@ -418,6 +457,9 @@ class BinaryOp(Op):
         r, c = fn(self._rhs)
         return r
 
+    def __args__(self):
+        return self._priority, self._lhs, self._rhs, self._op, self._format
+
     def __transform__(self, fn=lambda x: x):
         """
         Returns a new instance of this class (with this priority, this op and this format) with the results
@@ -479,6 +521,9 @@ class BinaryOpReversible(BinaryOp):
 
         return FailedOp("__bool__ is not supported on Op")
 
+    def __args__(self):
+        return self._priority, self._lhs, self._rhs, self._op, self._format, self._reversed
+
     def __transform__(self, fn=lambda x: x):
         return self.__class__(self._priority, fn(self._lhs), fn(self._rhs), self._op, self._format,
                               self._reversed)
@@ -503,13 +548,22 @@ class ChainCompareOp(Op):
     a ``ParameterOp`` which can be used to replace the shared operand in both the ``lhs`` and ``rhs`` ops. The
     parameter op ensures that the ``_obj`` is only evaluated once in the comparison operations as expected.
     """
-    def __init__(self, _obj, _lhs: Op, _rhs: Op):
+    def __init__(self, _obj, _lhs: Op, _rhs: Op, _parameter: "ParameterOp" = None):
+        """
+        When the ``_parameter`` is given, the ``lhs`` and ``rhs`` are taken to have the shared operand replaced by it
+        already (this is the case when copying or transforming the op).
+        """
         super().__init__(_priority=COMPARISON_OPERATOR_PRIORITY)
-        _lhs.__clear__compared__()
         self._obj = _obj
-        self._parameter = ParameterOp(_name='chain_op_parameter' + str(id(self)))
-        self._lhs = _lhs.__transform__(lambda x: self._parameter if self._obj is x else x)
-        self._rhs = _rhs.__transform__(lambda x: self._parameter if self._obj is x else x)
+        if _parameter is not None:
+            self._parameter = _parameter
+            self._lhs = _lhs
+            self._rhs = _rhs
+        else:
+            _lhs.__clear__compared__()
+            self._parameter = ParameterOp(_name='chain_op_parameter' + str(id(self)))
+            self._lhs = _lhs.__transform__(lambda x: self._parameter if self._obj is x else x)
+            self._rhs = _rhs.__transform__(lambda x: self._parameter if self._obj is x else x)
 
     def __invoke__(self, *args, **kwargs):
         """
@@ -543,13 +597,25 @@ class ChainCompareOp(Op):
         r, c = fn(self._rhs)
         return r
 
+    def __args__(self):
+        return self._obj, self._lhs, self._rhs, self._parameter
+
+    def __structure__(self):
+        # the name of the parameter is unique to the instance, so the shared operand is put back in its place
+        restore = lambda x: self._obj if x is self._parameter else x.__transform__(restore) if isinstance(x, Op) else x
+        return type(self), structure(self._obj), structure(restore(self._lhs)), structure(restore(self._rhs))
+
     def __transform__(self, fn=lambda x: x):
-        return self.__class__(fn(self._obj), fn(self._lhs), fn(self._rhs))
+        return self.__class__(fn(self._obj), fn(self._lhs), fn(self._rhs), self._parameter)
 
 
 class Item:
     __expression__ = None
 
+    def __getstate__(self):
+        # the expression is the ConstOp wrapping the item (if any), this is not part of the state of the item
+        return {k: v for k, v in self.__dict__.items() if k not in ('__expression__', '__compared__')}
+
 
 class GetitemOp(BinaryOpSpecial):
     def __init__(self, _obj: Op, _item):
@@ -568,6 +634,9 @@ class GetitemOp(BinaryOpSpecial):
 
         return self._op(lhs, rhs)
 
+    def __args__(self):
+        return self._lhs, self._rhs
+
     def __transform__(self, fn=lambda x: x):
         return self.__class__(fn(self._lhs), fn(self._rhs))
 
@@ -617,11 +686,14 @@ class CallOp(Op):
         for a in self._args:
             r, c = fn(a)
             if not c: return r
-        for _, a in self._kwargs:
+        for a in self._kwargs.values():
             r, c = fn(a)
             if not c: return r
         return r
 
+    def __args__(self):
+        return self._fn, tuple(self._args), dict(self._kwargs)
+
     def __transform__(self, fn=lambda x: x):
         return self.__class__(fn(self._fn), tuple(fn(a) for a in self._args),
                               {k: fn(v) for k, v in self._kwargs.items()})
@@ -654,6 +726,9 @@ class IterOp(Op):
         r, c = fn(self._obj)
         return r
 
+    def __args__(self):
+        return self._obj,
+
     def __transform__(self, fn=lambda x: x):
         return self.__class__(fn(self._obj))
 
@@ -688,6 +763,9 @@ class Iterator(Op):
         r, c = fn(self._obj)
         return r
 
+    def __args__(self):
+        return self._obj,
+
     def __transform__(self, fn=lambda x: x):
         return self.__class__(fn(self._obj))
 
@@ -722,6 +800,9 @@ class ParameterOp(Op):
     def __visit_operands__(self, fn):
         return None
 
+    def __args__(self):
+        return self._index, self._name, self._type
+
     def __transform__(self, fn=lambda x: x):
         return self.__class__(_index=self._index, _name=self._name, _type=self._type)
 
@@ -761,6 +842,11 @@ class SequenceOp(Op):
                 return r
         return r
 
+    def __args__(self):
+        if self._tp is dict:
+            return {kv._items[0]: kv._items[1] for kv in self._items},
+        return self._tp(self._items),
+
     def __transform__(self, fn=lambda x: x):
         return self.__class__(self._tp(fn(i) for i in self._items))
 
@@ -775,11 +861,31 @@ class KeyValueOp(SequenceOp):
 
 
 class ComprehensionOp(Op):
+    """
+    A list, tuple or dict comprehension over the iterators (``IterOp``) in ``_item``. The iterators are found and
+    replaced by parameters once, on construction, leaving the loops to bind the values to the parameters and evaluate
+    the item for each combination of the values.
+
+    The loops are nested by the dependencies between the iterators, an iterator over the values of another is looped
+    over inside it (``[j for i in _0 for j in i]``), the independent iterators of a loop are combined as a product.
+    """
     def __init__(self, _tp, _item):
         super().__init__(_priority=17)
         self._tp = _tp
         self._item = _item
 
+        layers, iterators = find_iterators(_item, tp=IterOp)
+        assert len(iterators) <= 6, "Comprehensions with more than 6 iterators are not supported"
+        parameters = {it: ParameterOp(_name="ijklmn"[i]) for i, it in enumerate(iterators)}
+        replacer = lambda x: y if ((y := parameters.get(x, None) if isinstance(x, Op) else x) is not None
+                                   ) else x.__transform__(replacer)
+        self._expr = replacer(_item)
+        self._compiled = _compile(self._expr, {p._name for p in parameters.values()})
+        # the outermost loop first, each loop is the names bound and the ops giving the values to bind them to
+        self._loops = tuple(
+            (tuple(parameters[it]._name for it in layer), tuple(replacer(it._obj) for it in layer))
+            for layer in reversed(layers) if layer)
+
     def __repr__(self):
         layers, iterators = find_iterators(self._item, tp=IterOp)
         iterators = {it: ParameterOp(_name="ijklmn"[i]) for i, it in enumerate(iterators)}
@@ -789,36 +895,195 @@ class ComprehensionOp(Op):
         return f.format(repr(item), ' '.join(f"for {iterators[i]._name} in {repr(i)}" for i in iterators))
 
     def __invoke__(self, *args, **kwargs):
-        return self._tp(i for i in self._generate(self._item, *args, **kwargs))
+        bindings = dict(kwargs)
+        if len(self._loops) == 1 and len(self._loops[0][0]) == 1:
+            # a single loop over a single iterator
+            (name,), (values,) = self._loops[0]
+            values = values.__invoke__(*args, **bindings)
+            if isinstance(values, FailedOp):
+                return values
+            expr = self._compiled
+            items = []
+            for v in values:
+                bindings[name] = v
+                items.append(expr(args, bindings))
+            return self._tp(items)
+
+        try:
+            return self._tp(self._generate(0, args, bindings))
+        except FailedOp as e:
+            return e
+
+    def _generate(self, loop, args, bindings):
+        names, ops = self._loops[loop]
+        values = []
+        for op in ops:
+            v = op.__invoke__(*args, **bindings)
+            if isinstance(v, FailedOp):
+                raise v
+            values.append(v)
+
+        inner = loop + 1 < len(self._loops)
+        expr = self._compiled
+        for combination in (itertools.product(*values) if len(values) > 1 else zip(values[0])):
+            bindings.update(zip(names, combination))
+            if inner:
+                yield from self._generate(loop + 1, args, bindings)
+            else:
+                yield expr(args, bindings)
 
     def __visit_operands__(self, fn):
         r, c = fn(self._item)
         return r
 
+    def __args__(self):
+        return self._tp, self._item
+
     def __transform__(self, fn=lambda x: x):
         return self.__class__(self._tp, fn(self._item))
 
-    @staticmethod
-    def _generate(expr, *args, **kwargs):
-        layers, iterators = find_iterators(expr, tp=IterOp)
-        assert len(iterators) <= 6, "Comprehensions with more than 6 iterators are not supported"
-        iterators = {it: ParameterOp(_name="ijklmn"[i]) for i, it in enumerate(iterators)}
-        replacer = lambda x: y if ((y := iterators.get(x, None) if isinstance(x, Op) else x) is not None
-                                   ) else x.__transform__(replacer)
-        expr = replacer(expr)
 
-        def gen(remaining_layers):
-            ti = {iterators[i]._name: i.__transform__(replacer) for i in remaining_layers[0]}
-            ti = {n: i.__invoke__(*args, **kwargs, **{it._name: it for it in iterators.values()}) for n, i in
-                  ti.items()}
-            for values in (gen(remaining_layers[1:]) if len(remaining_layers) > 1 else [{}]):
-                for k, v in ti.items():
-                    v.__invoke__(**values)
-                for vals in itertools.product(*ti.values()):
-                    yield {**values, **{k: v for k, v in zip(ti.keys(), vals)}}
+def _compile(op, names):
+    """
+    Converts the item expression of a comprehension into a function of the args and keyword args of the evaluation,
+    the values of the comprehension parameters (``names``) are looked up in the keyword args. The operators on
+    constants and parameters become plain calls, the other ops are invoked as is.
+    """
+    tp = type(op)
+    if tp is ConstOp and not isinstance(op._value, Item):
+        value = op._value
+        return lambda a, k: value
+    if tp is ParameterOp and op._name in names:
+        name = op._name
+        return lambda a, k: k[name]
+    if tp in (BinaryOp, BinaryOpSpecial, BinaryOpReversible, GetitemOp):
+        lhs, rhs, fn = _compile(op._lhs, names), _compile(op._rhs, names), op._op
+
+        def binary(a, k):
+            l = lhs(a, k)
+            if isinstance(l, FailedOp):
+                return l
+            r = rhs(a, k)
+            if isinstance(r, FailedOp):
+                return r
+            return fn(l, r)
+
+        return binary
+    if tp is UnaryOp:
+        obj, fn = _compile(op._obj, names), op._op
+
+        def unary(a, k):
+            o = obj(a, k)
+            return o if isinstance(o, FailedOp) else fn(o)
+
+        return unary
+    if tp is GetattrOp:
+        obj, attr = _compile(op._obj, names), op._attr
+
+        def get(a, k):
+            o = obj(a, k)
+            if isinstance(o, FailedOp):
+                return o
+            try:
+                return getattr(o, attr)
+            except AttributeError as e:
+                return FailedOp(f"{o} does not have an attribute named {attr}", _cause=e)
+
+        return get
+
+    invoke = op.__invoke__
+    return lambda a, k: invoke(*a, **k)
+
+
+_UNSET = object()
+
+
+class _SharedValues(threading.local):
+    """
+    The values of the shared sub-expressions for the evaluation of a ``SharedScopeOp`` in progress on this thread. These
+    are not passed down with the parameters as evaluating the ops with keyword arguments costs more than is saved.
+    """
+    values: list = None
+
+
+class SharedOp(Op):
+    """
+    A sub-expression that occurs more than once in an expression (see ``optimise``). Within a ``SharedScopeOp`` it is
+    evaluated on first use and each occurrence then reuses the result, the result is held in the ``_slot`` of the
+    values of the evaluation of the scope.
+    """
+    def __init__(self, _obj: Op, _slot: int, _shared: _SharedValues):
+        super().__init__(_priority=18)
+        self._obj = _obj
+        self._slot = _slot
+        self._shared = _shared
+
+    def __repr__(self):
+        return f"${self._slot}"
+
+    def __invoke__(self, *args, **kwargs):
+        if (values := self._shared.values) is None:
+            return self._obj.__invoke__(*args, **kwargs)
+        if (value := values[self._slot]) is _UNSET:
+            value = values[self._slot] = self._obj.__invoke__(*args, **kwargs)
+        return value
+
+    def __visit_operands__(self, fn):
+        r, c = fn(self._obj)
+        return r
+
+    def __args__(self):
+        return self._obj, self._slot, self._shared
+
+    def __structure__(self):
+        return structure(self._obj)
+
+    def __transform__(self, fn=lambda x: x):
+        return self.__class__(fn(self._obj), self._slot, self._shared)
+
+
+class SharedScopeOp(Op):
+    """The root of an expression with shared sub-expressions, provides the ``_slots`` values for each evaluation"""
+    def __init__(self, _body: Op, _slots: int, _shared: _SharedValues):
+        super().__init__(_priority=_body.__priority__())
+        self._body = _body
+        self._slots = _slots
+        self._shared = _shared
+
+    def __repr__(self):
+        shared = {}
+
+        def f(x):
+            if isinstance(x, Op):
+                if isinstance(x, SharedOp) and x._slot not in shared:
+                    shared[x._slot] = x._obj
+                x.__visit_operands__(f)
+            return False, True
+
+        f(self._body)
+        return f"let {', '.join(f'${k} = {shared[k]!r}' for k in sorted(shared))}: {self._body!r}"
+
+    def __invoke__(self, *args, **kwargs):
+        # the values of an evaluation of the scope within another (i.e. by an expression attribute) are kept apart
+        shared = self._shared
+        outer, shared.values = shared.values, [_UNSET] * self._slots
+        try:
+            return self._body.__invoke__(*args, **kwargs)
+        finally:
+            shared.values = outer
+
+    def __visit_operands__(self, fn):
+        r, c = fn(self._body)
+        return r
+
+    def __args__(self):
+        return self._body, self._slots, self._shared
 
-        for values in gen(layers):
-            yield expr.__invoke__(**values)
+    def __structure__(self):
+        return structure(self._body)
+
+    def __transform__(self, fn=lambda x: x):
+        return self.__class__(fn(self._body), self._slots, self._shared)
 
 
 class FailedOp(Exception):
@@ -897,6 +1162,171 @@ def replace(op, mapping):
     return replacer(op)
 
 
+_ITERATION = (IterOp, Iterator, ComprehensionOp)
+
+
+def _is_opaque(op) -> bool:
+    # comprehensions re-bind their iterators for each item and chained comparisons bind a parameter of their own, the
+    # optimisations do not look inside these
+    return isinstance(op, ChainCompareOp) or find_op(op, _ITERATION)
+
+
+def _is_leaf(op) -> bool:
+    return not isinstance(op, Op) or isinstance(op, (ConstOp, ParameterOp))
+
+
+def _size(op) -> int:
+    size = 0
+
+    def f(x):
+        nonlocal size
+        if isinstance(x, Op):
+            size += 1
+            x.__visit_operands__(f)
+        return False, True
+
+    f(op)
+    return size
+
+
+def _fold(op):
+    """Replaces the unary and binary operations on constants with the constant result"""
+    if _is_leaf(op) or _is_opaque(op):
+        return op
+    op = op.__transform__(_fold)
+    if isinstance(op, BinaryOp) and not isinstance(op, GetitemOp):
+        operands = (op._lhs, op._rhs)
+    elif isinstance(op, UnaryOp):
+        operands = (op._obj,)
+    else:
+        return op
+    if not all(isinstance(o, ConstOp) for o in operands):
+        return op
+
+    try:
+        value = op.__invoke__()
+        hash(value)
+    except Exception:
+        # left for the evaluation to report
+        return op
+    if isinstance(value, (Op, FailedOp, Item)):
+        return op
+    return ConstOp(value)
+
+
+# the number of op evaluations the sharing of a sub-expression must save, evaluating the few ops of the arithmetic on a
+# parameter or of a short attribute chain again costs less than the slot of a ``SharedScopeOp``
+_SHARE_SIZE = 8
+
+
+def _share(op):
+    """
+    Replaces the sub-expressions that occur more than once with ``SharedOp``s, when this saves evaluating at least
+    ``_SHARE_SIZE`` ops
+    """
+    keys = {}
+    counts = defaultdict(int)
+
+    calls = set()
+
+    def count(x):
+        if isinstance(x, Op) and not _is_leaf(x):
+            k = keys[x] = OpKey(x)
+            counts[k] += 1
+            if find_op(x, CallOp):
+                # the callable may not be pure (or may return an iterator), so each call is evaluated
+                calls.add(k)
+            # only the first occurrence of the others is looked into, their sub-expressions are not evaluated again
+            if (counts[k] == 1 or k in calls) and not _is_opaque(x):
+                x.__visit_operands__(count)
+        return False, True
+
+    count(op)
+    repeated = {k for k, n in counts.items() if n > 1 and k not in calls and (n - 1) * _size(k.op) >= _SHARE_SIZE}
+    if not repeated:
+        return op
+
+    shared = {}
+    values = _SharedValues()
+
+    def rewrite(x):
+        if _is_leaf(x):
+            return x
+        k = keys.get(x)
+        if k in repeated:
+            if (s := shared.get(k)) is None:
+                s = SharedOp(x if _is_opaque(x) else x.__transform__(rewrite), len(shared), values)
+                shared[k] = s
+            return s
+        return x if k is None or _is_opaque(x) else x.__transform__(rewrite)
+
+    return SharedScopeOp(rewrite(op), len(shared), values)
+
+
+def optimise(op):
+    """
+    Returns an op that computes the same result as ``op`` with less work: the unary and binary operations on constants
+    are computed once (the constant folding) and the sub-expressions that occur more than once are evaluated once per
+    evaluation and then reused (the common sub-expression elimination), when they are large enough for this to pay
+    off. Calls are neither folded nor shared as the callable may not be pure, nor are the sub-expressions containing
+    calls shared, and the operations that give a mutable result are not folded.
+    """
+    if _is_leaf(op):
+        return op
+    return _share(_fold(op))
+
+
+def structure(x) -> tuple:
+    """
+    A hashable description of the op tree (or of a value used in one), see ``Op.__structure__``. Objects that define
+    ``__structure__`` (i.e. date generators) describe themselves, collections are described by their elements, other
+    hashable values by their type and value and unhashable ones by their identity.
+    """
+    if (s := getattr(type(x), '__structure__', None)) is not None:
+        return s(x)
+    if isinstance(x, (tuple, list)):
+        return (type(x),) + tuple(structure(i) for i in x)
+    if isinstance(x, dict):
+        return dict, frozenset((structure(k), structure(v)) for k, v in x.items())
+    if isinstance(x, (set, frozenset)):
+        return type(x), frozenset(structure(i) for i in x)
+    try:
+        hash(x)
+    except TypeError:
+        return id, id(x)
+    return type(x), x
+
+
+def structural_hash(x) -> int:
+    """The hash of the structure of the op tree, equal for trees that are ``structurally_equal``"""
+    return hash(structure(x))
+
+
+def structurally_equal(a, b) -> bool:
+    """True if the two op trees have the same structure (and so compute the same results)"""
+    return a is b or structure(a) == structure(b)
+
+
+class OpKey:
+    """Wraps an op tree to use it as a key (in a dict or cache) by its structure"""
+
+    __slots__ = ('op', '_structure', '_hash')
+
+    def __init__(self, op):
+        self.op = op
+        self._structure = structure(op)
+        self._hash = hash(self._structure)
+
+    def __eq__(self, other):
+        return isinstance(other, OpKey) and self._hash == other._hash and self._structure == other._structure
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return f"OpKey({self.op!r})"
+
+
 def calc(expr: Union[Op, Sequence[Op], Mapping], *args, raise_=True, **kwargs):
     expr = make_op(expr)
     r = expr.__invoke__(*args, **kwargs)
@@ -907,14 +1337,37 @@ def calc(expr: Union[Op, Sequence[Op], Mapping], *args, raise_=True, **kwargs):
 
 
 class Expression:
+    """
+    A callable wrapping an op tree. The op is optimised (see ``optimise``) when the expression is first called, setting
+    ``Expression.debug`` makes the repr show the optimised op rather than the op as written.
+    """
+
+    debug: bool = False
+    _optimised = None
+
     def __init__(self, op: Op):
         self._op = op
 
     def __call__(self, *args, **kwargs):
-        return calc(self._op, *args, **kwargs)
+        return calc(self.optimised, *args, **kwargs)
+
+    @property
+    def optimised(self):
+        if (op := self._optimised) is None:
+            op = self._optimised = optimise(self._op)
+        return op
 
     def __repr__(self):
-        return repr(self._op)
+        return repr(self.optimised if Expression.debug else self._op)
+
+    def __getstate__(self):
+        return {'_op': self._op}
+
+    def __eq__(self, other):
+        return isinstance(other, Expression) and structurally_equal(self._op, other._op)
+
+    def __hash__(self):
+        return structural_hash(self._op)
 
     @property
     def __signature__(self):
@@ -1,10 +1,11 @@
-from datetime import date
+from datetime import date, timedelta
 
+import numpy as np
 import pytest
 
 from hg_oap.dates import CalendarImpl, DelegateCalendar, UnionCalendar
 from hg_oap.dates.calendar import WeekendCalendar, HolidayCalendar
-from hg_oap.dates.dgen import weeks
+from hg_oap.dates.dgen import weeks, business_days
 
 
 @pytest.mark.parametrize(['d', 't', 'r'], (
@@ -124,3 +125,45 @@ def test_union_calendar():
     assert cal.is_business_day(date(2024, 3, 28))
     assert not cal.is_business_day(date(2024, 4, 1))
     assert not cal.is_business_day(date(2024, 3, 29))
+
+
+class _GoodFridayCalendar(WeekendCalendar):
+    """A calendar overriding the business day methods without providing its holidays for the business day table"""
+
+    def is_holiday(self, d: date) -> bool:
+        return d == date(2024, 3, 29)
+
+    def is_holiday_or_weekend(self, d: date) -> bool:
+        return self.is_holiday(d) or super().is_holiday_or_weekend(d)
+
+
+def test_calendar_overriding_business_day_methods():
+    calendar = _GoodFridayCalendar()
+    assert not calendar.is_business_day(date(2024, 3, 29))
+    assert not calendar.has_business_day_table()
+    assert calendar.business_day_table(date(2024, 3, 28), date(2024, 4, 2)) is None
+    assert calendar.business_days_between(date(2024, 3, 28), date(2024, 4, 2)) == 2
+    assert list((("2024-03-28" <= business_days.over(calendar)) <= "2024-04-02")()) == \
+           [date(2024, 3, 28), date(2024, 4, 1), date(2024, 4, 2)]
+    assert WeekendCalendar().has_business_day_table() and HolidayCalendar(()).has_business_day_table()
+
+
+@pytest.mark.parametrize('calendar', (
+        _GoodFridayCalendar(),
+        WeekendCalendar(),
+        HolidayCalendar((date(2024, 3, 29), date(2024, 4, 1), date(2024, 12, 25), date(2024, 12, 26))),
+        UnionCalendar(CalendarImpl([date(2024, 3, 29)]), WeekendCalendar()),  # no business day table
+))
+def test_business_days_between(calendar):
+    start = date(2023, 12, 1)
+    dates = [start + timedelta(days=i) for i in range(500)]
+    business = [d for d in dates if calendar.is_business_day(d)]
+    pairs = [(dates[i], dates[j]) for i in range(0, 500, 37) for j in range(0, 500, 23)]
+    expected = [sum(1 for d in business if s <= d < e) - sum(1 for d in business if e <= d < s) for s, e in pairs]
+
+    assert [calendar.business_days_between(s, e) for s, e in pairs] == expected
+    starts = np.array([s for s, _ in pairs], dtype='datetime64[D]')
+    ends = np.array([e for _, e in pairs], dtype='datetime64[D]')
+    assert calendar.business_days_between_array(starts, ends).tolist() == expected
+    assert calendar.business_days_between_array(starts[:1], ends).tolist() == \
+           [calendar.business_days_between(pairs[0][0], e) for _, e in pairs]
@@ -0,0 +1,58 @@
+from datetime import date
+
+import pytest
+
+from hg_oap.dates import CalendarRegistry, HolidayCalendarRegistry, WeekendCalendar, UnionCalendar, get_calendar, \
+    holiday_calendar, business_days
+
+
+@pytest.fixture
+def registries(tmp_path):
+    with HolidayCalendarRegistry(cache_dir=tmp_path) as holidays, CalendarRegistry() as calendars:
+        yield calendars, holidays
+
+
+def test_calendar_registry_names(registries):
+    calendars, holidays = registries
+    assert get_calendar("LME") is holiday_calendar("LME")
+    assert get_calendar("LME Calendar") is get_calendar("LME")
+    assert get_calendar("USD") is holiday_calendar("US")
+    with pytest.raises(ValueError):
+        get_calendar("NOT A CALENDAR")
+
+    weekends = WeekendCalendar()
+    calendars.register("WEEKENDS", weekends)
+    calendars.register("LAZY", lambda: WeekendCalendar((4, 5)))
+    assert get_calendar("WEEKENDS") is weekends
+    assert get_calendar("LAZY") is get_calendar("LAZY")
+
+
+def test_calendar_registry_union(registries):
+    calendars, holidays = registries
+    union = get_calendar("LME+USD")
+    assert get_calendar("USD + LME") is union
+    assert union is holiday_calendar("LME+US")
+    assert union.is_holiday(date(2024, 7, 4))  # US
+    assert union.is_holiday(date(2024, 12, 26))  # UK boxing day
+    assert union.is_business_day(date(2024, 7, 5))
+    assert union.add_business_days(date(2024, 7, 3), 1) == date(2024, 7, 5)
+
+    calendars.register("FRIDAYS", WeekendCalendar((4, 5, 6)))
+    mixed = get_calendar("FRIDAYS+USD")
+    assert isinstance(mixed, UnionCalendar)
+    assert not mixed.is_business_day(date(2024, 7, 5)) and not mixed.is_business_day(date(2024, 7, 4))
+    assert mixed.is_business_day(date(2024, 7, 3))
+
+
+def test_calendar_by_name_over(registries):
+    over = business_days.over("LME Calendar")
+    assert over.calendar is get_calendar("LME")
+    gen = "2024-12-20" <= over < "2025-01-03"
+    assert list(gen()) == [date(2024, 12, 20), date(2024, 12, 23), date(2024, 12, 24), date(2024, 12, 27),
+                           date(2024, 12, 30), date(2024, 12, 31), date(2025, 1, 2)]
+
+
+def test_calendar_registry_shared():
+    registry = CalendarRegistry()
+    assert registry.shared(WeekendCalendar) is registry.shared(WeekendCalendar, {})
+    assert registry.shared(WeekendCalendar, {"weekend_days": (4, 5)}) is not registry.shared(WeekendCalendar)
@@ -0,0 +1,38 @@
+from datetime import date, timedelta
+
+from hg_oap.dates.date_intervals import DateIntervals
+
+
+def _dates(first, last, keep=lambda d: True):
+    return [first + timedelta(days=i) for i in range((last - first).days + 1) if keep(first + timedelta(days=i))]
+
+
+def test_date_intervals():
+    first, last = date(2023, 12, 1), date(2024, 3, 31)
+    weekdays = DateIntervals.weekdays(first, last, range(5))
+    assert list(weekdays) == _dates(first, last, lambda d: d.weekday() < 5)
+    assert weekdays.runs() == 18
+    assert len(weekdays) == len(list(weekdays))
+    assert weekdays.to_array().tolist() == list(weekdays)
+
+    mondays = DateIntervals.stepped(date(2023, 12, 4), last, 7)
+    assert list(mondays) == _dates(first, last, lambda d: d.weekday() == 0)
+    assert DateIntervals.of_dates(list(mondays)) == mondays
+    assert DateIntervals.of_dates([date(2024, 1, 2), date(2024, 1, 1)]) is None
+
+    weekends = DateIntervals.run(first, last) - weekdays
+    assert list(weekends) == _dates(first, last, lambda d: d.weekday() >= 5)
+    assert list(weekends | mondays) == _dates(first, last, lambda d: d.weekday() in (0, 5, 6))
+    assert (weekends | mondays).runs() == weekends.runs()  # the mondays extend the weekends
+    assert list(weekdays & mondays) == list(mondays)
+    assert not weekends & mondays
+
+    january = weekdays.clip(date(2024, 1, 1), date(2024, 2, 1))
+    assert list(january) == _dates(date(2024, 1, 1), date(2024, 1, 31), lambda d: d.weekday() < 5)
+    assert (january.first(), january.last()) == (date(2024, 1, 1), date(2024, 1, 31))
+    assert date(2024, 1, 15) in january and date(2024, 1, 13) not in january
+
+    # the dates of long runs are generated as they are iterated
+    everything = iter(DateIntervals.run(date.min, date.max))
+    assert [next(everything), next(everything)] == [date.min, date(1, 1, 2)]
+    assert len(DateIntervals.run(date.min, date.max)) == date.max.toordinal()
@@ -1,10 +1,14 @@
-from datetime import datetime, date
+from datetime import datetime, date, time, timedelta
 
-from hgraph import graph, register_service, default_path, TS
+from frozendict import frozendict
+from hgraph import graph, register_service, default_path, TS, TSD
 from hgraph.test import eval_node
 
 from hg_oap.dates import WeekendCalendar
-from hg_oap.dates.date_services import business_days_from_calendar, business_days
+from hg_oap.dates.date_services import business_days_from_calendar, business_days, business_days_from_calendars, \
+    business_days_by_calendar, next_scheduled_date, schedule_from_dgen
+from hg_oap.dates.dgen import months, month_last_bday, month_end, business_days as business_days_dgen, weekdays, \
+    days
 
 
 def test_business_days_from_calendar():
@@ -19,3 +23,97 @@ def test_business_days_from_calendar():
         __start_time__=datetime(2024, 1, 4, 1),
         __end_time__=datetime(2024, 1, 8, 1)
     ) == [date(2024, 1, 4), date(2024, 1, 5), date(2024, 1, 8)]
+
+
+def test_business_days_from_named_calendar():
+    @graph
+    def g() -> TS[date]:
+        register_service(default_path, business_days_from_calendar, calendar_tp=WeekendCalendar, calendar="LME+USD")
+        return business_days()
+
+    assert eval_node(
+        g,
+        __elide__=True,
+        __start_time__=datetime(2024, 12, 24, 1),
+        __end_time__=datetime(2024, 12, 30, 1)
+    ) == [date(2024, 12, 24), date(2024, 12, 27), date(2024, 12, 30)]
+
+
+def test_business_days_from_calendars():
+    @graph
+    def g() -> TSD[str, TS[date]]:
+        register_service(default_path, business_days_from_calendars,
+                         calendars=frozendict({"LME": "Europe/London", "US": "America/New_York", "JP": "UTC"}))
+        return business_days_by_calendar()
+
+    assert eval_node(
+        g,
+        __elide__=True,
+        __start_time__=datetime(2024, 12, 24, 1),
+        __end_time__=datetime(2024, 12, 28, 1)
+    ) == [
+        {"LME": date(2024, 12, 24), "US": date(2024, 12, 23), "JP": date(2024, 12, 24)},
+        {"US": date(2024, 12, 24)},
+        {"JP": date(2024, 12, 25)},
+        {"JP": date(2024, 12, 26)},
+        {"US": date(2024, 12, 26)},  # 05:00 UTC
+        {"LME": date(2024, 12, 27), "JP": date(2024, 12, 27)},
+        {"US": date(2024, 12, 27)},
+    ]
+
+
+def test_next_scheduled_date():
+    @graph
+    def g() -> TS[date]:
+        register_service(default_path, business_days_from_calendar, calendar_tp=WeekendCalendar)
+        return next_scheduled_date(month_last_bday(months), calendar="LME")
+
+    # 2024-03-29 is a holiday in London
+    assert eval_node(
+        g,
+        __elide__=True,
+        __start_time__=datetime(2024, 1, 30, 1),
+        __end_time__=datetime(2024, 3, 29, 1)
+    ) == [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 28), date(2024, 4, 30)]
+
+
+def test_schedule_from_dgen():
+    assert eval_node(
+        schedule_from_dgen, month_end(months),
+        __elide__=True,
+        __start_time__=datetime(2024, 1, 1),
+        __end_time__=datetime(2024, 4, 30, 1)
+    ) == [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30)]
+
+    # 17:00 in London is 16:00 UTC from the end of March, 2024-03-29 is a holiday
+    assert eval_node(
+        schedule_from_dgen, business_days_dgen, calendar="LME", time_of_day=time(17), time_zone="Europe/London",
+        tp=datetime,
+        __elide__=True,
+        __start_time__=datetime(2024, 3, 27, 17),
+        __end_time__=datetime(2024, 4, 2, 12)
+    ) == [datetime(2024, 3, 27, 17), datetime(2024, 3, 28, 17), datetime(2024, 4, 1, 16)]
+
+    # the schedule spans the blocks it is computed in
+    ticks = eval_node(
+        schedule_from_dgen, business_days_dgen, calendar="LME",
+        __elide__=True,
+        __start_time__=datetime(2020, 1, 1),
+        __end_time__=datetime(2030, 1, 1)
+    )
+    assert ticks == list(business_days_dgen.over("LME")(start=date(2020, 1, 1), end=date(2029, 12, 31)))
+
+    # the schedules that depend on where they start are not started again for each block
+    assert eval_node(
+        schedule_from_dgen, ("2024-01-01" <= weekdays)[:5],
+        __elide__=True,
+        __start_time__=datetime(2024, 1, 1),
+        __end_time__=datetime(2027, 1, 1)
+    ) == [date(2024, 1, d) for d in range(1, 6)]
+    ticks = eval_node(
+        schedule_from_dgen, ("2024-01-01" <= days)[::10],
+        __elide__=True,
+        __start_time__=datetime(2024, 1, 1),
+        __end_time__=datetime(2027, 1, 1)
+    )
+    assert ticks == [date(2024, 1, 1) + timedelta(days=10 * i) for i in range(110)]
@@ -0,0 +1,34 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from hg_oap.dates import DayCount, HolidayCalendar, WeekendCalendar, months
+
+
+def test_act_day_counts():
+    assert DayCount.ACT_360.year_fraction(date(2024, 1, 1), date(2024, 7, 1)) == 182 / 360
+    assert DayCount.ACT_365.year_fraction(date(2024, 1, 1), date(2025, 1, 1)) == 366 / 365
+    assert DayCount("ACT/365").year_fraction(date(2025, 1, 1), date(2024, 1, 1)) == -366 / 365
+    assert DayCount.ACT_360.basis == 360
+
+
+def test_bus_252():
+    calendar = HolidayCalendar((date(2024, 1, 1), date(2024, 3, 29)))
+    # January 2024 has 23 week days, the 1st is a holiday
+    assert DayCount.BUS_252.year_fraction(date(2024, 1, 1), date(2024, 2, 1), calendar) == 22 / 252
+    with pytest.raises(ValueError):
+        DayCount.BUS_252.year_fraction(date(2024, 1, 1), date(2024, 2, 1))
+
+
+@pytest.mark.parametrize('day_count', list(DayCount))
+def test_accrual_fractions(day_count):
+    calendar = WeekendCalendar()
+    schedule = ("2020-01-01" <= months) <= "2024-01-01"
+    dates = list(schedule())
+    expected = [day_count.year_fraction(s, e, calendar) for s, e in zip(dates[:-1], dates[1:])]
+
+    assert day_count.accrual_fractions(schedule, calendar).tolist() == expected
+    assert day_count.accrual_fractions(dates, calendar).tolist() == expected
+    assert day_count.year_fractions(np.array(dates[:-1], dtype='datetime64[D]'), dates[-1], calendar).tolist() == \
+           [day_count.year_fraction(s, dates[-1], calendar) for s in dates[:-1]]
@@ -3,7 +3,7 @@ from datetime import date, timedelta
 import holidays
 import pytest
 
-from hg_oap.dates.calendar import WeekendCalendar, HolidayCalendar
+from hg_oap.dates.calendar import Calendar, WeekendCalendar, HolidayCalendar
 from hg_oap.dates.dgen import (
     make_date,
     make_dgen,
@@ -20,6 +20,8 @@ from hg_oap.dates.dgen import (
     DGenParameter,
     month_last_bday,
     month_first_bday,
+    month_end,
+    month_start,
 )
 from hg_oap.utils.op import Expression
 from hg_oap.dates.tenor import Tenor
@@ -421,6 +423,112 @@ def test_roll_bwd_2():
     assert list(roll_bwd(days, calendar)()) == [date(2025, 12, 24)] * 5
 
 
+def test_business_day_table():
+    calendar = HolidayCalendar(holidays.country_holidays("GB", "ENG")["2019-01-01":"2031-01-01"])
+    dates = [date(2019, 12, 1) + timedelta(days=i) for i in range(365 * 10)]
+    table = calendar.business_day_table(dates[0], dates[-1])
+    assert table.covers(dates[0]) and table.covers(dates[-1])
+    assert [d for d in dates if table.is_business_day(d)] == [d for d in dates if calendar.is_business_day(d)]
+    assert [table.roll_fwd(d) for d in dates[:-7]] == [calendar.add_business_days(d, 0) for d in dates[:-7]]
+    assert [table.roll_bwd(d) for d in dates[7:]] == [calendar.sub_business_days(d, 0) for d in dates[7:]]
+
+    gen = ('2019-12-01' <= days) < '2029-11-28'
+    assert list((('2019-12-01' <= business_days.over(calendar)) < '2029-11-28')()) == \
+        [d for d in gen() if calendar.is_business_day(d)]
+    assert list(roll_fwd(gen, calendar)()) == [calendar.add_business_days(d, 0) for d in gen()]
+    assert list(roll_bwd(gen, calendar)()) == [calendar.sub_business_days(d, 0) for d in gen()]
+
+
+@pytest.mark.parametrize("calendar", [
+    HolidayCalendar(holidays.country_holidays("GB", "ENG", years=range(1999, 2052)).keys()),
+    type("NoTableCalendar", (WeekendCalendar,), {"business_day_table": Calendar.business_day_table})(),
+])
+def test_month_business_days(calendar):
+    month_ends = [date(y, m + 1, 1) - timedelta(days=1) if m < 12 else date(y, 12, 31)
+                  for y in range(2000, 2050) for m in range(1, 13)]
+    month_starts = [date(y, m, 1) for y in range(2000, 2050) for m in range(1, 13)]
+    last = [calendar.sub_business_days(d, 0) for d in month_ends]
+    first = [calendar.add_business_days(d, 0) for d in month_starts]
+
+    gen = ("2000-01-01" <= months) < "2050-01-01"
+    assert list(month_end(gen)()) == month_ends
+    assert list(month_start(gen)()) == month_starts
+    assert list(month_last_bday(gen, calendar)()) == last
+    assert list(month_first_bday(gen, calendar)()) == first
+    assert list(month_last_bday(months, calendar)(start="2000-01-01", end="2049-12-31")) == last
+    assert list(month_first_bday(months, calendar)(start="2000-01-01", end="2049-12-31")) == first
+
+    # each month is only generated once, whatever the dates of the months generated from
+    d = ("2000-01-01" <= days) < "2001-01-01"
+    assert list(month_end(d)()) == month_ends[:12]
+    assert list(month_last_bday(d, calendar)()) == last[:12]
+    assert list(month_first_bday(d).over(calendar)()) == first[:12]
+
+    # rolling the business days of the calendar has no effect
+    assert list(roll_fwd(month_last_bday(gen, calendar), calendar)()) == last
+    assert list(roll_bwd(month_first_bday(gen, calendar), calendar)()) == first
+
+
+def test_set_operations_over_intervals():
+    from hg_oap.dates.dgen import SequenceDGen
+
+    calendar = HolidayCalendar(holidays=[d for d in holidays.country_holidays("GB", years=range(2000, 2051))])
+    hols = SequenceDGen(tuple(sorted(calendar._holidays_set)))
+    start, end = date(2000, 1, 1), date(2050, 12, 31)
+    generate = lambda g: list(g(start=start, end=end, calendar=calendar))
+    expected = lambda dates: sorted(d for d in dates if start <= d <= end)
+
+    for gen, dates in (
+            (weekdays - hols, set(generate(weekdays)) - set(generate(hols))),
+            (weekends | hols, set(generate(weekends)) | set(generate(hols))),
+            (days & weekends, set(generate(weekends))),
+            (weekdays - business_days, set(generate(weekdays)) - set(generate(business_days))),
+            ((weekdays - hols) & (days - weekends), set(generate(business_days))),
+    ):
+        assert gen.__intervals__(start=start, end=end, calendar=calendar) is not None
+        assert generate(gen) == expected(dates)
+
+    # bounded by the filters, the operands are described by runs when the dates are bounded
+    gen = ("2020-01-01" <= (weekdays - hols)) < "2021-01-01"
+    assert list(gen()) == list((("2020-01-01" <= business_days.over(calendar)) < "2021-01-01")())
+    assert (weekdays - hols).__intervals__() is None
+
+    # operands that are not described as runs are merged a date at a time
+    gen = weekdays - months
+    assert gen.__intervals__(start=start, end=end) is None
+    assert generate(gen) == expected(set(generate(weekdays)) - set(generate(months)))
+
+
+def test_dgen_cursor():
+    from hg_oap.dates.dgen import DGenCursor
+
+    calendar = HolidayCalendar(holidays=[date(2024, 3, 29), date(2024, 4, 1)])
+    gen = month_last_bday(months)
+    cursor = DGenCursor(gen, calendar)
+    assert cursor.peek() == next(gen(calendar=calendar))
+    assert cursor.next_after(date(2024, 1, 15)) == date(2024, 1, 31)
+    assert cursor.peek() == date(2024, 1, 31)
+    assert cursor.next_after(date(2024, 1, 31)) == date(2024, 2, 29)
+    assert cursor.next_after(date(2024, 3, 1)) == date(2024, 3, 28)
+
+    # the cursor restarts when the date moves back or jumps ahead
+    assert cursor.next_after(date(2023, 12, 31)) == date(2024, 1, 31)
+    assert cursor.next_after(date(2030, 6, 1)) == date(2030, 6, 28)
+
+    # each date is the first of the generator after it, as the cursor moves forward
+    cursor = DGenCursor(business_days, calendar)
+    d = date(2024, 1, 1)
+    while d < date(2024, 12, 31):
+        assert cursor.next_after(d) == next(((d < business_days.over(calendar)) < "2025-01-01")())
+        d += timedelta(days=3)
+
+    cursor = DGenCursor(("2024-01-01" <= months) < "2024-03-01")
+    assert cursor.next_after("2024-01-15") == date(2024, 2, 1)
+    assert cursor.next_after("2024-02-01") is None
+    assert cursor.peek() is None
+    assert cursor.next_after(date.max) is None
+
+
 def test_quarters():
     qs = '2024-02-01' < quarters < '2024-11-02'
     assert list(qs()) == [date(2024, 4, 1), date(2024, 7, 1), date(2024, 10, 1)]
@@ -430,3 +538,21 @@ def test_quarters():
 
     m = '2024-01-01' <= quarters.months <= '2025-01-01'
     assert len(list(m())) == 13
+
+
+def test_dgen_structure_and_pickle():
+    import pickle
+
+    from hg_oap.utils.op import structurally_equal
+
+    make = lambda: roll_fwd((years.mar.days[15] | years.dec.days[15]) - "1d", WeekendCalendar())
+    gen = make()
+    assert structurally_equal(gen, make()) is False  # the calendars are different objects
+    assert structurally_equal(gen, roll_fwd((years.mar.days[15] | years.dec.days[15]) - "1d", gen.calendar))
+    assert not structurally_equal(gen, roll_fwd((years.mar.days[15] | years.dec.days[16]) - "1d", gen.calendar))
+
+    copy = pickle.loads(pickle.dumps(gen))
+    assert list(copy(start=date(2024, 1, 1), end=date(2025, 12, 31))) == \
+           list(gen(start=date(2024, 1, 1), end=date(2025, 12, 31)))
+    assert pickle.loads(pickle.dumps(months)) is months
+    assert pickle.loads(pickle.dumps(business_days)) is business_days
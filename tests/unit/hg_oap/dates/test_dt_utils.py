@@ -1,7 +1,11 @@
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 
-from hg_oap.dates.dt_utils import date_tz_to_utc, date_time_utc_to_tz
+import numpy as np
+import pytest
+
+from hg_oap.dates.dt_utils import date_tz_to_utc, date_time_utc_to_tz, dates_tz_to_utc, date_times_utc_to_tz, \
+    start_of_day_offsets, UTC
 
 
 def test_date_tz_to_utc():
@@ -13,4 +17,31 @@ def test_date_tz_to_utc():
 def test_date_time_utc_to_tz():
     tz = ZoneInfo("Europe/London")
     assert date_time_utc_to_tz(datetime(2024, 1, 1), tz) == date(2024, 1, 1)
-    assert date_time_utc_to_tz(datetime(2024, 8, 31, 23), tz) == date(2024, 9, 1)
\ No newline at end of file
+    assert date_time_utc_to_tz(datetime(2024, 8, 31, 23), tz) == date(2024, 9, 1)
+
+_ZONES = ("Europe/London", "America/New_York", "America/Santiago", "Australia/Lord_Howe", "Asia/Kolkata",
+          "Pacific/Apia", "America/Havana", "UTC")
+
+
+@pytest.mark.parametrize("zone", _ZONES)
+def test_date_tz_to_utc_cached(zone):
+    tz = ZoneInfo(zone)
+    dates = [date(2008, 1, 1) + timedelta(days=i) for i in range(365 * 6)]
+    expected = [datetime.combine(d, datetime.min.time(), tzinfo=tz).astimezone(UTC).replace(tzinfo=None)
+                for d in dates]
+    assert [date_tz_to_utc(d, tz) for d in dates] == expected
+    assert dates_tz_to_utc(np.array(dates, dtype="datetime64[D]"), tz).tolist() == expected
+
+
+@pytest.mark.parametrize("zone", _ZONES)
+def test_date_time_utc_to_tz_cached(zone):
+    tz = ZoneInfo(zone)
+    times = [datetime(2010, 1, 1) + timedelta(minutes=30 * i) for i in range(48 * 365 * 3)]
+    expected = [t.replace(tzinfo=UTC).astimezone(tz).date() for t in times]
+    assert [date_time_utc_to_tz(t, tz) for t in times] == expected
+    assert date_times_utc_to_tz(np.array(times, dtype="datetime64[us]"), tz).tolist() == expected
+
+
+def test_start_of_day_offsets():
+    offsets = start_of_day_offsets(ZoneInfo("Europe/London"), date(2024, 3, 30), date(2024, 4, 1))
+    assert offsets.tolist() == [timedelta(0), timedelta(0), timedelta(hours=1)]
@@ -0,0 +1,66 @@
+import pickle
+from datetime import date
+
+import pytest
+
+from hg_oap.dates import HolidayCalendarRegistry, holiday_calendar, country_holidays_loader, HolidayCalendar
+from hg_oap.impl.instruments.futures.lme import LmeTradingHolidayCalendar, roll_lme
+
+
+class _CountingLoader:
+    def __init__(self):
+        self.calls = []
+        self._loader = country_holidays_loader("GB")
+
+    def __call__(self, years):
+        self.calls.append(years)
+        return self._loader(years)
+
+
+def test_holiday_calendar_lazy_years(tmp_path):
+    loader = _CountingLoader()
+    registry = HolidayCalendarRegistry(cache_dir=tmp_path)
+    registry.register("TEST", loader)
+    calendar = registry.calendar("TEST")
+    assert registry.calendar("TEST") is calendar
+
+    assert calendar.is_holiday(date(2024, 12, 25))
+    assert not calendar.is_business_day(date(2024, 12, 26))
+    assert calendar.is_business_day(date(2024, 12, 27))
+    assert loader.calls == [(2024,)]
+
+    eager = HolidayCalendar(country_holidays_loader("GB")(tuple(range(2020, 2030))))
+    for d, n in ((date(2024, 12, 20), 5), (date(2024, 12, 20), 300), (date(2025, 1, 2), -3), (date(2026, 1, 2), -300)):
+        assert calendar.add_business_days(d, n) == eager.add_business_days(d, n)
+    assert all(len(years) == len(set(years)) for years in loader.calls)
+
+
+def test_holiday_calendar_disk_cache(tmp_path):
+    loader = _CountingLoader()
+    registry = HolidayCalendarRegistry(cache_dir=tmp_path)
+    registry.register("TEST", loader)
+    registry.calendar("TEST").is_holiday(date(2024, 1, 1))
+    assert len(list(tmp_path.glob("holidays-*.json"))) == 1
+
+    second = HolidayCalendarRegistry(cache_dir=tmp_path)
+    second.register("TEST", loader)
+    assert second.calendar("TEST").is_holiday(date(2024, 1, 1))
+    assert second.calendar("TEST").is_holiday(date(2025, 1, 1))
+    assert loader.calls == [(2024,), (2025,)]
+
+    uncached = HolidayCalendarRegistry(cache_dir=False)
+    uncached.register("TEST", loader)
+    assert uncached.calendar("TEST").is_holiday(date(2024, 1, 1))
+    assert loader.calls == [(2024,), (2025,), (2024,)]
+
+
+def test_holiday_calendar_names(tmp_path):
+    with HolidayCalendarRegistry(cache_dir=tmp_path) as registry:
+        assert holiday_calendar("LME") is registry.calendar("LME")
+        assert roll_lme(None).calendar is registry.calendar("LME")
+        assert pickle.loads(pickle.dumps(holiday_calendar("LME"))) is registry.calendar("LME")
+        assert holiday_calendar("US").is_holiday(date(2024, 7, 4))
+        assert LmeTradingHolidayCalendar().is_holiday(date(2024, 12, 25))
+        with pytest.raises(ValueError):
+            holiday_calendar("NOT A CALENDAR")
+    assert HolidayCalendarRegistry.instance() is not registry
@@ -0,0 +1,97 @@
+import copy
+import pickle
+from datetime import date, timedelta
+
+import holidays
+import numpy as np
+import pytest
+
+from hg_oap.dates import Tenor, Calendar, WeekendCalendar, HolidayCalendar
+from hg_oap.dates.dgen import days, RemoveDatesDGen, SubTenorDGen
+
+
+def test_tenor_interned():
+    t = Tenor("3m")
+    assert Tenor("3m") is t
+    assert Tenor(m=3) is t
+    assert Tenor((0, 3, 0, 0, 0)) is t
+    assert Tenor(t) is t
+    assert Tenor("1m") * 3 is t
+    assert -Tenor("-3m") is t
+    assert Tenor(timedelta(days=7)) == Tenor("7d") != Tenor("1w")
+    assert Tenor("1y2m3w4d").ymwd_b == (1, 2, 3, 4, 0)
+    assert Tenor("-1y2m").ymwd_b == (-1, -2, 0, 0, 0)
+    assert Tenor("12b").ymwd_b == (0, 0, 0, 0, 12)
+    assert len({Tenor("1d"), Tenor(d=1), Tenor("1b")}) == 2
+
+    assert pickle.loads(pickle.dumps(t)) is t
+    assert copy.copy(t) is t and copy.deepcopy(t) is t
+    with pytest.raises(AttributeError):
+        t.ymwd_b = (0, 1, 0, 0, 0)
+
+
+@pytest.mark.parametrize("value", ["3", "m", "1d1m", "-b", "1.5m", 1, (1, 2), (1.0, 0, 0, 0, 0), ["1d"]])
+def test_tenor_invalid(value):
+    with pytest.raises(ValueError):
+        Tenor(value)
+
+
+def test_dgen_sub():
+    assert isinstance(days - "1d", SubTenorDGen)
+    assert isinstance(days - "2024-01-01", RemoveDatesDGen)
+    assert isinstance(days - date(2024, 1, 1), RemoveDatesDGen)
+    with pytest.raises(ValueError):
+        days - "not a date"
+
+
+def _dates(n: int = 2000, seed: int = 42) -> np.ndarray:
+    """Random dates from 1950 to 2050 along with the ends of the months, where the months are clamped"""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("1950-01-01")
+    random = start + rng.integers(0, 365 * 100, n).astype("timedelta64[D]")
+    day = np.timedelta64(1, "D")
+    month_ends = np.arange("1950-02", "2050-01", dtype="datetime64[M]").astype("datetime64[D]") - day
+    return np.concatenate([random, month_ends, month_ends - day, month_ends - 2 * day])
+
+
+@pytest.mark.parametrize("tenor", [
+    "0d", "1d", "-1d", "10d", "1w", "-3w", "1m", "-1m", "3m", "-3m", "11m", "13m", "-25m", "1y", "-2y", "1y2m3w4d",
+    "-1y1m", (1, -13, 0, 2, 0), (0, 1, 0, -40, 0),
+])
+def test_tenor_add_sub_array(tenor):
+    t = Tenor(tenor)
+    dates = _dates()
+    scalars = dates.tolist()
+    assert t.add_to_array(dates).tolist() == [t.add_to(d) for d in scalars]
+    assert t.sub_from_array(dates).tolist() == [t.sub_from(d) for d in scalars]
+
+
+class _NoTableCalendar(WeekendCalendar):
+    business_day_table = Calendar.business_day_table
+
+
+@pytest.mark.parametrize("calendar", [
+    WeekendCalendar(),
+    WeekendCalendar((4, 5)),
+    HolidayCalendar(holidays.country_holidays("GB", "ENG", years=range(1940, 2061)).keys()),
+    _NoTableCalendar(),  # stepped a date at a time
+])
+@pytest.mark.parametrize("tenor", ["0b", "1b", "-1b", "5b", "-3b", "30b", "400b", (0, 0, 0, 3, -2)])
+def test_tenor_add_sub_array_business_days(calendar, tenor):
+    t = Tenor(tenor)
+    dates = _dates(500)
+    scalars = dates.tolist()
+    assert t.add_to_array(dates, calendar).tolist() == [t.add_to(d, calendar) for d in scalars]
+    assert t.sub_from_array(dates, calendar).tolist() == [t.sub_from(d, calendar) for d in scalars]
+
+
+def test_tenor_array_shape_and_errors():
+    dates = np.array([["2024-01-31", "2024-02-29"], ["2023-12-31", "2024-03-31"]], dtype="datetime64[D]")
+    assert Tenor("1m").add_to_array(dates).tolist() == [
+        [date(2024, 2, 29), date(2024, 3, 29)], [date(2024, 1, 31), date(2024, 4, 30)]]
+    assert Tenor("1b").add_to_array(dates[:0], WeekendCalendar()).size == 0
+
+    with pytest.raises(ValueError):
+        Tenor("1b").add_to_array(dates)
+    with pytest.raises(OverflowError):
+        Tenor("1y").add_to_array([date.max])
@@ -1,6 +1,11 @@
+from datetime import datetime
+
+import pytest
+
 from hg_oap.impl.assets.currency import Currencies
 from hg_oap.instruments.instrument import Instrument
-from hg_oap.orders.order import OrderState, SingleLegOrder, OriginatorInfo, ORDER, Fill, order_states
+from hg_oap.orders.order import OrderState, SingleLegOrder, OriginatorInfo, ORDER, Fill, order_states, \
+    FillAccumulator
 from hg_oap.orders.order_service import order_handler, order_client, \
     OrderHandlerOutput
 from hg_oap.orders.order_request_response_events import OrderRequest, CreateOrderRequest, OrderResponse, OrderEvent
@@ -8,7 +13,8 @@ from hg_oap.orders.order_type import MarketOrderType
 from hg_oap.pricing.price import Price
 from hg_oap.units.quantity import Quantity
 from hg_oap.units.unit_system import UnitSystem
-from hgraph import graph, TS, TSB, compute_node, register_service, MIN_TD, SIGNAL, lag, sample, debug_print
+from hgraph import graph, TS, TSB, compute_node, register_service, MIN_TD, SIGNAL, lag, sample, debug_print, \
+    null_sink
 from hgraph.test import eval_node
 
 
@@ -62,3 +68,44 @@ def test_simple_handler():
         None, None,
         OrderResponse.accept(requests[0]),
     ]
+
+
+def test_simple_handler_fill_summary():
+    @graph
+    def g(ts: TS[OrderRequest]) -> TS[float]:
+        register_service("order.simple_handler", simple_handler)
+        order_state = order_states[ORDER: SingleLegOrder]("order.simple_handler")["1"]
+        null_sink(order_client("order.simple_handler", ts))
+        return order_state.confirmed.avg_fill_price
+
+    requests = [
+        OrderRequest.create_request(
+            CreateOrderRequest, None, 'Howard', order_id="1",
+            order_type=MarketOrderType(instrument=Instrument(symbol="MCU_3M"),
+                                       quantity=Quantity(qty=2.0, unit=UnitSystem.instance().lot)),
+            originator_info=OriginatorInfo(account="account")
+        )
+    ]
+    assert eval_node(g, requests, __elide__=True) == [766.25]
+
+
+def test_fill_accumulator():
+    lot = UnitSystem.instance().lot
+    usd = Currencies.USD.value
+    fills = FillAccumulator(Quantity(qty=10.0, unit=lot), usd)
+    assert fills.fill_count == 0
+    assert fills.avg_fill_price != fills.avg_fill_price  # NaN before the first fill
+
+    fills.add(Fill(fill_id="1", qty=Quantity(qty=2.0, unit=lot), notional=Price(200.0, usd)), datetime(2024, 1, 1))
+    fills.add(Fill(fill_id="2", qty=Quantity(qty=3.0, unit=lot), notional=Price(330.0, usd)), datetime(2024, 1, 2))
+
+    assert fills.fill_count == 2
+    assert fills.filled_qty == 5.0
+    assert fills.remaining_qty == 5.0
+    assert fills.avg_fill_price == 106.0
+    assert fills.last_fill_time == datetime(2024, 1, 2)
+    assert not fills.is_filled
+
+    with pytest.raises(ValueError):
+        fills.add(Fill(fill_id="3", qty=Quantity(qty=1.0, unit=lot), notional=Price(1.0, Currencies.EUR.value)),
+                  datetime(2024, 1, 3))
@@ -0,0 +1,86 @@
+import polars as pl
+
+from hg_oap.portfolio.book_store import PositionTable, PositionRow, book_position_deltas, get_book_frame_impl, \
+    get_book_impl, _book_from_frame
+from hg_oap.portfolio.portfolio import get_book, Book
+from hg_oap.units.default_unit_system import U
+from hgraph import graph, TS, TSS, TSD, TSB, Frame, map_, service_impl, register_service, default_path, \
+    WiringGraphContext, merge, const, MIN_TD, REMOVE
+from hgraph.test import eval_node
+
+
+def _deltas(*rows) -> pl.DataFrame:
+    return pl.DataFrame(rows, schema=PositionTable.SCHEMA, orient="row")
+
+
+def test_position_table_apply():
+    table = PositionTable()
+    table.apply(_deltas(("X", 1.0, "tonne"), ("Y", 2.0, "lot"), ("X", 500.0, "kg")))
+    assert table.frame.rows() == [("X", 1.5, "tonne"), ("Y", 2.0, "lot")]
+
+    table.apply(_deltas(("Z", 1.0, "lot"), ("X", 1500.0, "kg")))
+    assert table.frame.rows() == [("X", 3.0, "tonne"), ("Y", 2.0, "lot"), ("Z", 1.0, "lot")]
+
+    assert table.apply(_deltas()) is table.frame
+
+
+def test_position_table_apply_upserts_by_instrument():
+    snapshot = _deltas(("X", 1.0, "tonne"), ("Y", 2.0, "lot"), ("Z", 3.0, "lot"))
+    table = PositionTable(snapshot)
+    table.apply(_deltas(("Y", 1.0, "lot"), ("W", 1.0, "kg"), ("Y", 1.0, "lot")))
+    assert table.frame.rows() == [("X", 1.0, "tonne"), ("Y", 4.0, "lot"), ("Z", 3.0, "lot"), ("W", 1.0, "kg")]
+    # the frames published before are left as they were
+    assert snapshot.rows() == [("X", 1.0, "tonne"), ("Y", 2.0, "lot"), ("Z", 3.0, "lot")]
+
+
+@graph
+def _replay_deltas(key: TS[str]) -> TS[Frame[PositionRow]]:
+    return merge(
+        const(_deltas(("X", 1.0, "tonne"), ("Y", 2.0, "lot")), TS[Frame[PositionRow]]),
+        const(_deltas(("X", 1000.0, "kg")), TS[Frame[PositionRow]], delay=MIN_TD),
+    )
+
+
+@service_impl(interfaces=book_position_deltas)
+def _deltas_impl(book_id: TSS[str]) -> TSD[str, TS[Frame[PositionRow]]]:
+    return map_(_replay_deltas, __keys__=book_id)
+
+
+def test_get_book_impl():
+    @graph
+    def g(book_id: TS[str]) -> TSB[Book]:
+        register_service(default_path, _deltas_impl)
+        register_service(default_path, get_book_frame_impl)
+        register_service(default_path, get_book_impl)
+        book = get_book(book_id)
+        WiringGraphContext.instance().build_services()
+        return book
+
+    results = eval_node(g, ["b1"], __elide__=True)
+    assert results == [
+        {"positions": {"X": {"qty": 1.0, "qty_unit": U.tonne}, "Y": {"qty": 2.0, "qty_unit": U.lot}}},
+        {"positions": {"X": {"qty": 2.0, "qty_unit": U.tonne}}},
+    ]
+
+
+def test_book_from_frame_converts_the_changed_rows():
+    snapshots = [
+        _deltas(("X", 1.0, "tonne"), ("Y", 2.0, "lot")),
+        # only the instruments of the deltas are converted, Y is not looked at
+        _deltas(("X", 2.0, "tonne"), ("Y", 5.0, "lot"), ("Z", 1.0, "lot")),
+        _deltas(("X", 2.0, "tonne"), ("Y", 5.0, "lot"), ("Z", 1.0, "lot")),
+        # a snapshot that does not match the rows seen before is converted in full
+        _deltas(("Y", 5.0, "lot")),
+    ]
+    deltas = [
+        _deltas(("X", 1.0, "tonne"), ("Y", 2.0, "lot")),
+        _deltas(("Z", 1.0, "lot"), ("X", 1.0, "tonne")),
+        _deltas(),
+        _deltas(("Y", 0.0, "lot")),
+    ]
+    assert eval_node(_book_from_frame, snapshots, deltas) == [
+        {"positions": {"X": {"qty": 1.0, "qty_unit": U.tonne}, "Y": {"qty": 2.0, "qty_unit": U.lot}}},
+        {"positions": {"Z": {"qty": 1.0, "qty_unit": U.lot}, "X": {"qty": 2.0, "qty_unit": U.tonne}}},
+        None,
+        {"positions": {"X": REMOVE, "Z": REMOVE, "Y": {"qty": 5.0, "qty_unit": U.lot}}},
+    ]
@@ -0,0 +1,89 @@
+from typing import Type
+
+import pytest
+from frozendict import frozendict
+
+import hg_oap.impl.assets.currency  # noqa: F401 registers the currency units
+from hg_oap.portfolio.mark_to_market import mark_to_market, position_value, MarkToMarket
+from hg_oap.portfolio.portfolio import PositionQuantity
+from hg_oap.pricing_service import Price, PriceType, PricingRequest, PRICE
+from hg_oap.pricing_service.price_service import price_service
+from hg_oap.units.default_unit_system import U
+from hgraph import graph, TS, TSS, TSD, TSB, map_, service_impl, compute_node, register_service, \
+    WiringGraphContext, MIN_DT, AUTO_RESOLVE, REMOVE
+from hgraph.stream.stream import Stream, StreamStatus
+from hgraph.test import eval_node
+
+def _price(val: float, currency_unit, unit) -> Price:
+    return Price(val, MIN_DT, currency_unit, unit, PriceType.MID, "test", 0.0)
+
+
+@pytest.mark.parametrize(
+    ["qty", "qty_unit", "price", "expected"],
+    [
+        (2.0, U.lot, _price(10.0, U.USD, U.lot), 20.0),
+        (2.0, U.lot, _price(1000.0, U.USX, U.lot), 20.0),
+        (2.0, U.tonne, _price(0.5, U.USD, U.kg), 1000.0),
+    ]
+)
+def test_position_value(qty, qty_unit, price, expected):
+    assert position_value(qty, qty_unit, price, U.USD) == pytest.approx(expected)
+
+
+_PRICES = frozendict({"X": (10.0, U.USD, U.lot), "Y": (0.5, U.USD, U.kg), "Z": (2.0, U.EUR, U.kg),
+                      "W": (3.0, U.USD, U.lot)})
+
+
+@compute_node
+def _test_price(key: TS[PricingRequest]) -> TSB[Stream[Price]]:
+    val, currency_unit, unit = _PRICES[key.value.instrument]
+    return {"val": val, "timestamp": MIN_DT, "currency_unit": currency_unit, "unit": unit, "price_type": PriceType.MID,
+            "origin": "test", "status": StreamStatus.OK, "status_msg": ""}
+
+
+@service_impl(interfaces=price_service)
+def _test_price_impl(request: TSS[PricingRequest], path: str,
+                     price_type: Type[PRICE] = AUTO_RESOLVE) -> TSD[PricingRequest, PRICE]:
+    return map_(_test_price, __keys__=request)
+
+
+def test_mark_to_market():
+    @graph
+    def g(positions: TSD[str, TSB[PositionQuantity]]) -> TSB[MarkToMarket]:
+        register_service("instrument_price", _test_price_impl)
+        mtm = mark_to_market(positions, U.USD)
+        WiringGraphContext.instance().build_services()
+        return mtm
+
+    results = eval_node(g, [
+        {"X": {"qty": 2.0, "qty_unit": U.lot}, "Y": {"qty": 1.0, "qty_unit": U.tonne}},
+        None,
+        {"X": {"qty": 3.0}},
+        {"Y": REMOVE},
+    ], __elide__=True)
+    assert results == [
+        {"values": {"X": 20.0, "Y": 500.0}, "total": 520.0},
+        {"values": {"X": 30.0}, "total": 530.0},
+        {"values": {"Y": REMOVE}, "total": 30.0},
+    ]
+
+
+def test_mark_to_market_leaves_out_unconvertible_instruments():
+    @graph
+    def g(positions: TSD[str, TSB[PositionQuantity]]) -> TSB[MarkToMarket]:
+        register_service("instrument_price", _test_price_impl)
+        mtm = mark_to_market(positions, U.USD)
+        WiringGraphContext.instance().build_services()
+        return mtm
+
+    # Z is priced in EUR with no FX rates available and W is priced per lot while held in tonnes
+    results = eval_node(g, [
+        {"X": {"qty": 2.0, "qty_unit": U.lot}, "Z": {"qty": 1.0, "qty_unit": U.tonne},
+         "W": {"qty": 1.0, "qty_unit": U.tonne}},
+        None,
+        {"X": {"qty": 3.0}, "Z": {"qty": 2.0}},
+    ], __elide__=True)
+    assert results == [
+        {"values": {"X": 20.0}, "total": 20.0},
+        {"values": {"X": 30.0}, "total": 30.0},
+    ]
@@ -0,0 +1,122 @@
+from frozendict import frozendict
+
+from hg_oap.portfolio.portfolio import get_portfolio, get_book, rolled_positions, Portfolio, Book, PositionQuantity
+from hg_oap.portfolio.rolled_positions import PositionRollUp, rolled_positions_impl
+from hg_oap.units.default_unit_system import U
+from hgraph import graph, TS, TSS, TSD, TSB, map_, service_impl, compute_node, register_service, default_path, \
+    WiringGraphContext
+from hgraph.test import eval_node
+
+
+def _diamond() -> PositionRollUp:
+    # root -> a -> c and root -> b -> c, with the book "bc" in c and the book "ba" in a
+    roll_up = PositionRollUp()
+    roll_up.set_portfolio("root", (), ("a", "b"))
+    roll_up.set_portfolio("a", ("ba",), ("c",))
+    roll_up.set_portfolio("b", (), ("c",))
+    roll_up.set_portfolio("c", ("bc",), ())
+    return roll_up
+
+
+def test_roll_up_diamond_counted_once():
+    roll_up = _diamond()
+    roll_up.update_position("ba", "X", 1.0, U.tonne)
+    roll_up.update_position("bc", "X", 2.0, U.tonne)
+    assert roll_up.ancestors("bc") == {"root", "a", "b", "c"}
+    assert roll_up.positions("root") == {"X": 3.0}
+    assert roll_up.positions("a") == {"X": 3.0}
+    assert roll_up.positions("b") == {"X": 2.0}
+    assert roll_up.positions("c") == {"X": 2.0}
+
+
+def test_roll_up_delta_and_units():
+    roll_up = _diamond()
+    roll_up.update_position("ba", "X", 1.0, U.tonne)
+    roll_up.update_position("bc", "X", 2000.0, U.kg)
+    assert roll_up.unit("X") is U.tonne
+    assert roll_up.positions("root") == {"X": 3.0}
+    roll_up.drain_modified()
+
+    roll_up.update_position("bc", "X", 3000.0, U.kg)
+    assert roll_up.positions("root") == {"X": 4.0}
+    assert roll_up.drain_modified() == {"root": {"X"}, "a": {"X"}, "b": {"X"}, "c": {"X"}}
+
+    roll_up.update_position("bc", "X", 3.0, U.tonne)
+    assert roll_up.drain_modified() == {}
+
+
+def test_roll_up_removal():
+    roll_up = _diamond()
+    roll_up.update_position("ba", "X", 1.0, U.tonne)
+    roll_up.update_position("bc", "X", 2.0, U.tonne)
+    roll_up.update_position("bc", "Y", 5.0, U.lot)
+
+    roll_up.remove_position("bc", "Y")
+    assert roll_up.positions("root") == {"X": 3.0}
+
+    # Removing one side of the diamond does not change the root
+    roll_up.set_portfolio("b", (), ())
+    assert roll_up.positions("root") == {"X": 3.0}
+    assert roll_up.positions("b") == {}
+
+    roll_up.set_portfolio("a", ("ba",), ())
+    assert roll_up.positions("root") == {"X": 1.0}
+    assert roll_up.positions("c") == {"X": 2.0}
+
+    roll_up.remove_book("ba")
+    assert roll_up.positions("root") == {}
+
+    roll_up.remove_portfolio("c")
+    assert roll_up.ancestors("bc") == frozenset()
+
+
+_PORTFOLIOS = frozendict({
+    "root": (frozenset(), frozenset({"a", "b"})),
+    "a": (frozenset({"ba"}), frozenset({"c"})),
+    "b": (frozenset(), frozenset({"c"})),
+    "c": (frozenset({"bc"}), frozenset()),
+})
+
+_BOOKS = frozendict({
+    "ba": frozendict({"X": (1.0, U.tonne)}),
+    "bc": frozendict({"X": (2000.0, U.kg), "Y": (5.0, U.lot)}),
+})
+
+
+@compute_node
+def _portfolio(key: TS[str]) -> TSB[Portfolio]:
+    books, portfolios = _PORTFOLIOS[key.value]
+    return {"books": books, "portfolios": portfolios}
+
+
+@compute_node
+def _book(key: TS[str]) -> TSB[Book]:
+    return {"positions": {i: {"qty": q, "qty_unit": u} for i, (q, u) in _BOOKS[key.value].items()}}
+
+
+@service_impl(interfaces=get_portfolio)
+def _portfolio_impl(portfolio_id: TSS[str]) -> TSD[str, TSB[Portfolio]]:
+    return map_(_portfolio, __keys__=portfolio_id)
+
+
+@service_impl(interfaces=get_book)
+def _book_impl(book_id: TSS[str]) -> TSD[str, TSB[Book]]:
+    return map_(_book, __keys__=book_id)
+
+
+def test_rolled_positions_impl():
+    @graph
+    def g(portfolio_id: TS[str]) -> TSD[str, TSB[PositionQuantity]]:
+        register_service(default_path, _portfolio_impl)
+        register_service(default_path, _book_impl)
+        register_service(default_path, rolled_positions_impl)
+        positions = rolled_positions(portfolio_id)
+        WiringGraphContext.instance().build_services()
+        return positions
+
+    results = eval_node(g, ["root"], __elide__=True)
+    # The hierarchy is discovered a level at a time, only the changes are ticked
+    assert results[-2:] == [
+        {"X": {"qty": 1.0, "qty_unit": U.tonne}},
+        {"X": {"qty": 3.0}, "Y": {"qty": 5.0, "qty_unit": U.lot}},
+    ]
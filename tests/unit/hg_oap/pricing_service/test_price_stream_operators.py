@@ -0,0 +1,66 @@
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from hg_oap.impl.assets.currency import Currencies  # noqa: F401, registers the currency units
+from hg_oap.pricing_service import Price, PriceType
+from hg_oap.units import Unit
+from hg_oap.units.default_unit_system import U
+from hgraph import graph, TS, TSB, compute_node, EvaluationLifeCycleObserver
+from hgraph.stream.stream import Stream, StreamStatus
+from hgraph.test import eval_node
+
+
+class _CountEvaluations(EvaluationLifeCycleObserver):
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def on_after_node_evaluation(self, node):
+        self.counts[node.signature.name] += 1
+
+
+@compute_node(valid=("val",))
+def _price(val: TS[float], origin: str, status: TS[StreamStatus] = None, unit: Unit = U.MWh) -> TSB[Stream[Price]]:
+    """A price re-publishing all of its fields with each value"""
+    return dict(val=val.value, currency_unit=U.EUR, unit=unit, price_type=PriceType.MID, origin=origin,
+                status=status.value if status.valid else StreamStatus.OK, status_msg="",
+                timestamp=datetime(2024, 1, 1))
+
+
+def test_sub_two_price_streams():
+    @graph
+    def g(near: TS[float], far: TS[float], status: TS[StreamStatus]) -> TSB[Stream[Price]]:
+        return _price(near, "near", status) - _price(far, "far")
+
+    assert eval_node(g, [2.0, 3.0, None], [0.5], [None, None, StreamStatus.STALE], __elide__=True) == [
+        dict(status=StreamStatus.OK, status_msg="", val=1.5, timestamp=datetime(2024, 1, 1),
+             currency_unit=U.EUR, unit=U.MWh, price_type=PriceType.MID, origin="far/near"),
+        dict(val=2.5),
+        dict(status=StreamStatus.STALE, val=2.5),
+    ]
+
+
+def test_sub_two_price_streams_strict():
+    @graph
+    def g(near: TS[float], far: TS[float]) -> TSB[Stream[Price]]:
+        return _price(near, "near") - _price(far, "far", unit=U.MW)
+
+    with pytest.raises(Exception, match="different units"):
+        eval_node(g, [2.0], [0.5])
+
+
+def test_sub_two_price_streams_evaluations():
+    @graph
+    def g(near: TS[float], far: TS[float]) -> TSB[Stream[Price]]:
+        far_price = _price(far, "far")
+        spread = _price(near, "near") - far_price
+        return spread - far_price
+
+    observer = _CountEvaluations()
+    eval_node(g, [2.0, 3.0, 4.0], [0.5, None, 1.0], __observers__=[observer], __elide__=True)
+    # the legs re-publish their metadata with each value, so the metadata of the spread is looked at on each tick of
+    # its legs, but it is only published when it changes so the outer spread only looks at it on the ticks of far
+    assert observer.counts["_combine_price_metadata"] == 3 + 2
+    assert observer.counts["sub_scalars"] == 3 * 2
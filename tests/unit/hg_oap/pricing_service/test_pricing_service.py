@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, timedelta
 from typing import Type
 
 from hg_oap.assets.asset import PhysicalAsset
@@ -11,12 +11,12 @@ from hg_oap.instruments.future import Future, FutureContractSeries, FutureContra
 from hg_oap.instruments.instrument import Instrument
 from hg_oap.instruments.physical import PhysicalCommodity
 from hg_oap.pricing_service import PriceTraits, PricingRegimeContext, PriceOpts, PRICE, Price, PricingModel, \
-    PriceType
+    PriceType, PricingLatency, PricingStage, PricingTracer, PricingRequest, pricing_trace_stats, PricingResultCache
 from hg_oap.pricing_service.price_service import pricing_service_impl, subscribe_price, pricing_model
 from hg_oap.units import Unit, Quantity
 from hg_oap.units.default_unit_system import U
 from hgraph import graph, TS, const, register_service, TSB, WiringGraphContext, AUTO_RESOLVE, combine, MIN_DT, \
-    getattr_, SCALAR, service_impl, TSS, TSD, map_, compute_node
+    getattr_, SCALAR, service_impl, TSS, TSD, map_, compute_node, null_sink, merge
 from hgraph.stream.stream import Stream, StreamStatus
 from hgraph.test import eval_node
 
@@ -98,8 +98,8 @@ def instrument_by_name_impl(key: TSS[str]) -> TSD[str, TSB[Stream[InstrumentData
             first_delivery_date=None,
             last_delivery_date=None,
             expiry=None)
-        f1 = Future(symbol=symbol, series=future_series, contract_base_date=date(2024, 1, 1))
-        f2 = Future(symbol=symbol, series=future_series, contract_base_date=date(2024, 2, 1))
+        f1 = Future(series=future_series, contract_base_date=date(2024, 1, 1))
+        f2 = Future(series=future_series, contract_base_date=date(2024, 2, 1))
         if symbol == "f1":
             return f1
         elif symbol == "f2":
@@ -172,3 +172,213 @@ def test_pricing_service():
                            "status_msg": "",
                            "timestamp": MIN_DT,
                            "val": 0.0}
+
+
+def test_pricing_service_trace():
+
+    @graph
+    def g(inst: TS[str]) -> TS[tuple[PricingLatency, ...]]:
+        with const(date(2024, 11, 22)) as business_date:
+            register_service("instrument", instrument_by_name_impl)
+
+            prc = PricingRegimeContext(
+                name='test',
+                pricing_model_mapping={
+                    PriceTraits(PriceOpts, CalendarSpread): CalendarSpreadPricingModel(),
+                    PriceTraitsFuture(PriceOpts, unit=U.MWh): MarketDataPricingModel(),
+                })
+            register_service(
+                "instrument_price", pricing_service_impl, pricing_regime_context=prc, publish_to_ui=False, trace=True)
+
+            null_sink(subscribe_price[TSB[Stream[Price]]](inst))
+            stats = pricing_trace_stats(const(True, delay=timedelta(seconds=1)))
+
+            WiringGraphContext.instance().build_services()
+            return stats
+
+    stats = eval_node(g, ["f1-f2"], __elide__=True)[-1]
+    counts = {(s.model, s.stage, s.clock): s.count for s in stats}
+    for model in ("CalendarSpreadPricingModel", "MarketDataPricingModel"):
+        for stage in (PricingStage.INSTRUMENT, PricingStage.MODEL, PricingStage.PRICE, PricingStage.ERRORS):
+            assert counts[(model, stage, "wall")] >= 1
+            assert counts[(model, stage, "engine")] >= 1
+    assert all(sum(s.buckets) == s.count for s in stats)
+    assert PricingTracer.instance("instrument_price").latest.keys() == {
+        PricingRequest(instrument=s, opts=PriceOpts()) for s in ("f1-f2", "f1", "f2")}
+
+
+def test_pricing_service_trace_exception():
+
+    @graph
+    def g(inst: TS[str]) -> TS[tuple[PricingLatency, ...]]:
+        with const(date(2024, 11, 22)) as business_date:
+            register_service("instrument", instrument_by_name_impl)
+
+            prc = PricingRegimeContext(
+                name='test',
+                pricing_model_mapping={PriceTraitsFuture(PriceOpts, unit=U.MWh): RaisingPricingModel()})
+            register_service(
+                "instrument_price", pricing_service_impl, pricing_regime_context=prc, publish_to_ui=False, trace=True)
+
+            null_sink(subscribe_price[TSB[Stream[Price]]](inst))
+            stats = pricing_trace_stats(const(True, delay=timedelta(seconds=1)))
+
+            WiringGraphContext.instance().build_services()
+            return stats
+
+    stats = eval_node(g, ["f1"], __elide__=True)[-1]
+    counts = {(s.model, s.stage, s.clock): s.count for s in stats}
+    for stage in (PricingStage.PRICE, PricingStage.ERRORS):
+        assert counts[("RaisingPricingModel", stage, "wall")] >= 1
+
+
+@dataclass(frozen=True, kw_only=True)
+class StreamingPricingModel(PricingModel):
+    ...
+
+
+@graph(overloads=pricing_model, requires=lambda m: m[PRICE].py_type == TSB[Stream[Price]])
+def streaming_pricing_model(instrument: TS[Future],
+                            opts: TS[PriceOpts],
+                            model: TS[StreamingPricingModel],
+                            price_type: Type[PRICE] = AUTO_RESOLVE) -> PRICE:
+    return combine[TSB[Stream[Price]]](status=StreamStatus.OK,
+                                       status_msg=merge(const(""), const("updated", delay=timedelta(hours=1))),
+                                       val=merge(const(101.0), const(102.0, delay=timedelta(hours=1))),
+                                       timestamp=MIN_DT,
+                                       currency_unit=getattr_[SCALAR: Unit](instrument, "currency_unit"),
+                                       unit=getattr_[SCALAR: Unit](instrument, "unit"),
+                                       price_type=PriceType.MID,
+                                       origin="streamed")
+
+
+def test_pricing_service_trace_streaming_price():
+
+    @graph
+    def g(inst: TS[str]) -> TS[tuple[PricingLatency, ...]]:
+        with const(date(2024, 11, 22)) as business_date:
+            register_service("instrument", instrument_by_name_impl)
+
+            prc = PricingRegimeContext(
+                name='test',
+                pricing_model_mapping={PriceTraitsFuture(PriceOpts, unit=U.MWh): StreamingPricingModel()})
+            register_service(
+                "instrument_price", pricing_service_impl, pricing_regime_context=prc, publish_to_ui=False, trace=True)
+
+            null_sink(subscribe_price[TSB[Stream[Price]]](inst))
+            stats = pricing_trace_stats(const(True, delay=timedelta(hours=2)))
+
+            WiringGraphContext.instance().build_services()
+            return stats
+
+    stats = eval_node(g, ["f1"], __elide__=True)[-1]
+    stats = {(s.stage, s.clock): s for s in stats}
+    # the second tick of the price has no new mark from the model so is not measured, the error it changes is measured
+    # from the tick of the price rather than from the subscription an hour earlier
+    assert stats[(PricingStage.PRICE, "engine")].count == 1
+    assert stats[(PricingStage.ERRORS, "engine")].count == 2
+    assert all(s.max < 60.0 for s in stats.values())
+
+
+def test_pricing_tracer_latest_is_bounded():
+    tracer = PricingTracer("test", max_requests=2)
+    request = lambda symbol: PricingRequest(instrument=symbol, opts=PriceOpts())
+    for symbol in ("f1", "f2", "f1", "f3"):
+        tracer.record(request(symbol), MarketDataPricingModel(), PricingStage.PRICE, 0.0, 0.0)
+    assert list(tracer.latest) == [request("f1"), request("f3")]
+    assert tracer.histograms[("MarketDataPricingModel", PricingStage.PRICE, "wall")].count == 4
+
+
+@dataclass(frozen=True, kw_only=True)
+class RaisingPricingModel(PricingModel):
+    ...
+
+
+@graph(overloads=pricing_model, requires=lambda m: m[PRICE].py_type == TSB[Stream[Price]])
+def raising_pricing_model(instrument: TS[Future],
+                          opts: TS[PriceOpts],
+                          model: TS[RaisingPricingModel],
+                          price_type: Type[PRICE] = AUTO_RESOLVE) -> PRICE:
+    return combine[TSB[Stream[Price]]](status=StreamStatus.OK, val=_raise_pricing(instrument))
+
+
+@compute_node
+def _raise_pricing(instrument: TS[Future]) -> TS[float]:
+    raise ValueError(f"Cannot price {instrument.value.symbol}")
+
+
+_MARKET_DATA_PRICED = []
+
+
+@dataclass(frozen=True, kw_only=True)
+class CountingPricingModel(PricingModel):
+    ...
+
+
+@graph(overloads=pricing_model, requires=lambda m: m[PRICE].py_type == TSB[Stream[Price]])
+def counting_pricing_model(instrument: TS[Future],
+                           opts: TS[PriceOpts],
+                           model: TS[CountingPricingModel],
+                           price_type: Type[PRICE] = AUTO_RESOLVE) -> PRICE:
+    return combine[TSB[Stream[Price]]](status=StreamStatus.OK,
+                                       status_msg="",
+                                       val=_count_priced(instrument),
+                                       timestamp=MIN_DT,
+                                       currency_unit=getattr_[SCALAR: Unit](instrument, "currency_unit"),
+                                       unit=getattr_[SCALAR: Unit](instrument, "unit"),
+                                       price_type=PriceType.MID,
+                                       origin="counted")
+
+
+@compute_node
+def _count_priced(instrument: TS[Future]) -> TS[float]:
+    _MARKET_DATA_PRICED.append(instrument.value.symbol)
+    return 101.0
+
+
+def test_pricing_service_cache():
+    _MARKET_DATA_PRICED.clear()
+    cache = PricingResultCache.register("test", ttl=timedelta(minutes=1), max_size=10)
+
+    @graph
+    def g() -> TSB[Stream[Price]]:
+        with const(date(2024, 11, 22)) as business_date:
+            register_service("instrument", instrument_by_name_impl)
+
+            prc = PricingRegimeContext(
+                name='test',
+                pricing_model_mapping={PriceTraitsFuture(PriceOpts, unit=U.MWh): CountingPricingModel()})
+            for path in ("price_a", "price_b", "price_c"):
+                register_service(path, pricing_service_impl, pricing_regime_context=prc, publish_to_ui=False,
+                                 cache="test")
+
+            # f1 is priced on the first path and reused by the second, which prices it again when it expires (after a
+            # minute), the third reuses that price until it expires in turn
+            null_sink(subscribe_price[TSB[Stream[Price]]](const("f1"), path="price_a"))
+            null_sink(subscribe_price[TSB[Stream[Price]]](const("f1", delay=timedelta(seconds=10)), path="price_b"))
+            p = subscribe_price[TSB[Stream[Price]]](const("f1", delay=timedelta(seconds=90)), path="price_c")
+
+            WiringGraphContext.instance().build_services()
+            return p
+
+    results = eval_node(g, __elide__=True)
+    assert results[-1]["val"] == 101.0 and results[-1]["origin"] == "counted"
+    assert _MARKET_DATA_PRICED == ["f1", "f1", "f1"]
+    assert cache.hits == 2
+    assert len(cache) == 1
+
+
+def test_pricing_result_cache_eviction():
+    from datetime import datetime
+    cache = PricingResultCache("test", ttl=timedelta(seconds=30), max_size=2)
+    now = datetime(2024, 11, 22, 9)
+    key = lambda symbol: PricingResultCache.key(PricingRequest(symbol, PriceOpts()), date(2024, 11, 22),
+                                                MarketDataPricingModel(), TSB[Stream[Price]])
+    cache.put(key("f1"), 1.0, now)
+    cache.put(key("f2"), 2.0, now + timedelta(seconds=10))
+    assert cache.get(key("f1"), now + timedelta(seconds=20)) == 1.0
+    cache.put(key("f3"), 3.0, now + timedelta(seconds=20))  # f2 is the least recently used
+    assert cache.get(key("f2"), now + timedelta(seconds=20)) is None
+    assert cache.get(key("f1"), now + timedelta(seconds=30)) is None  # expired
+    assert cache.get(key("f3"), now + timedelta(seconds=30)) == 3.0
+    assert (cache.hits, cache.misses, cache.evictions, len(cache)) == (2, 2, 1, 2)
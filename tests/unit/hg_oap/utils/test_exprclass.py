@@ -1,7 +1,10 @@
+import pickle
 from calendar import monthrange
 from dataclasses import dataclass
 from datetime import date, timedelta
 
+import pytest
+
 from hg_oap.dates.dgen import days
 from hg_oap.dates.tenor import Tenor
 from hg_oap.utils.exprclass import (
@@ -10,8 +13,9 @@ from hg_oap.utils.exprclass import (
     CallableDescriptor,
     exprclass,
     replace,
+    evaluate_all,
 )
-from hg_oap.utils.op import ParameterOp, lazy, Expression
+from hg_oap.utils.op import ParameterOp, lazy, Expression, FailedOp
 
 SELF = ParameterOp(_name="SELF", _index=0)
 
@@ -100,3 +104,109 @@ def test_exprclass_replace():
     e1 = replace(e, today=date(2021, 1, 1), in_a_month=date(2021, 3, 1))
 
     assert e1.number_of_days == 59
+
+
+def test_exprclass_layout():
+    @dataclass(frozen=True, kw_only=True)
+    class base_expr(ExprClass):
+        SELF: "base_expr" = SELF
+
+        a: int
+        b: int = SELF.a + 1
+        c: int = SELF.b * 2
+
+    @dataclass(frozen=True, kw_only=True)
+    class derived_expr(base_expr):
+        SELF: "derived_expr" = SELF
+
+        c: int = SELF.b * 3
+        d: int = SELF.c + 1
+
+    assert base_expr.__ex_layout__ == {"b": 0, "c": 1}
+    assert derived_expr.__ex_layout__ == {"b": 0, "c": 1, "d": 2}
+
+    e = derived_expr(a=1)
+    assert (e.b, e.c, e.d) == (2, 6, 7)
+    assert e._ex_overrides == ()
+
+    e = derived_expr(a=1, d=10, b=5)
+    assert (e.b, e.c, e.d) == (5, 15, 10)
+    assert e._ex_overrides == ("b", 5, "d", 10)
+    assert derived_expr.b.__overriden__(e) and not derived_expr.c.__overriden__(e)
+
+    assert e == derived_expr(a=1, b=5, d=10)
+    assert hash(e) == hash(derived_expr(a=1, b=5, d=10))
+    assert e != derived_expr(a=1, b=5)
+
+    e1 = replace(e, a=2, d=20)
+    assert (e1.b, e1.c, e1.d) == (5, 15, 20)
+
+
+def test_exprclass_override_after_access():
+    @dataclass
+    class mutable_expr(ExprClass):
+        SELF: "mutable_expr" = SELF
+
+        a: int
+        b: int = SELF.a + 1
+
+    e = mutable_expr(a=1)
+    assert e.b == 2
+    e.b = 5
+    assert e.b == 5
+    assert mutable_expr.b.__overriden__(e)
+
+
+def test_exprclass_pickle():
+    e = pickle.loads(pickle.dumps(_PickledExpr(a=1, c=7)))
+    assert (e.b, e.c) == (2, 7)
+    assert e == _PickledExpr(a=1, c=7)
+
+
+@dataclass(frozen=True)
+class _PickledExpr(ExprClass):
+    SELF: "_PickledExpr" = SELF
+
+    a: int
+    b: int = SELF.a + 1
+    c: int = SELF.a + 2
+
+
+def test_exprclass_dependencies():
+    @dataclass(frozen=True, kw_only=True)
+    class dependent_expr(ExprClass):
+        SELF: "dependent_expr" = SELF
+
+        a: int
+        d: int = SELF.c + SELF.b
+        c: int = lazy(max)(SELF.b, y=SELF.a)
+        b: int = SELF.a + 1
+        e: int = lambda self: self.d * 2
+
+    assert dependent_expr.__ex_dependencies__ == {
+        "d": frozenset({"b", "c"}), "c": frozenset({"b"}), "b": frozenset(), "e": None}
+    assert dependent_expr.__ex_order__ == ("b", "c", "d", "e")
+
+
+def test_evaluate_all():
+    @dataclass(frozen=True, kw_only=True)
+    class nested_expr:
+        x: int
+        y: int
+
+    @dataclass(frozen=True, kw_only=True)
+    class evaluated_expr(ExprClass):
+        SELF: "evaluated_expr" = SELF
+
+        n: nested_expr
+        total: int = SELF.n.x + SELF.n.y
+        doubled: int = SELF.total * 2
+        label: str = lambda self: f"{self.doubled}"
+        failed: int = SELF.n.z
+
+    e = evaluated_expr(n=nested_expr(x=1, y=2), doubled=10)
+    assert evaluate_all(e, raise_=False) == {"total": 3, "doubled": 10, "label": "10"}
+    assert e.total == 3
+
+    with pytest.raises(FailedOp):
+        evaluate_all(evaluated_expr(n=nested_expr(x=1, y=2)))
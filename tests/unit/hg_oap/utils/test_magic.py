@@ -4,7 +4,8 @@ from dataclasses import dataclass
 import pytest
 
 from hg_oap.utils.op import *
-from hg_oap.utils.op import FailedOp, Expression
+from hg_oap.utils.op import FailedOp, Expression, OpKey, structurally_equal, structural_hash, optimise, SharedOp, \
+    SharedScopeOp
 
 
 @dataclass
@@ -146,6 +147,20 @@ def test_magic_list_comprehension():
     assert calc(expr, [0, 1], [[0], [1]]) == ['00', '01', '10', '11']
 
 
+def test_magic_comprehension_evaluation():
+    expr = lazy([i.x * _1 - i.f(1) for i in _0])
+    assert calc(expr, [A(1), A(2)], 10) == [8, 17]
+    assert calc(expr, [A(1), A(2)], 10) == [8, 17]
+
+    assert calc(lazy([i + j for i in _0 for j in _1]), [1, 2], [10, 20]) == [11, 21, 12, 22]
+    assert calc(lazy([j * 2 for i in _0 for j in i]), [[1, 2], [], [3]]) == [2, 4, 6]
+    assert calc(lazy([i for i in _0]), []) == []
+
+    assert isinstance(calc(lazy([i for i in _0.y]), A(), raise_=False), FailedOp)
+    assert isinstance(calc(lazy([j for i in _0 for j in i.y]), [A()], raise_=False), FailedOp)
+    assert isinstance(calc(lazy([i.y for i in _0]), [A()])[0], FailedOp)
+
+
 def test_magic_dict_comprehension():
     expr = {k: i for i in _0 for k in i}
     assert calc(expr, [[0], [1]]) == {0: [0], 1: [1]}
@@ -176,3 +191,118 @@ def test_expression():
     assert s.parameters['key'].name == 'key'
     assert s.parameters['key'].kind == inspect.Parameter.KEYWORD_ONLY
     assert expr1(key=1) == 2
+
+
+@pytest.mark.parametrize(
+    ('make', 'args'),
+    (
+        (lambda: a.f(_1) + 1, [A(), 2]),
+        (lambda: round(_0[1].x * 2, 1), [[A(), A(x=3)]]),
+        (lambda: 1 < _0 < 3, [2]),
+        (lambda: abs(-_0), [2]),
+        (lambda: lazy(max)(_0, default=_1), [[], 5]),
+        (lambda: [i * 2 for i in _0], [[1, 2]]),
+        (lambda: lazy({'a': _0, 'b': [_1, 1]}), [1, 2]),
+    )
+)
+def test_structure_and_pickle(make, args):
+    import copy
+    import pickle
+
+    expr = make()
+    assert structurally_equal(expr, make())
+    assert structural_hash(expr) == structural_hash(make())
+    assert OpKey(expr) == OpKey(make())
+    assert not structurally_equal(expr, _0 + 2)
+
+    for e in (pickle.loads(pickle.dumps(expr)), copy.copy(expr), copy.deepcopy(expr)):
+        assert repr(e) == repr(expr)
+        assert structurally_equal(e, expr)
+        assert calc(e, *args) == calc(make(), *args)
+
+
+def test_structure_keys():
+    cache = {OpKey(a.x + 1): 1}
+    assert cache[OpKey(a.x + 1)] == 1
+    assert OpKey(a.x + 2) not in cache
+    assert OpKey(a.y + 1) not in cache
+    assert Expression(a.x + 1) == Expression(a.x + 1)
+    assert hash(Expression(a.x + 1)) == hash(Expression(a.x + 1))
+    assert Expression(a.x + 1) != Expression(a.x + 1.0)
+
+
+def test_optimise():
+    calls = []
+
+    def f(x):
+        calls.append(x)
+        return x * 10
+
+    x = (_0 + _1) * _0 - _1 * 2
+    expr = x * x - lazy(2) * 3 + lazy(f)(_0) / lazy(f)(_0)
+    optimised = optimise(expr)
+    assert isinstance(optimised, SharedScopeOp)
+    assert repr(optimised) == f"let $0 = (_0 + _1) * _0 - _1 * 2: $0 * $0 - 6 + {f!r}(_0) / {f!r}(_0)"
+    assert calc(optimised, 2, 3) == calc(expr, 2, 3) == 11.0
+    calls.clear()
+    calc(optimised, 2, 3)
+    assert calls == [2, 2]
+
+    # the sub-expressions that cost less to evaluate again than to share are not shared
+    assert repr(optimise((_0 + _1) * (_0 + _1))) == "(_0 + _1) * (_0 + _1)"
+    assert repr(optimise(_0.a.b + _0.a.b)) == "_0.a.b + _0.a.b"
+
+    assert repr(optimise(_0 + lazy(1) + 2)) == "_0 + 1 + 2"
+    assert repr(optimise(_0 + (lazy(1) + 2))) == "_0 + 3"
+    assert repr(optimise(lazy([1]) + [2])) == "[1] + [2]"
+    assert repr(optimise(lazy(1) / 0)) == "1 / 0"
+
+    chain = 0 < _0 < lazy(1) + 2
+    assert calc(optimise(chain), 2) is True and calc(optimise(chain), 3) is False
+    comprehension = lazy([(i + 1) * (i + 1) for i in _0])
+    assert calc(optimise(comprehension), [1, 2]) == [4, 9]
+
+
+def test_optimise_does_not_share_calls():
+    x = ParameterOp(_name='x')
+    # the calls of iter give two iterators, sharing the call would exhaust the iterator in the first use
+    expr = lazy(list)(lazy(iter)(x)) + lazy(sorted)(lazy(iter)(x))
+    assert calc(expr, x=[2, 1]) == Expression(expr)(x=[2, 1]) == [2, 1, 1, 2]
+
+    counter = iter(range(1, 10))
+    nxt = lambda: next(counter)
+    expr = lazy(nxt)() + lazy(nxt)()
+    assert Expression(expr)() == 3
+    assert Expression(expr)() == 7
+
+    # the pure sub-expressions of the calls are still shared
+    y = (x + 1) * x - x * 2
+    expr = lazy(abs)(y) + y
+    assert repr(optimise(expr)) == f"let $0 = (x + 1) * x - x * 2: {abs!r}($0) + $0"
+    assert calc(optimise(expr), x=3) == 12
+
+
+def test_optimise_nested_evaluation():
+    x = (_0 + 1) * _0 - _0 * 2
+
+    def inner(v):
+        return expr(v - 1) if v > 0 else 0
+
+    # the evaluation of the expression within itself does not replace the shared values of the outer evaluation
+    op = x + lazy(inner)(_0) + x
+    expr = Expression(op)
+    assert isinstance(expr.optimised, SharedScopeOp)
+    assert expr(3) == calc(op, 3) == 16
+
+
+def test_expression_debug():
+    x = (_0 + 1) * _0 - _0 * 2
+    expr = Expression(x * x)
+    assert repr(expr) == "((_0 + 1) * _0 - _0 * 2) * ((_0 + 1) * _0 - _0 * 2)"
+    assert expr(3) == 36
+    Expression.debug = True
+    try:
+        assert repr(expr) == "let $0 = (_0 + 1) * _0 - _0 * 2: $0 * $0"
+    finally:
+        Expression.debug = False
+    assert isinstance(expr.optimised._body._lhs, SharedOp)